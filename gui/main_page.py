@@ -1,5 +1,4 @@
 # gui/main_page.py
-import os
 import re
 import tkinter as tk
 from tkinter import ttk, messagebox
@@ -17,6 +16,8 @@ try:
 except Exception:
     pass
 
+STORY_CONCURRENCY = 8   # all-teams runs: stories requested in parallel over one keep-alive pool
+
 # --------------- Helpers (no external deps) ---------------
 def _project_root() -> Path:
     # gui/ is one level below project root
@@ -56,6 +57,12 @@ try:
 except Exception:
     from story_gpt import list_teams_from_final
 
+# story backend (MADDEN_LLM_BACKEND); it reports missing settings such as the API key itself
+try:
+    from process.modules.llm_backends import get_backend
+except Exception:
+    from llm_backends import get_backend
+
 # ensure processed file exists
 try:
     from process.modules.generate_names import run as generate_names_run
@@ -136,6 +143,10 @@ def build_main_page(root: tk.Tk):
         team_combo.current(0)
     on_mode_change()
 
+    # Offline narrative: Part 1 from the local template generator, no API call
+    offline_var = tk.BooleanVar(value=not get_backend().configured)
+    tk.Checkbutton(ctl, text="Offline story", variable=offline_var).pack(side="left", padx=(12, 0))
+
     # --- Output area ---
     frame = tk.Frame(root)
     frame.pack(fill="both", expand=True, padx=12, pady=(0, 12))
@@ -172,16 +183,15 @@ def build_main_page(root: tk.Tk):
         output.insert(tk.END, "Generating… please wait.\n")
         _start_busy()
 
+        offline = offline_var.get()
+
         def worker():
             try:
-                if not os.getenv("OPENAI_API_KEY"):
-                    raise RuntimeError("OPENAI_API_KEY not set. Check your .env or environment.")
-
                 if mode_var.get() == "single":
                     team = team_var.get().strip()
                     if not team:
                         raise RuntimeError("Please select a team.")
-                    text = process_run(team=team, all_teams=False, include_preseason=False)
+                    text = process_run(team=team, all_teams=False, include_preseason=False, offline=offline)
 
                     def done_ok():
                         output.delete("1.0", tk.END)
@@ -203,7 +213,7 @@ def build_main_page(root: tk.Tk):
 
                     if not teams:
                         # Use old single-shot path if we couldn't enumerate teams
-                        text = process_run(team=None, all_teams=True, include_preseason=False)
+                        text = process_run(team=None, all_teams=True, include_preseason=False, offline=offline)
                         def done_all():
                             output.delete("1.0", tk.END)
                             output.insert(tk.END, (text or "").strip() or "(No output)")
@@ -212,23 +222,34 @@ def build_main_page(root: tk.Tk):
                         return
 
                     total = len(teams)
-                    chunks = []
+                    parts = {}
+                    parts_lock = threading.Lock()
+
+                    def on_team(tname, part):
+                        # called from the run's worker threads as each team finishes
+                        with parts_lock:
+                            parts[tname] = part
+                            i = len(parts)
+                        root.after(0, lambda: progress_lbl.config(text=f"{i}/{total} • {tname}"))
 
-                    for i, tname in enumerate(teams, 1):
-                        # update counter label in the UI
-                        def upd(i=i, tname=tname):
-                            progress_lbl.config(text=f"{i}/{total} • {tname}")
-                        root.after(0, upd)
-
-                        # generate one team at a time so UI can show progress
-                        try:
-                            part = process_run(team=tname, all_teams=False, include_preseason=False)
-                        except Exception as e:
-                            part = f"# {tname}\nError generating: {e}\n"
-                        else:
-                            # Ensure each team starts with a heading (helps PDF exporter split pages)
-                            if not (part or "").lstrip().startswith("#"):
-                                part = f"# {tname}\n{part}"
+                    # one all-teams run: stories are generated STORY_CONCURRENCY at a time
+                    try:
+                        process_run(team=None, all_teams=True, include_preseason=False, offline=offline,
+                                    concurrency=STORY_CONCURRENCY, on_team=on_team)
+                    except Exception:
+                        pass   # a team failed: the rest are finished (from cache) one at a time below
+
+                    chunks = []
+                    for tname in teams:
+                        part = parts.get(tname)
+                        if part is None:
+                            try:
+                                part = process_run(team=tname, all_teams=False, include_preseason=False, offline=offline)
+                            except Exception as e:
+                                part = f"# {tname}\nError generating: {e}\n"
+                        # Ensure each team starts with a heading (helps PDF exporter split pages)
+                        if not (part or "").lstrip().startswith("#"):
+                            part = f"# {tname}\n{part}"
                         chunks.append((part or "").rstrip() + "\n")
 
                     final_text = "\n".join(chunks)
@@ -296,6 +317,16 @@ def build_main_page(root: tk.Tk):
     tk.Button(btn_bar, text="Save as PDF", command=on_save_pdf).pack(side="left", padx=(0, 6))
     tk.Button(btn_bar, text="Save",        command=on_save).pack(side="left")
 
+    def on_whatif():
+        try:
+            from gui.whatif_window import open_whatif_window
+        except Exception as e:
+            messagebox.showerror("What-if", f"What-if view unavailable:\n{e}")
+            return
+        open_whatif_window(root, team_var.get().strip() or None)
+
+    tk.Button(btn_bar, text="What if…", command=on_whatif).pack(side="left", padx=(6, 0))
+
     # progress widgets (hidden until running)
     progress_lbl = tk.Label(btn_bar, text="", fg="gray")
     progress = ttk.Progressbar(btn_bar, mode="indeterminate", length=120)
@@ -0,0 +1,111 @@
+# gui/whatif_window.py
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+try:
+    from paths import PROC_DIR
+except Exception:
+    from pathlib import Path
+    PROC_DIR = Path(__file__).resolve().parents[1] / "data" / "processed"
+
+from process.modules.scenario import ScenarioEngine
+from process.modules.season_bin import season_view_for
+from process.modules.tiebreaks import TEAM_ABBR
+
+STATUS_TEXT = {"clinched": "Clinched", "eliminated": "Eliminated", "alive": "Still alive"}
+
+
+def _ab(team: str) -> str:
+    return TEAM_ABBR.get(team, team)
+
+
+def open_whatif_window(root: tk.Tk, team: str | None = None):
+    """Toggle results of the remaining games and see seeds / clinch status update live."""
+    try:
+        engine = ScenarioEngine(season_view_for(PROC_DIR / "schedulesPS5_final.json").season_index())
+    except Exception as e:
+        messagebox.showerror("What-if", f"Could not load the season:\n{e}")
+        return
+
+    games = engine.remaining_games()
+    win = tk.Toplevel(root)
+    win.title("What if…")
+    win.geometry("860x560")
+
+    # --- team picker ---
+    top = ttk.Frame(win, padding=(12, 10))
+    top.pack(fill="x")
+    ttk.Label(top, text="Team:").pack(side="left")
+    teams = sorted(engine.index.teams)
+    team_var = tk.StringVar(value=team if team in teams else (teams[0] if teams else ""))
+    ttk.Combobox(top, textvariable=team_var, values=teams, width=36, state="readonly").pack(side="left", padx=6)
+    ttk.Button(top, text="Reset", command=lambda: [v.set("") for v in choice_vars.values()]).pack(side="right")
+
+    body = ttk.Frame(win, padding=(12, 0, 12, 12))
+    body.pack(fill="both", expand=True)
+
+    # --- remaining games (scrollable) ---
+    left = ttk.Frame(body)
+    left.pack(side="left", fill="y")
+    canvas = tk.Canvas(left, width=430, highlightthickness=0)
+    scroll = ttk.Scrollbar(left, orient="vertical", command=canvas.yview)
+    rows = ttk.Frame(canvas)
+    rows.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+    canvas.create_window((0, 0), window=rows, anchor="nw")
+    canvas.configure(yscrollcommand=scroll.set)
+    canvas.pack(side="left", fill="y")
+    scroll.pack(side="left", fill="y")
+
+    choice_vars: dict[str, tk.StringVar] = {}
+    if not games:
+        ttk.Label(rows, text="No unplayed regular-season games.").grid(row=0, column=0, sticky="w")
+    for i, g in enumerate(games):
+        var = tk.StringVar(value="")
+        choice_vars[g["id"]] = var
+        ttk.Label(rows, text=f"Wk{g['week']}  {_ab(g['away'])} @ {_ab(g['home'])}", width=18).grid(
+            row=i, column=0, sticky="w", pady=1)
+        for col, (label, value) in enumerate((("—", ""), (_ab(g["away"]), "away"),
+                                              ("Tie", "tie"), (_ab(g["home"]), "home")), start=1):
+            ttk.Radiobutton(rows, text=label, variable=var, value=value).grid(row=i, column=col, sticky="w", padx=2)
+
+    # --- results ---
+    out = tk.Text(body, wrap="word", width=48)
+    out.pack(side="left", fill="both", expand=True, padx=(12, 0))
+
+    def refresh(*_):
+        outcomes = {gid: v.get() for gid, v in choice_vars.items() if v.get()}
+        t = team_var.get()
+        try:
+            res = engine.evaluate(outcomes, t)
+        except ValueError as e:
+            out.delete("1.0", tk.END)
+            out.insert(tk.END, str(e))
+            return
+        lines = []
+        if "team" in res:
+            r = res["team"]
+            st = res["status"].get(t, {})
+            rec = f"{r['w']}-{r['l']}" + (f"-{r['t']}" if r["t"] else "")
+            lines += [f"{t} ({rec})",
+                      f"  Division: {STATUS_TEXT.get(st.get('division'), '-')}",
+                      f"  Playoffs: {STATUS_TEXT.get(st.get('playoffs'), '-')}",
+                      f"  Current seed: {res['seed'] or 'out'}"]
+            for other, (winner, step) in sorted(res["ties"].items()):
+                lines.append(f"  Tied with {other}: {winner} wins ({step or 'record'})")
+            lines.append("")
+        lines.append(f"{res['remaining']} game(s) left undecided\n")
+        for conf, seeds in res["seeds"].items():
+            lines.append(conf)
+            for s in seeds:
+                mark = {"clinched": "*", "eliminated": "x"}.get(res["status"].get(s["team"], {}).get("playoffs"), " ")
+                lines.append(f"  {s['seed']}. {s['team']} {mark}")
+            lines.append("")
+        lines.append("* clinched a berth   x eliminated")
+        out.delete("1.0", tk.END)
+        out.insert(tk.END, "\n".join(lines))
+
+    for v in choice_vars.values():
+        v.trace_add("write", refresh)
+    team_var.trace_add("write", refresh)
+    refresh()
+    return win
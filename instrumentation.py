@@ -0,0 +1,168 @@
+# instrumentation.py — opt-in spans/timers for the report pipeline
+#
+# Disabled by default (span() returns a shared no-op object). Enable with
+#   instrumentation.enable()              or   MADDEN_TRACE=<output dir> in the environment
+# then export with export_json(path) / export_chrome_trace(path) (open in chrome://tracing or Perfetto).
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+_ENABLED = False
+_LOCK = threading.Lock()
+_EVENTS: list[dict] = []           # finished spans
+_T0 = time.perf_counter_ns()
+_PARENT = contextvars.ContextVar("madden_span_parent", default=None)
+_TEAM = contextvars.ContextVar("madden_span_team", default=None)
+
+
+def enable():
+    global _ENABLED
+    _ENABLED = True
+
+def disable():
+    global _ENABLED
+    _ENABLED = False
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+def reset():
+    with _LOCK:
+        _EVENTS.clear()
+
+
+class _NullSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def set(self, **attrs): pass
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "start", "child_ns", "_parent", "_token")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.child_ns = 0
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._parent = _PARENT.get()
+        self._token = _PARENT.set(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        dur = time.perf_counter_ns() - self.start
+        _PARENT.reset(self._token)
+        if self._parent is not None:
+            self._parent.child_ns += dur
+        ev = {
+            "name": self.name, "start_ns": self.start - _T0, "dur_ns": dur,
+            "self_ns": dur - self.child_ns, "team": self.attrs.pop("team", None) or _TEAM.get(),
+            "tid": threading.get_ident(), "args": self.attrs,
+        }
+        with _LOCK:
+            _EVENTS.append(ev)
+        return False
+
+
+def span(name: str, **attrs):
+    """Context manager timing a block; a no-op when instrumentation is disabled."""
+    if not _ENABLED:
+        return _NULL
+    return _Span(name, attrs)
+
+
+def timed(name: str):
+    """Decorator form of span(name)."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return fn(*args, **kwargs)
+            with _Span(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+class team_scope:
+    """Attribute every span opened inside the block to `team` (for per-team breakdowns)."""
+    __slots__ = ("team", "_token")
+
+    def __init__(self, team: str | None):
+        self.team = team
+
+    def __enter__(self):
+        self._token = _TEAM.set(self.team) if _ENABLED else None
+        return self
+
+    def __exit__(self, *exc):
+        if self._token is not None:
+            _TEAM.reset(self._token)
+        return False
+
+
+# ---------- reports ----------
+def summary() -> dict:
+    """
+    {"spans": {name: {"count", "total_ms", "self_ms"}},
+     "teams": {team: {name: {"count", "total_ms", "self_ms"}}}}
+    self_ms excludes time spent in nested spans (e.g. story local time vs. story.network).
+    """
+    with _LOCK:
+        events = list(_EVENTS)
+    spans = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "self_ms": 0.0})
+    teams = defaultdict(lambda: defaultdict(lambda: {"count": 0, "total_ms": 0.0, "self_ms": 0.0}))
+    for ev in events:
+        for bucket in ([spans[ev["name"]]] + ([teams[ev["team"]][ev["name"]]] if ev["team"] else [])):
+            bucket["count"] += 1
+            bucket["total_ms"] += ev["dur_ns"] / 1e6
+            bucket["self_ms"] += ev["self_ns"] / 1e6
+    return {"spans": dict(spans), "teams": {t: dict(v) for t, v in teams.items()}}
+
+
+def export_json(path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(summary(), indent=2), encoding="utf-8")
+    return path
+
+
+def export_chrome_trace(path) -> Path:
+    """Chrome trace-event format ('X' complete events, microseconds)."""
+    with _LOCK:
+        events = list(_EVENTS)
+    pid = os.getpid()
+    trace = [{
+        "name": ev["name"], "ph": "X", "pid": pid, "tid": ev["tid"],
+        "ts": ev["start_ns"] / 1e3, "dur": ev["dur_ns"] / 1e3,
+        "args": dict(ev["args"], **({"team": ev["team"]} if ev["team"] else {})),
+    } for ev in events]
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"}), encoding="utf-8")
+    return path
+
+
+def export_if_requested():
+    """Write timings.json + trace.json into $MADDEN_TRACE (if set)."""
+    out_dir = os.getenv("MADDEN_TRACE")
+    if _ENABLED and out_dir:
+        export_json(Path(out_dir) / "timings.json")
+        export_chrome_trace(Path(out_dir) / "trace.json")
+
+
+if os.getenv("MADDEN_TRACE"):
+    enable()
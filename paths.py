@@ -5,6 +5,7 @@ PROJECT_ROOT = Path(__file__).resolve().parent
 DATA_DIR = PROJECT_ROOT / "data"
 RAW_DIR = DATA_DIR / "raw"
 PROC_DIR = DATA_DIR / "processed"
+FRANCHISE_DB = DATA_DIR / "franchise.sqlite3"   # all ingested seasons (process/modules/franchise_store.py)
 
 REFERENCE_DIR = PROJECT_ROOT / "reference"   # contains tiebreakers.md + tiebreaker_story_template.md
 REPORTS_DIR   = PROJECT_ROOT / "reports"     # where filled reports will be saved
@@ -1,10 +1,11 @@
 # pdf_export.py — fpdf2 exporter with ASCII sanitization, hard-wrap, logos, single & all-teams
 import os
 import re
-import json
 from pathlib import Path
 from typing import Optional
 from fpdf import FPDF
+from instrumentation import span, team_scope, timed
+from process.modules.season_bin import season_view_for
 
 # ---------- robust project paths ----------
 try:
@@ -14,8 +15,12 @@ except Exception:
     PROJECT_ROOT = _ROOT
     PROC_DIR = PROJECT_ROOT / "data" / "processed"
 
+try:
+    from process.modules.franchise_store import format_key_players
+except Exception:
+    format_key_players = None  # roster store unavailable; PDFs simply omit the line
+
 ASSETS_DIR = PROJECT_ROOT / "assets" / "logos"  # images live in assets/logos/<slug>.png|jpg|jpeg
-FINAL_STATUSES = {2, 3}  # finished games in your data
 
 # ---------- ASCII sanitizer (avoid Unicode font issues) ----------
 ASCII_SUBS = {
@@ -63,45 +68,11 @@ def _find_logo(team: str) -> Optional[Path]:
             return p
     return None
 
-def _scores_by_team(game: dict) -> dict:
-    # keys look like "<Team Name> Score"
-    return {k[:-6].strip(): v for k, v in game.items()
-            if isinstance(k, str) and k.endswith(" Score")}
-
 def _compute_record(processed_path: Path, team: str) -> str:
-    """Return 'W-L(-T)' from REG-season finished games."""
+    """Return 'W-L(-T)' from REG-season finished games (read from the mapped season file)."""
     if not processed_path.exists():
         return ""
-    data = json.loads(processed_path.read_text(encoding="utf-8"))
-    w = l = t = 0
-    reg = data.get("reg") or {}
-    for weeks in reg.values():
-        if not isinstance(weeks, dict):
-            continue
-        for g in weeks.values():
-            if not isinstance(g, dict) or g.get("status") not in FINAL_STATUSES:
-                continue
-            scores = _scores_by_team(g)
-            if team not in scores and team not in (g.get("homeTeamName"), g.get("awayTeamName")):
-                continue
-            pf = scores.get(team)
-            pa = None
-            if pf is None:
-                home, away = g.get("homeTeamName"), g.get("awayTeamName")
-                if team == home:
-                    pf, pa = scores.get(home), scores.get(away)
-                elif team == away:
-                    pf, pa = scores.get(away), scores.get(home)
-            else:
-                for opp, val in scores.items():
-                    if opp != team:
-                        pa = val
-                        break
-            if pf is None or pa is None:
-                continue
-            if pf > pa: w += 1
-            elif pf < pa: l += 1
-            else: t += 1
+    w, l, t = season_view_for(processed_path).record(team)
     return f"{w}-{l}" + (f"-{t}" if t else "")
 
 # ---------- PDF document ----------
@@ -152,7 +123,18 @@ class _ReportPDF(FPDF):
         self.line(self.left_margin, self.get_y(), self.w - self.right_margin, self.get_y())
         self.ln(8)
 
+def _write_key_players(pdf: _ReportPDF, team: Optional[str]):
+    """Small 'Key players: ...' line under the header, from the franchise store's roster table."""
+    line = format_key_players(team) if (team and format_key_players) else ""
+    if not line:
+        return
+    pdf.set_font("Helvetica", "I", 9)
+    pdf.set_x(pdf.left_margin)
+    pdf.multi_cell(pdf.content_width, 12, _prep(f"Key players: {line}"))
+    pdf.ln(4)
+
 # ---------- body renderer with tidy spacing ----------
+@timed("_write_body")
 def _write_body(pdf: _ReportPDF, text: str):
     W = pdf.content_width
     pdf.set_font("Helvetica", size=11)
@@ -237,14 +219,11 @@ def _write_body(pdf: _ReportPDF, text: str):
         pdf.ln(2)
 
 # ---------- public APIs ----------
-def save_single_team_pdf(text: str, out_path: Path, team: str):
+def _build_single_team_pdf(text: str, team: str) -> _ReportPDF:
     """
-    One-team export: header "Team - Record" on left + team logo on right.
+    One-team document: header "Team - Record" on left + team logo on right.
     If the body starts with "# Team", that heading is skipped (we already have a header).
     """
-    out_path = Path(out_path)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-
     record = _compute_record(PROC_DIR / "schedulesPS5_final.json", team)
     logo = _find_logo(team)
 
@@ -262,8 +241,25 @@ def save_single_team_pdf(text: str, out_path: Path, team: str):
     else:
         body_text = text
 
+    _write_key_players(pdf, team)
     _write_body(pdf, body_text)
-    pdf.output(str(out_path))
+    return pdf
+
+def save_single_team_pdf(text: str, out_path: Path, team: str):
+    """One-team export written to out_path (see _build_single_team_pdf for layout)."""
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with team_scope(team):
+        pdf = _build_single_team_pdf(text, team)
+        with span("pdf.output"):
+            pdf.output(str(out_path))
+
+def render_single_team_pdf(text: str, team: str) -> bytes:
+    """One-team export rendered in memory (used by the report service)."""
+    with team_scope(team):
+        pdf = _build_single_team_pdf(text, team)
+        with span("pdf.output"):
+            return bytes(pdf.output())
 
 def save_all_teams_pdf(all_text: str, out_path: Path):
     """
@@ -282,7 +278,8 @@ def save_all_teams_pdf(all_text: str, out_path: Path):
         pdf.set_header_info(None, None, None)
         pdf.add_page()
         _write_body(pdf, all_text)
-        pdf.output(str(out_path))
+        with span("pdf.output"):
+            pdf.output(str(out_path))
         return
 
     for idx, m in enumerate(matches):
@@ -296,6 +293,9 @@ def save_all_teams_pdf(all_text: str, out_path: Path):
 
         pdf.set_header_info(team_name, record, logo)
         pdf.add_page()
-        _write_body(pdf, body_text)
+        _write_key_players(pdf, team_name)
+        with team_scope(team_name):
+            _write_body(pdf, body_text)
 
-    pdf.output(str(out_path))
+    with span("pdf.output"):
+        pdf.output(str(out_path))
@@ -0,0 +1,86 @@
+# process/modules/deps.py — which games feed which per-team artifacts
+from __future__ import annotations
+
+from .generate_names import games_by_key, games_for_keys
+from .season_hash import game_fingerprint
+from .tiebreaks import CONF_DIV
+
+# Per-team artifacts tracked by the graph:
+#   lines    - story_gpt.extract_team_lines(team)      (team's own games, PRE + REG)
+#   stats    - story_gpt.compute_basic_stats(team)     (team's own REG games)
+#   story    - generate_story_from_file(team)          (lines + stats; what it reads of other teams' games
+#              - facts lines, rule sections - is covered by its cache key, story_gpt.story_fingerprint)
+#   local    - story_local.build_local_story(team)     (facts and standings: every REG game of any team
+#              in the conference)
+#   appendix - tiebreaks.build_tiebreak_appendix(team) (every REG game: conference/common-games
+#              records of all rivals, and the path-to-the-playoffs section goes down to
+#              strength of victory / schedule, which read every opponent's record)
+#   pdf      - the team's PDF page                     (story + appendix + header record)
+ARTIFACT_KINDS = ("lines", "stats", "story", "local", "appendix", "pdf")
+
+
+def game_fingerprints(processed: dict) -> dict:
+    """{game key: fingerprint} for every game in a processed schedule (keys as in games_by_key)."""
+    return {k: game_fingerprint(g) for k, g in games_by_key(processed).items()}
+
+
+def changed_game_keys(old_fps: dict, new_fps: dict) -> set[str]:
+    return {k for k in old_fps.keys() | new_fps.keys() if old_fps.get(k) != new_fps.get(k)}
+
+
+class DependencyGraph:
+    """
+    Game key -> artifacts ((kind, team) tuples) over one processed schedule.
+    Games are looked up per key through the scheduleId index (generate_names.games_for_keys),
+    so asking which artifacts a few changed games dirty costs O(changed), not a season pass.
+    """
+
+    def __init__(self, processed: dict):
+        self.processed = processed
+
+    def games(self, keys) -> dict:
+        """{key: (phase, game)} for the keys present in the schedule."""
+        return games_for_keys(self.processed, keys)
+
+    @staticmethod
+    def artifacts_for_game(phase: str, home: str | None, away: str | None) -> set[tuple]:
+        """Artifacts that read a game between `home` and `away` in `phase`."""
+        out = set()
+        for team in (home, away):
+            if not team:
+                continue
+            out.add(("lines", team))
+            out.add(("story", team))
+            out.add(("local", team))
+            out.add(("pdf", team))
+            if phase == "reg":
+                out.add(("stats", team))
+        if phase == "reg":
+            confs = {CONF_DIV[t][0] for t in (home, away) if t in CONF_DIV}
+            for team, (conf, _) in CONF_DIV.items():
+                if conf in confs:
+                    out.add(("local", team))
+            for team in CONF_DIV:
+                out.add(("appendix", team))
+                out.add(("pdf", team))
+        return out
+
+    def affected(self, changed_keys, changed_games: dict | None = None) -> set[tuple]:
+        """
+        Artifacts depending on any of `changed_keys`: readers of the game as it is in this
+        schedule, plus readers of its version in `changed_games` ({key: game}) when given
+        (newly added games, or games whose teams changed).
+        """
+        out: set[tuple] = set()
+        found = self.games(changed_keys)
+        for key in changed_keys:
+            versions = [found[key]] if key in found else []
+            if changed_games and key in changed_games:
+                g = changed_games[key]
+                versions.append(("reg" if g.get("stageIndex") == 1 else "pre", g))
+            for phase, g in versions:
+                out |= self.artifacts_for_game(phase, g.get("homeTeamName"), g.get("awayTeamName"))
+        return out
+
+    def dirty_teams(self, changed_keys, kind: str | None = None, changed_games: dict | None = None) -> set[str]:
+        return {team for k, team in self.affected(changed_keys, changed_games) if kind is None or k == kind}
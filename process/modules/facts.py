@@ -0,0 +1,204 @@
+# process/modules/facts.py — per-team season facts for the story prompt
+#
+#   facts = season_facts(processed)          -> {team: {...}} for every team, one pass
+#   team_digest(processed, "Dallas Cowboys") -> ["Streaks: longest W5 (Wk3-Wk8), ...", ...]
+#   season_facts(processed, state=season_hash_for(path).phase("reg"))   # no rehash when cached
+#
+# Streaks, one-score games, biggest margins, division series and tiebreak edges are computed
+# here instead of being left to the model to spot in the raw game lines. Everything is derived
+# from padded team × game arrays, so all 32 teams cost one set of NumPy reductions. Results are
+# cached per regular-season state: the caller's season_hash digest when it has the file, else
+# a hash of every indexed game.
+from __future__ import annotations
+
+import hashlib
+
+import numpy as np
+
+from .season_index import SeasonIndex
+from .tiebreaks import (CONF_DIV, TEAM_ABBR, compare_division_tiebreak, compare_wildcard_tiebreak,
+                        pair_records)
+
+ONE_SCORE = 8           # margin a single touchdown + two-point conversion can erase
+_CACHE_STATES = 4       # season states kept (the current one plus a few what-if / older ones)
+_cache: dict = {}
+
+
+def season_state(index: SeasonIndex) -> str:
+    """Digest of every indexed game's id, week, teams, scores and status (when no state is given)."""
+    h = hashlib.blake2b(digest_size=12)
+    for g in index.games:
+        h.update(repr((g.schedule_id, g.week, g.home, g.away, g.home_score, g.away_score, g.status)).encode())
+    return h.hexdigest()
+
+
+def _longest_run(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Per row: length of the longest run of True and the column where it ends."""
+    c = np.cumsum(mask, axis=1)
+    reset = np.maximum.accumulate(np.where(~mask, c, 0), axis=1)
+    run = c - reset
+    return run.max(axis=1), run.argmax(axis=1)
+
+
+def _game_arrays(index: SeasonIndex, teams: list[str]):
+    """Padded [team, k-th final game] arrays: margin, week, opponent index, home flag (valid = played)."""
+    pos = {t: i for i, t in enumerate(teams)}
+    rows = [index.final_games(t) for t in teams]
+    n, g = len(teams), max((len(r) for r in rows), default=0)
+    margin = np.zeros((n, g), dtype=np.int32)
+    week = np.zeros((n, g), dtype=np.int32)
+    opp = np.zeros((n, g), dtype=np.int32)
+    home = np.zeros((n, g), dtype=bool)
+    valid = np.zeros((n, g), dtype=bool)
+    for i, (t, games) in enumerate(zip(teams, rows)):
+        for k, x in enumerate(games):          # by_team lists are in week order
+            is_home = x.home == t
+            margin[i, k] = (x.home_score - x.away_score) * (1 if is_home else -1)
+            week[i, k], opp[i, k], home[i, k], valid[i, k] = x.week, pos[x.away if is_home else x.home], is_home, True
+    return margin, week, opp, home, valid
+
+
+def _streak_text(length: int, end: int, weeks: np.ndarray, kind: str) -> str:
+    if length < 2:
+        return f"{kind}{length}" if length else ""
+    return f"{kind}{length} (Wk{weeks[end - length + 1]}-Wk{weeks[end]})"
+
+
+def _run_weeks(length: int, end: int, weeks: np.ndarray) -> tuple[int, int, int]:
+    """(length, first week, last week) of a streak; weeks are 0 when there is none."""
+    return (length, int(weeks[end - length + 1]), int(weeks[end])) if length else (0, 0, 0)
+
+
+def _division_series(index: SeasonIndex, team: str) -> list[str]:
+    """'swept NYG 2-0', 'split with DAL 1-1', 'WAS 1-0 (1 left)' for every division rival."""
+    conf_div = CONF_DIV.get(team)
+    out = []
+    for other in sorted(t for t, cd in CONF_DIV.items() if cd == conf_div and t != team):
+        games = [g for g in index.by_team.get(team, []) if other in (g.home, g.away)]
+        if not games:
+            continue
+        w = l = t = left = 0
+        for g in games:
+            if not g.final:
+                left += 1
+                continue
+            m = (g.home_score - g.away_score) * (1 if g.home == team else -1)
+            w, l, t = w + (m > 0), l + (m < 0), t + (m == 0)
+        rec = f"{w}-{l}" + (f"-{t}" if t else "")
+        ab = TEAM_ABBR.get(other, other)
+        if left:
+            out.append(f"{ab} {rec} ({left} left)")
+        elif w == len(games) and w > 1:
+            out.append(f"swept {ab} {rec}")
+        elif l == len(games) and l > 1:
+            out.append(f"swept by {ab} {rec}")
+        else:
+            out.append(f"{'split with' if w == l else 'vs'} {ab} {rec}")
+    return out
+
+
+def _tiebreak_edges(processed: dict, R, index: SeasonIndex, team: str) -> list[str]:
+    """Current edge against conference rivals whose final win range still overlaps the team's."""
+    if team not in CONF_DIV:
+        return []
+    conf, div = CONF_DIV[team]
+    lo = R.wins(team)
+    hi = lo + len(index.remaining_games(team))
+    out = []
+    for other in sorted(t for t, (c, _) in CONF_DIV.items() if c == conf and t != team and t in index.by_team):
+        o_lo = R.wins(other)
+        if not (o_lo <= hi and lo <= o_lo + len(index.remaining_games(other))):
+            continue
+        cmp = compare_division_tiebreak if CONF_DIV[other][1] == div else compare_wildcard_tiebreak
+        for name, res, *_ in cmp(processed, team, other, R):
+            if res in ("A", "B"):
+                winner, loser = (team, other) if res == "A" else (other, team)
+                out.append(f"{TEAM_ABBR.get(winner, winner)} over {TEAM_ABBR.get(loser, loser)} ({name.lower()})")
+                break
+    return out
+
+
+def season_facts(processed: dict, index: SeasonIndex | None = None, state: str | None = None) -> dict:
+    """{team: facts} for every team; cached per `state` (a digest of the regular season)."""
+    if state is not None:
+        hit = _cache.get(state)
+        if hit is not None:
+            return hit
+    index = index or SeasonIndex.from_processed(processed)
+    state = state or season_state(index)
+    hit = _cache.get(state)
+    if hit is not None:
+        return hit
+
+    teams = index.teams
+    margin, week, opp, home, valid = _game_arrays(index, teams)
+    win, loss = valid & (margin > 0), valid & (margin < 0)
+    w_len, w_end = _longest_run(win)
+    l_len, l_end = _longest_run(loss)
+    close = valid & (np.abs(margin) <= ONE_SCORE)
+    close_rec = np.stack([(close & (margin > 0)).sum(1), (close & (margin < 0)).sum(1),
+                          (close & (margin == 0)).sum(1)], axis=1)
+    big_w = np.where(win, margin, np.iinfo(np.int32).min).argmax(1)
+    big_l = np.where(loss, margin, np.iinfo(np.int32).max).argmin(1)
+    n_played = valid.sum(1)
+
+    R = pair_records(processed)
+    facts = {}
+    for i, t in enumerate(teams):
+        played = int(n_played[i])
+        res = np.where(win[i, :played], "W", np.where(loss[i, :played], "L", "T"))
+        cur = 0
+        while cur < played and res[played - 1 - cur] == res[played - 1]:
+            cur += 1
+
+        def game(k):
+            ab = TEAM_ABBR.get(teams[opp[i, k]], teams[opp[i, k]])
+            m = int(margin[i, k])
+            return {"week": int(week[i, k]), "opp": teams[opp[i, k]], "home": bool(home[i, k]), "margin": m,
+                    "text": f"Wk{week[i, k]} {'v ' if home[i, k] else '@'}{ab} {m:+d}"}
+
+        facts[t] = {
+            "longest_win_streak": _streak_text(int(w_len[i]), int(w_end[i]), week[i], "W"),
+            "longest_loss_streak": _streak_text(int(l_len[i]), int(l_end[i]), week[i], "L"),
+            "win_run": _run_weeks(int(w_len[i]), int(w_end[i]), week[i]),
+            "loss_run": _run_weeks(int(l_len[i]), int(l_end[i]), week[i]),
+            "current_streak": f"{res[played - 1]}{cur}" if played else "",
+            "one_score": tuple(int(x) for x in close_rec[i]),
+            "biggest_win": game(big_w[i]) if win[i].any() else None,
+            "biggest_loss": game(big_l[i]) if loss[i].any() else None,
+            "division": _division_series(index, t),
+            "edges": _tiebreak_edges(processed, R, index, t),
+        }
+
+    while len(_cache) >= _CACHE_STATES:
+        _cache.pop(next(iter(_cache)))
+    _cache[state] = facts
+    return facts
+
+
+def team_digest(processed: dict, team: str, index: SeasonIndex | None = None,
+                state: str | None = None) -> list[str]:
+    """Compact prompt lines for one team ([] when it has no games); kept with the cached facts."""
+    f = season_facts(processed, index, state).get(team)
+    if not f:
+        return []
+    if "digest" in f:
+        return f["digest"]
+    streaks = ", ".join(x for x in (f"longest {f['longest_win_streak']}" if f["longest_win_streak"] else "",
+                                    f"longest {f['longest_loss_streak']}" if f["longest_loss_streak"] else "",
+                                    f"current {f['current_streak']}" if f["current_streak"] else "") if x)
+    w, l, t = f["one_score"]
+    lines = []
+    if streaks:
+        lines.append(f"Streaks: {streaks}")
+    lines.append(f"One-score games (<= {ONE_SCORE}): {w}-{l}" + (f"-{t}" if t else ""))
+    big = [f"{label} {g['text']}" for label, g in (("biggest win", f["biggest_win"]),
+                                                   ("biggest loss", f["biggest_loss"])) if g]
+    if big:
+        lines.append("Margins: " + "; ".join(big))
+    if f["division"]:
+        lines.append("Division series: " + ", ".join(f["division"]))
+    if f["edges"]:
+        lines.append("Tiebreak edges: " + ", ".join(f["edges"]))
+    f["digest"] = lines
+    return lines
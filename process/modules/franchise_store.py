@@ -0,0 +1,293 @@
+# process/modules/franchise_store.py — multi-season SQLite store with indexed queries
+#
+#   python -m process.modules.franchise_store ingest data/raw/schedulesPS5.json data/raw/teamsPS5.json
+#   python -m process.modules.franchise_store h2h "Seattle Seahawks" "San Francisco 49ers"
+#
+# Each raw export is ingested by its own seasonIndex/stageIndex, so older seasons stay queryable
+# without keeping every season's JSON in memory. Rosters live in a compact `players` table that is
+# synced incrementally from each teams export.
+from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+from paths import FRANCHISE_DB
+
+FINAL_STATUSES = (2, 3)
+REG_STAGE = 1
+REG_SEASON_WEEKS = 18  # weekIndex >= 18 in stage 1 are playoff rounds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    season      INTEGER NOT NULL,
+    stage       INTEGER NOT NULL,
+    week        INTEGER NOT NULL,
+    schedule_id INTEGER NOT NULL,
+    home        TEXT    NOT NULL,
+    away        TEXT    NOT NULL,
+    home_score  INTEGER,
+    away_score  INTEGER,
+    status      INTEGER,
+    PRIMARY KEY (season, stage, schedule_id)
+);
+CREATE INDEX IF NOT EXISTS idx_games_season_week ON games (season, week);
+
+-- one row per team per game; keeps team / pair queries on an index
+CREATE TABLE IF NOT EXISTS team_games (
+    season      INTEGER NOT NULL,
+    stage       INTEGER NOT NULL,
+    week        INTEGER NOT NULL,
+    schedule_id INTEGER NOT NULL,
+    team        TEXT    NOT NULL,
+    opp         TEXT    NOT NULL,
+    is_home     INTEGER NOT NULL,
+    pf          INTEGER,
+    pa          INTEGER,
+    result      TEXT,               -- 'W' / 'L' / 'T', NULL while unplayed
+    PRIMARY KEY (season, stage, schedule_id, team)
+);
+CREATE INDEX IF NOT EXISTS idx_tg_season_week_team ON team_games (season, week, team);
+CREATE INDEX IF NOT EXISTS idx_tg_team ON team_games (team, season, stage, week);
+CREATE INDEX IF NOT EXISTS idx_tg_pair ON team_games (team, opp);
+
+-- current rosters (latest teams export); digest lets re-syncs skip unchanged players
+CREATE TABLE IF NOT EXISTS players (
+    roster_id   INTEGER PRIMARY KEY,
+    player_key  TEXT    NOT NULL,   -- generate_names.make_player_key (unique within the team)
+    team        TEXT    NOT NULL,
+    position    TEXT,
+    jersey      INTEGER,
+    first_name  TEXT,
+    last_name   TEXT,
+    overall     INTEGER,
+    ratings     TEXT,               -- JSON object of the export's *Rating fields
+    digest      TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_players_team ON players (team, overall DESC);
+CREATE INDEX IF NOT EXISTS idx_players_position ON players (position, overall DESC);
+"""
+
+
+def connect(db_path: Path = FRANCHISE_DB, readonly: bool = False) -> sqlite3.Connection:
+    """
+    Writable connection with the schema ensured, or (readonly=True) a read-only one that never
+    creates the file: a missing store raises sqlite3.OperationalError instead.
+    """
+    if readonly:
+        return sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+    con = sqlite3.connect(str(db_path))
+    con.executescript(_SCHEMA)
+    return con
+
+
+@contextmanager
+def _db(db_path: Path, readonly: bool = False):
+    """Connection that commits on success and is always closed."""
+    con = connect(db_path, readonly)
+    try:
+        with con:
+            yield con
+    finally:
+        con.close()
+
+
+def _result(pf, pa, status):
+    if status not in FINAL_STATUSES or pf is None or pa is None:
+        return None
+    return "W" if pf > pa else "L" if pf < pa else "T"
+
+
+def ingest_schedule(schedules_named: dict, db_path: Path = FRANCHISE_DB) -> int:
+    """
+    Upsert every named game of a transformed schedule (generate_names.transform_schedule output,
+    i.e. the raw phase -> weeks -> games lists with homeTeamName/awayTeamName added).
+    Returns the number of games written.
+    """
+    game_rows, team_rows = [], []
+    for weeks in (schedules_named or {}).values():
+        for wk in weeks or []:
+            if not isinstance(wk, list):
+                continue
+            for g in wk:
+                if not isinstance(g, dict):
+                    continue
+                home, away = g.get("homeTeamName"), g.get("awayTeamName")
+                sid, season, stage, week = (g.get("scheduleId"), g.get("seasonIndex"),
+                                            g.get("stageIndex"), g.get("weekIndex"))
+                if not isinstance(home, str) or not isinstance(away, str) or None in (sid, season, stage, week):
+                    continue
+                hs, as_, st = g.get("homeScore"), g.get("awayScore"), g.get("status")
+                game_rows.append((season, stage, week, sid, home, away, hs, as_, st))
+                team_rows.append((season, stage, week, sid, home, away, 1, hs, as_, _result(hs, as_, st)))
+                team_rows.append((season, stage, week, sid, away, home, 0, as_, hs, _result(as_, hs, st)))
+    with _db(db_path) as con:
+        con.executemany("INSERT OR REPLACE INTO games VALUES (?,?,?,?,?,?,?,?,?)", game_rows)
+        con.executemany("INSERT OR REPLACE INTO team_games VALUES (?,?,?,?,?,?,?,?,?,?)", team_rows)
+    return len(game_rows)
+
+
+def ingest_raw_files(schedules_path: Path, teams_path: Path, db_path: Path = FRANCHISE_DB) -> int:
+    """Ingest one season's raw companion-app export pair."""
+    from .generate_names import transform_teams, transform_schedule, load_json
+    _, id_to_name = transform_teams(load_json(teams_path))
+    return ingest_schedule(transform_schedule(load_json(schedules_path), id_to_name), db_path)
+
+
+# ---------- rosters ----------
+_OVERALL_KEYS = ("playerBestOvr", "overallRating", "playerSchemeOvr", "ovr")
+
+
+def _player_row(team: str, pkey: str, p: dict) -> tuple:
+    overall = next((p[k] for k in _OVERALL_KEYS if isinstance(p.get(k), (int, float))), None)
+    ratings = {k: v for k, v in p.items() if k.endswith("Rating") and isinstance(v, (int, float))}
+    row = (p.get("rosterId"), pkey, team, p.get("position"), p.get("jerseyNum"),
+           p.get("firstName"), p.get("lastName"), overall, json.dumps(ratings, sort_keys=True))
+    digest = hashlib.blake2b(repr(row).encode("utf-8"), digest_size=8).hexdigest()
+    return row + (digest,)
+
+
+def sync_rosters(teams_named: dict, db_path: Path = FRANCHISE_DB) -> dict:
+    """
+    Incrementally mirror generate_names.transform_teams output ({team: {..., "roster": {key: player}}})
+    into `players`: only new or changed players are written and players no longer on any roster
+    are removed. Returns {"added", "updated", "removed", "unchanged"} counts.
+    """
+    incoming = {}
+    for team, team_obj in (teams_named or {}).items():
+        for pkey, p in ((team_obj or {}).get("roster") or {}).items():
+            if isinstance(p, dict) and p.get("rosterId") is not None:
+                incoming[p["rosterId"]] = _player_row(team, pkey, p)
+
+    with _db(db_path) as con:
+        existing = dict(con.execute("SELECT roster_id, digest FROM players"))
+        changed = [row for rid, row in incoming.items() if existing.get(rid) != row[-1]]
+        removed = [(rid,) for rid in existing.keys() - incoming.keys()]
+        con.executemany("INSERT OR REPLACE INTO players VALUES (?,?,?,?,?,?,?,?,?,?)", changed)
+        con.executemany("DELETE FROM players WHERE roster_id = ?", removed)
+    added = sum(1 for row in changed if row[0] not in existing)
+    return {"added": added, "updated": len(changed) - added, "removed": len(removed),
+            "unchanged": len(incoming) - len(changed)}
+
+
+def _player_dicts(cur) -> list[dict]:
+    cols = [c[0] for c in cur.description]
+    out = []
+    for r in cur:
+        d = dict(zip(cols, r))
+        if "ratings" in d:
+            d["ratings"] = json.loads(d["ratings"] or "{}")
+        out.append(d)
+    return out
+
+
+def key_players(team: str, n: int = 5, db_path: Path = FRANCHISE_DB) -> list[dict]:
+    """Highest-rated players on a team (uses idx_players_team)."""
+    with _db(db_path, readonly=True) as con:
+        cur = con.execute("SELECT roster_id, player_key, position, jersey, first_name, last_name, overall"
+                          " FROM players WHERE team = ? AND overall IS NOT NULL"
+                          " ORDER BY overall DESC LIMIT ?", (team, n))
+        return _player_dicts(cur)
+
+
+def players_by_position(position: str, team: str | None = None, db_path: Path = FRANCHISE_DB) -> list[dict]:
+    """Players at a position (optionally on one team), best first, ratings included."""
+    q = "SELECT * FROM players WHERE position = ?" + (" AND team = ?" if team else "") + " ORDER BY overall DESC"
+    with _db(db_path, readonly=True) as con:
+        return [{k: v for k, v in d.items() if k != "digest"}
+                for d in _player_dicts(con.execute(q, (position, team) if team else (position,)))]
+
+
+def format_key_players(team: str, n: int = 5, db_path: Path = FRANCHISE_DB) -> str:
+    """'QB Joe Burrow (#9, 94 OVR), WR ...' or '' when no roster has been synced."""
+    try:
+        players = key_players(team, n, db_path)
+    except sqlite3.Error:
+        return ""
+    return ", ".join(
+        f"{p['position'] or '?'} {p['player_key']}"
+        + (f" (#{p['jersey']}, {p['overall']} OVR)" if p["jersey"] is not None else f" ({p['overall']} OVR)")
+        for p in players)
+
+
+# ---------- queries ----------
+def _reg_filter(regular_only: bool) -> str:
+    """Preseason never counts; regular_only also drops the playoff rounds."""
+    return f" AND stage = {REG_STAGE}" + (f" AND week < {REG_SEASON_WEEKS}" if regular_only else "")
+
+
+def seasons(db_path: Path = FRANCHISE_DB) -> list[int]:
+    with _db(db_path, readonly=True) as con:
+        return [r[0] for r in con.execute("SELECT DISTINCT season FROM games ORDER BY season")]
+
+
+def season_record(team: str, season: int, *, regular_only: bool = True,
+                  db_path: Path = FRANCHISE_DB) -> dict:
+    """{"w", "l", "t", "pf", "pa"} for one team in one season."""
+    q = ("SELECT COALESCE(SUM(result='W'),0), COALESCE(SUM(result='L'),0), COALESCE(SUM(result='T'),0),"
+         " COALESCE(SUM(pf),0), COALESCE(SUM(pa),0)"
+         " FROM team_games WHERE team = ? AND season = ? AND result IS NOT NULL" + _reg_filter(regular_only))
+    with _db(db_path, readonly=True) as con:
+        w, l, t, pf, pa = con.execute(q, (team, season)).fetchone()
+    return {"w": w, "l": l, "t": t, "pf": pf, "pa": pa}
+
+
+def season_records(team: str, *, regular_only: bool = True, db_path: Path = FRANCHISE_DB) -> list[dict]:
+    """Per-season records for a team, oldest first."""
+    q = ("SELECT season, SUM(result='W'), SUM(result='L'), SUM(result='T'), SUM(pf), SUM(pa)"
+         " FROM team_games WHERE team = ? AND result IS NOT NULL" + _reg_filter(regular_only) +
+         " GROUP BY season ORDER BY season")
+    with _db(db_path, readonly=True) as con:
+        return [{"season": s, "w": w, "l": l, "t": t, "pf": pf, "pa": pa}
+                for s, w, l, t, pf, pa in con.execute(q, (team,))]
+
+
+def head_to_head(a: str, b: str, *, regular_only: bool = False, db_path: Path = FRANCHISE_DB) -> dict:
+    """All-time head-to-head (regular season + playoffs by default) from a's point of view, oldest game first."""
+    q = ("SELECT season, stage, week, is_home, pf, pa, result FROM team_games"
+         " WHERE team = ? AND opp = ? AND result IS NOT NULL" + _reg_filter(regular_only) +
+         " ORDER BY season, stage, week")
+    with _db(db_path, readonly=True) as con:
+        rows = con.execute(q, (a, b)).fetchall()
+    out = {"w": 0, "l": 0, "t": 0, "pf": 0, "pa": 0, "games": []}
+    for season, stage, week, is_home, pf, pa, res in rows:
+        out[res.lower()] += 1
+        out["pf"] += pf; out["pa"] += pa
+        out["games"].append({"season": season, "stage": stage, "week": week,
+                             "home": bool(is_home), "pf": pf, "pa": pa, "result": res})
+    return out
+
+
+def streaks(team: str, *, regular_only: bool = True, db_path: Path = FRANCHISE_DB) -> dict:
+    """Current streak plus the longest win / loss streaks across every ingested season."""
+    q = ("SELECT result FROM team_games WHERE team = ? AND result IS NOT NULL" + _reg_filter(regular_only) +
+         " ORDER BY season, stage, week")
+    with _db(db_path, readonly=True) as con:
+        results = [r[0] for r in con.execute(q, (team,))]
+    longest = {"W": 0, "L": 0}
+    run_res, run_len = None, 0
+    for r in results:
+        run_len = run_len + 1 if r == run_res else 1
+        run_res = r
+        if r in longest:
+            longest[r] = max(longest[r], run_len)
+    return {"current": f"{run_res}{run_len}" if run_res else "",
+            "longest_win": longest["W"], "longest_loss": longest["L"]}
+
+
+def main(argv: list[str]):
+    if len(argv) >= 3 and argv[0] == "ingest":
+        n = ingest_raw_files(Path(argv[1]), Path(argv[2]))
+        print(f"Ingested {n} games into {FRANCHISE_DB}")
+    elif len(argv) == 3 and argv[0] == "h2h":
+        print(json.dumps(head_to_head(argv[1], argv[2]), indent=2))
+    elif len(argv) == 2 and argv[0] == "team":
+        print(json.dumps({"seasons": season_records(argv[1]), "streaks": streaks(argv[1])}, indent=2))
+    else:
+        print("usage: ingest <schedules.json> <teams.json> | h2h <team> <team> | team <team>")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,5 +1,9 @@
 import json, os
+import tempfile
 from pathlib import Path
+from instrumentation import timed
+from .validate import check_raw_exports
+from .schedule_view import INDEX_KEY, PHASES, build_index, find_game, has_index, labelled_games, matchup_view
 
 # ==============================
 # Setup paths
@@ -34,6 +38,40 @@ def make_team_name(team_obj, style="city_display"):
         return f"{city} {display}"
     return display or city or abbr
 
+class KeyAllocator:
+    """
+    Hands out unique keys. Each base name remembers the next suffix number to try,
+    so the n-th duplicate of a name costs O(1) instead of re-probing 2, 3, ... n.
+    """
+
+    def __init__(self):
+        self.used = set()
+        self._next = {}
+
+    def __contains__(self, key):
+        return key in self.used
+
+    def take(self, key) -> bool:
+        """Claim `key` if it is free; returns False when it is already taken."""
+        if key in self.used:
+            return False
+        self.used.add(key)
+        return True
+
+    def numbered(self, base, fmt="{base} [{n}]", start=2):
+        """Claim base if free, else the first free fmt(base, n) from the remembered counter."""
+        if self.take(base):
+            return base
+        n = self._next.get((base, fmt), start)
+        key = fmt.format(base=base, n=n)
+        while key in self.used:      # only when a literal "base [n]" already exists
+            n += 1
+            key = fmt.format(base=base, n=n)
+        self.used.add(key)
+        self._next[(base, fmt)] = n + 1
+        return key
+
+
 def make_player_key(player_obj, used=None):
     first = (player_obj.get("firstName") or "").strip()
     last = (player_obj.get("lastName") or "").strip()
@@ -42,21 +80,19 @@ def make_player_key(player_obj, used=None):
 
     base = f"{first} {last}".strip() or str(roster_id)
 
-    # Ensure uniqueness
+    # Ensure uniqueness: name, then "name (#jersey)", then "name (rosterId)"
     if used is not None:
-        if base not in used:
-            used.add(base)
+        if isinstance(used, set):
+            # legacy callers passing a plain set
+            alloc = KeyAllocator()
+            alloc.used = used
+            used = alloc
+        if used.take(base):
             return base
-        # Try jersey number
-        if jersey is not None:
-            key2 = f"{base} (#{jersey})"
-            if key2 not in used:
-                used.add(key2)
-                return key2
-        # Fallback to rosterId
+        if jersey is not None and used.take(f"{base} (#{jersey})"):
+            return f"{base} (#{jersey})"
         key3 = f"{base} ({roster_id})"
-        used.add(key3)
-        return key3
+        return key3 if used.take(key3) else used.numbered(key3)
 
     return base
 
@@ -67,16 +103,13 @@ def make_player_key(player_obj, used=None):
 def transform_teams(teams_data, team_name_style="city_display"):
     transformed = {}
     team_id_to_name = {}
+    team_keys = KeyAllocator()
 
     for team_id, team_obj in teams_data.items():
         name = make_team_name(team_obj, style=team_name_style)
 
-        # Ensure unique team keys
-        final_name = name
-        suffix = 2
-        while final_name in transformed:
-            final_name = f"{name} [{suffix}]"
-            suffix += 1
+        # Ensure unique team keys ("Name", "Name [2]", "Name [3]", ...)
+        final_name = team_keys.numbered(name)
 
         # Map teamId -> name
         try:
@@ -84,17 +117,13 @@ def transform_teams(teams_data, team_name_style="city_display"):
         except:
             team_id_to_name[team_id] = final_name
 
-        # Transform roster
+        # Transform roster (player dicts are shared with the raw export, not copied)
         roster = team_obj.get("roster") or {}
-        used_names = set()
-        new_roster = {}
-        for pid, player in roster.items():
-            pkey = make_player_key(player, used=used_names)
-            new_roster[pkey] = player
+        player_keys = KeyAllocator()
+        new_roster = {make_player_key(player, used=player_keys): player for player in roster.values()}
 
-        new_team_obj = dict(team_obj)
-        new_team_obj["roster"] = new_roster
-        transformed[final_name] = new_team_obj
+        # Only the top level is new; every other value still points at the raw team object
+        transformed[final_name] = {**team_obj, "roster": new_roster}
 
     return transformed, team_id_to_name
 
@@ -141,12 +170,6 @@ def transform_schedule(schedule_data, id_to_name):
 
 # --- NEW: Weekly grouping helpers ---
 
-def _matchup_key(game: dict) -> str:
-    """Return 'Home Team vs Away Team' using the provided names."""
-    home = game.get("homeTeamName") or "Home"
-    away = game.get("awayTeamName") or "Away"
-    return f"{home} vs {away}"
-
 def _week_key(week_index: int) -> str:
     """Return 'Week #' string using the weekIndex as-is (0-based per your data)."""
     return f"Week {week_index}"
@@ -156,14 +179,13 @@ def group_phase_by_weeks(phase_weeks) -> dict:
     Given the raw structure for one phase (e.g., schedules['pre'] or schedules['reg']),
     return a dict like:
       {
-        "Week 0": {
-          "New England Patriots vs New York Giants": { ...full game dict... },
-          "Baltimore Ravens vs Tennessee Titans": { ... },
-          ...
-        },
-        "Week 1": { ... },
+        "Week 0": [ { ...full game dict... }, { ... }, ... ],
+        "Week 1": [ ... ],
         ...
       }
+    Games stay in a list so a pairing that repeats within a week (re-seeded playoff slots,
+    a re-imported game) is kept instead of overwriting the earlier one; the
+    "Home vs Away" label is available as schedule_view.matchup_view(...).
     The input phase_weeks is typically a list where each element is a list of game dicts.
     """
     out = {}
@@ -185,12 +207,7 @@ def group_phase_by_weeks(phase_weeks) -> dict:
                 # If missing, skip or place into a special bucket; here we skip
                 continue
 
-            wk_key = _week_key(widx)
-            m_key = _matchup_key(game)
-
-            if wk_key not in out:
-                out[wk_key] = {}
-            out[wk_key][m_key] = game
+            out.setdefault(_week_key(widx), []).append(game)
     return out
 
 def group_schedule_by_weeks(schedules_named: dict) -> dict:
@@ -198,8 +215,8 @@ def group_schedule_by_weeks(schedules_named: dict) -> dict:
     Transform the full schedules dict (which includes 'pre', 'reg', maybe 'post')
     into:
       {
-        "pre": { "Week 0": { "Home vs Away": game, ... }, "Week 1": { ... }, ... },
-        "reg": { "Week 0": { ... }, "Week 1": { ... }, ... }
+        "pre": { "Week 0": [game, ...], "Week 1": [...], ... },
+        "reg": { "Week 0": [...], "Week 1": [...], ... }
       }
     Only 'pre' and 'reg' are re-keyed per your request; other phases are passed through untouched.
     """
@@ -275,7 +292,8 @@ def rename_score_keys_in_phase_lists(phase_weeks, **opts):
 def rename_score_keys_in_grouped(grouped: dict, **opts) -> dict:
     """
     Apply rename_score_keys_in_game across your grouped-by-week schedule:
-      { "pre": { "Week #": { "Home vs Away": game, ... }, ... }, "reg": {...}, ... }
+      { "pre": { "Week #": [game, ...], ... }, "reg": {...}, ... }
+    (old { "Week #": { "Home vs Away": game } } weeks are handled too)
     """
     out = {}
     for phase, weeks in grouped.items():
@@ -284,6 +302,12 @@ def rename_score_keys_in_grouped(grouped: dict, **opts) -> dict:
             continue
         phase_out = {}
         for wk_key, matchups in weeks.items():
+            if isinstance(matchups, list):
+                phase_out[wk_key] = [
+                    rename_score_keys_in_game(game, **opts) if isinstance(game, dict) else game
+                    for game in matchups
+                ]
+                continue
             if not isinstance(matchups, dict):
                 phase_out[wk_key] = matchups
                 continue
@@ -296,31 +320,175 @@ def rename_score_keys_in_grouped(grouped: dict, **opts) -> dict:
         out[phase] = phase_out
     return out
 
+def name_schedule(teams: dict, schedules: dict) -> tuple[dict, dict]:
+    """Raw teams + schedules exports -> (named teams, raw schedule with homeTeamName/awayTeamName added)."""
+    teams_named, id_to_name = transform_teams(teams)
+    return teams_named, transform_schedule(schedules, id_to_name)
+
+def build_final_struct(schedules_named: dict) -> dict:
+    """Named schedule -> final grouped, renamed schedule structure."""
+    # 1) Group schedule by week and matchup ("Home vs Away")
+    schedules_grouped = group_schedule_by_weeks(schedules_named)
+
+    # 2) Rename score keys to "<Team Name> Score"
+    final_struct = rename_score_keys_in_grouped(schedules_grouped, keep_original=False)
+
+    # 3) Secondary indexes: scheduleId -> (phase, week, position), team -> scheduleIds
+    final_struct[INDEX_KEY] = build_index(final_struct)
+    return final_struct
+
+def keyed_games(final_struct: dict):
+    """
+    Yield (game key, phase, game). The key is the scheduleId, or "phase/week/label" when it is
+    missing (label as in schedule_view.matchup_view); a repeated scheduleId gets '#2', '#3', ...
+    """
+    seen = set()
+    for phase in PHASES:
+        weeks = (final_struct or {}).get(phase)
+        if not isinstance(weeks, dict):
+            continue
+        for wk_key, week in weeks.items():
+            for label, game in labelled_games(week):
+                sid = game.get("scheduleId")
+                key = base = str(sid) if sid is not None else f"{phase}/{wk_key}/{label}"
+                n = 2
+                while key in seen:
+                    key = f"{base}#{n}"
+                    n += 1
+                seen.add(key)
+                yield key, phase, game
+
+def games_by_key(final_struct: dict) -> dict:
+    """Map keyed_games(...) keys -> game for every grouped game."""
+    return {key: game for key, _, game in keyed_games(final_struct)}
+
+def games_for_keys(final_struct: dict, keys) -> dict:
+    """
+    {key: (phase, game)} for those of `keys` present in `final_struct`. scheduleId keys are
+    looked up through the "_index" (O(1) each) and id-less ones in their week's matchup_view;
+    only a repeated scheduleId ('#2', ...) needs a pass over the games.
+    """
+    out, rest = {}, set()
+    for key in keys:
+        if "/" in key:
+            phase, wk_key, label = key.split("/", 2)
+            game = matchup_view(final_struct, phase, wk_key).get(label)
+            if game is not None and game.get("scheduleId") is None:
+                out[key] = (phase, game)
+        elif "#" in key:
+            rest.add(key)
+        else:
+            hit = find_game(final_struct or {}, key)
+            if hit is not None:
+                out[key] = hit
+    if rest:
+        for key, phase, game in keyed_games(final_struct):
+            if key in rest:
+                out[key] = (phase, game)
+    return out
+
+def diff_final_structs(old: dict, new: dict) -> dict:
+    """
+    Compare two final structures game by game.
+    Returns {"games": {key: game}, "teams": {team names}} for added, removed or changed games.
+    """
+    old_games, new_games = games_by_key(old), games_by_key(new)
+    changed = {}
+    for key in old_games.keys() | new_games.keys():
+        a, b = old_games.get(key), new_games.get(key)
+        if a != b:
+            changed[key] = b if b is not None else a
+    teams = set()
+    for key in changed:
+        for g in (old_games.get(key), new_games.get(key)):
+            if g:
+                teams.update(t for t in (g.get("homeTeamName"), g.get("awayTeamName")) if t)
+    return {"games": changed, "teams": teams}
+
+def raw_signature() -> tuple:
+    """(name, mtime_ns, size) for every raw export; changes whenever a new export lands."""
+    sig = []
+    for p in sorted(RAW_DIR.glob("*.json")):
+        st = p.stat()
+        sig.append((p.name, st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+def write_final_json(final_struct: dict, path: Path) -> None:
+    """Write atomically (as season_bin.write_season_bin): readers see the old file or the new one, never half."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")   # one per writer
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(final_struct, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
 # ==============================
 # Main execution
 # ==============================
 
+@timed("generate_names.run")
 def run():
+    from .season_bin import write_season_bin
+    from .season_hash import remember   # both build on the helpers below
     # 1) Load raw inputs
     with open(RAW_DIR / "teamsPS5.json", "r", encoding="utf-8") as f:
         teams = json.load(f)
     with open(RAW_DIR / "schedulesPS5.json", "r", encoding="utf-8") as f:
         schedules = json.load(f)
+    check_raw_exports(teams, schedules)  # reject a bad export before any transform work
 
-    # 2) Build named structures
-    teams_named, id_to_name = transform_teams(teams)
-    schedules_named = transform_schedule(schedules, id_to_name)
+    # 2) Build the final structure
+    teams_named, schedules_named = name_schedule(teams, schedules)
+    final_struct = build_final_struct(schedules_named)
 
-    # 3) Group schedule by week and matchup ("Home vs Away")
-    schedules_grouped = group_schedule_by_weeks(schedules_named)
-
-    # 4) Rename score keys to "<Team Name> Score"
-    final_struct = rename_score_keys_in_grouped(schedules_grouped, keep_original=False)
-
-    # 5) Save ONLY the final output
+    # 3) Save ONLY the final output
     out_path = PROC_DIR / "schedulesPS5_final.json"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(final_struct, f, ensure_ascii=False, indent=2)
+    write_final_json(final_struct, out_path)
+    season = remember(out_path, final_struct)   # later freshness checks are a stat() away
+    write_season_bin(final_struct, out_path.with_suffix(".bin"), season.season)
 
     print(f"Saved final schedule to: {out_path}")
+    _ingest_into_franchise_store(teams_named, schedules_named)
+
+def _ingest_into_franchise_store(teams_named: dict, schedules_named: dict):
+    """
+    Keep the multi-season store in step with the current export (games by seasonIndex/stageIndex)
+    and mirror the rosters into its player table (only changed players are rewritten).
+    """
+    import sqlite3
+    from .franchise_store import ingest_schedule, sync_rosters
+    try:
+        ingest_schedule(schedules_named)
+        sync_rosters(teams_named)
+    except sqlite3.Error as e:
+        print(f"Franchise store not updated: {e}")
+
+def run_incremental() -> dict:
+    """
+    Like run(), but diffs the new output against the existing processed file and
+    only rewrites it when a game was added, removed or changed.
+    Returns diff_final_structs(...) so callers can invalidate just what depends on those games.
+    """
+    from .season_bin import write_season_bin
+    from .season_hash import remember, season_hash_for
+    teams = load_json(RAW_DIR / "teamsPS5.json")
+    schedules = load_json(RAW_DIR / "schedulesPS5.json")
+    check_raw_exports(teams, schedules)
+    teams_named, schedules_named = name_schedule(teams, schedules)
+    final_struct = build_final_struct(schedules_named)
 
+    out_path = PROC_DIR / "schedulesPS5_final.json"
+    previous = load_json(out_path) if out_path.exists() else {}
+    diff = diff_final_structs(previous, final_struct)
+
+    if diff["games"] or not has_index(previous):   # also upgrades older files (matchup-keyed weeks, index v1)
+        if previous:
+            season_hash_for(out_path, previous)      # so only the changed games are rehashed below
+        write_final_json(final_struct, out_path)
+        season = remember(out_path, final_struct, diff["games"])
+        write_season_bin(final_struct, out_path.with_suffix(".bin"), season.season)
+        print(f"Saved final schedule to: {out_path} ({len(diff['games'])} game(s) changed)")
+    _ingest_into_franchise_store(teams_named, schedules_named)  # rosters can change without games changing
+    return diff
@@ -0,0 +1,257 @@
+# process/modules/h2h.py — head-to-head, common-opponent and schedule-strength tables for every team pair
+from __future__ import annotations
+
+import numpy as np
+
+from .season_index import SeasonIndex
+
+
+def _pct(w, l, t):
+    """Win% with ties as half wins; works on scalars and arrays (0 when no games)."""
+    w, l, t = np.asarray(w, dtype=float), np.asarray(l, dtype=float), np.asarray(t, dtype=float)
+    gp = w + l + t
+    return np.divide(w + 0.5 * t, gp, out=np.zeros_like(gp), where=gp > 0)
+
+
+class H2HMatrix:
+    """
+    Dense N×N tables built in one pass over the regular season.
+    Row i, column j is from team i's point of view against team j:
+      W, L, T   finished games won / lost / tied
+      PF, PA    points for / against in those games
+      P         scheduled games not yet final (symmetric)
+    results[(i, j)] keeps the individual (pf, pa) scores in schedule order.
+    Everything derived (common opponents, division/conference records, SoV, SoS)
+    is computed for all teams at once with matrix products and cached.
+    """
+
+    def __init__(self, teams: list[str]):
+        self.teams = list(teams)
+        self.idx = {t: i for i, t in enumerate(self.teams)}
+        n = len(self.teams)
+        self.W, self.L, self.T, self.PF, self.PA, self.P = (np.zeros((n, n), dtype=np.int32) for _ in range(6))
+        self.results: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        self._cache: dict = {}
+
+    @classmethod
+    def from_index(cls, index: SeasonIndex, through_week: int | None = None) -> "H2HMatrix":
+        """Games from a SeasonIndex, optionally only weeks <= through_week (later games are ignored)."""
+        m = cls(index.teams)
+        idx = m.idx
+        games = [g for g in index.games if through_week is None or g.week <= through_week]
+        if not games:
+            return m
+        h = np.fromiter((idx[g.home] for g in games), dtype=np.intp, count=len(games))
+        a = np.fromiter((idx[g.away] for g in games), dtype=np.intp, count=len(games))
+        fin = np.fromiter((g.final for g in games), dtype=bool, count=len(games))
+        hs = np.fromiter((g.home_score if g.final else 0 for g in games), dtype=np.int32, count=len(games))
+        as_ = np.fromiter((g.away_score if g.final else 0 for g in games), dtype=np.int32, count=len(games))
+
+        np.add.at(m.P, (h[~fin], a[~fin]), 1)
+        np.add.at(m.P, (a[~fin], h[~fin]), 1)
+        h, a, hs, as_ = h[fin], a[fin], hs[fin], as_[fin]
+        for x, y, xs, ys in ((h, a, hs, as_), (a, h, as_, hs)):
+            np.add.at(m.W, (x[xs > ys], y[xs > ys]), 1)
+            np.add.at(m.L, (x[xs < ys], y[xs < ys]), 1)
+            np.add.at(m.T, (x[xs == ys], y[xs == ys]), 1)
+            np.add.at(m.PF, (x, y), xs)
+            np.add.at(m.PA, (x, y), ys)
+        for g in games:
+            if g.final:
+                i, j = idx[g.home], idx[g.away]
+                m.results.setdefault((i, j), []).append((g.home_score, g.away_score))
+                m.results.setdefault((j, i), []).append((g.away_score, g.home_score))
+        return m
+
+    @classmethod
+    def from_processed(cls, processed: dict) -> "H2HMatrix":
+        return cls.from_index(SeasonIndex.from_processed(processed))
+
+    def with_results(self, games) -> "H2HMatrix":
+        """
+        Copy with some pending games turned into results (Game tuples with final scores).
+        Derived tables are recomputed lazily on the copy; this matrix is left untouched.
+        """
+        m = H2HMatrix.__new__(H2HMatrix)
+        m.teams, m.idx = self.teams, self.idx
+        m.W, m.L, m.T, m.PF, m.PA, m.P = (x.copy() for x in (self.W, self.L, self.T, self.PF, self.PA, self.P))
+        m.results = dict(self.results)
+        m._cache = {}
+        for g in games:
+            i, j = self.idx[g.home], self.idx[g.away]
+            m.P[i, j] -= 1
+            m.P[j, i] -= 1
+            for x, y, xs, ys in ((i, j, g.home_score, g.away_score), (j, i, g.away_score, g.home_score)):
+                (m.W if xs > ys else m.L if xs < ys else m.T)[x, y] += 1
+                m.PF[x, y] += xs
+                m.PA[x, y] += ys
+                m.results[(x, y)] = m.results.get((x, y), []) + [(xs, ys)]
+        return m
+
+    def _cached(self, key, make):
+        if key not in self._cache:
+            self._cache[key] = make()
+        return self._cache[key]
+
+    # ---------- O(1) pair queries ----------
+    def __contains__(self, team: str) -> bool:
+        return team in self.idx
+
+    def record(self, a: str, b: str) -> tuple[int, int, int]:
+        """a's (W, L, T) against b."""
+        i, j = self.idx.get(a), self.idx.get(b)
+        if i is None or j is None:
+            return (0, 0, 0)
+        return (int(self.W[i, j]), int(self.L[i, j]), int(self.T[i, j]))
+
+    def games(self, a: str, b: str) -> list[tuple[int, int]]:
+        """a's (pf, pa) in each finished meeting with b."""
+        i, j = self.idx.get(a), self.idx.get(b)
+        return list(self.results.get((i, j), ())) if i is not None and j is not None else []
+
+    def leader(self, a: str, b: str) -> str:
+        """'A' / 'B' when one side leads the series, 'Tie' when level, 'None' when they have not met."""
+        w, l, t = self.record(a, b)
+        if w > l: return "A"
+        if l > w: return "B"
+        if w == l == t == 0: return "None"
+        return "Tie"
+
+    def status(self, a: str, b: str) -> dict:
+        """Same shape as tiebreaks.head_to_head_status, plus points."""
+        w, l, t = self.record(a, b)
+        i, j = self.idx.get(a), self.idx.get(b)
+        known = i is not None and j is not None
+        pending = int(self.P[i, j]) if known else 0
+        return {"a_w": w, "a_l": l, "a_t": t, "final_played": w + l + t, "pending": pending,
+                "clinched": pending == 0 and w != l,
+                "pf": int(self.PF[i, j]) if known else 0, "pa": int(self.PA[i, j]) if known else 0}
+
+    # ---------- all pairs at once ----------
+    def pair_table(self) -> dict:
+        """
+        Every unordered pair i < j in one vectorized step (496 pairs for 32 teams).
+        Returns parallel arrays: a, b (team indexes), w, l, t (a's view), pending,
+        leader (+1 a leads, -1 b leads, 0 level or unmet), clinched (no games left and not level).
+        """
+        a, b = np.triu_indices(len(self.teams), k=1)
+        w, l, t, p = self.W[a, b], self.L[a, b], self.T[a, b], self.P[a, b]
+        return {
+            "a": a, "b": b, "w": w, "l": l, "t": t, "pending": p,
+            "leader": np.sign(w - l), "clinched": (p == 0) & (w != l),
+        }
+
+    # ---------- opponents ----------
+    @property
+    def played(self) -> np.ndarray:
+        """Boolean N×N: i has a finished game against j."""
+        return self._cached("played", lambda: (self.W + self.L + self.T) > 0)
+
+    @property
+    def scheduled(self) -> np.ndarray:
+        """Games scheduled (finished + pending) between i and j."""
+        return self._cached("scheduled", lambda: self.W + self.L + self.T + self.P)
+
+    def common_table(self) -> dict:
+        """
+        Common opponents for every pair in three matrix products over the played-opponent matrix O:
+          n[a, b]        = (O @ O.T)[a, b]   opponents both a and b have finished games against
+          w/l/t[a, b]    = (W @ O.T)[a, b]   a's record against b's opponents = a's common-games record
+        a and b never count as their own common opponent (O has a zero diagonal).
+        """
+        def make():
+            O = self.played.astype(np.int32)
+            return {"n": O @ O.T, "w": self.W @ O.T, "l": self.L @ O.T, "t": self.T @ O.T}
+        return self._cached("common", make)
+
+    def common(self, a: str, b: str) -> tuple[tuple, tuple, int]:
+        """(a's common-games W/L/T, b's common-games W/L/T, number of common opponents)."""
+        i, j = self.idx.get(a), self.idx.get(b)
+        if i is None or j is None:
+            return (0, 0, 0), (0, 0, 0), 0
+        c = self.common_table()
+        rec = lambda x, y: (int(c["w"][x, y]), int(c["l"][x, y]), int(c["t"][x, y]))
+        return rec(i, j), rec(j, i), int(c["n"][i, j])
+
+    def group_common(self, group: list[str], scheduled: bool = True) -> tuple[dict, int]:
+        """
+        Opponents every club in `group` shares outside the group (scheduled opponents, or only
+        finished-game opponents with scheduled=False). Returns ({team: (W, L, T) against them},
+        the fewest such finished games any club in the group has).
+        """
+        def make():
+            ix = [self.idx[t] for t in group]
+            opp = (self.scheduled > 0) if scheduled else self.played
+            mask = np.logical_and.reduce(opp[ix], axis=0)
+            mask[ix] = False
+            w, l, t = self.W[ix] @ mask, self.L[ix] @ mask, self.T[ix] @ mask
+            recs = {team: (int(w[k]), int(l[k]), int(t[k])) for k, team in enumerate(group)}
+            return recs, min((sum(r) for r in recs.values()), default=0)
+        return self._cached(("group_common", tuple(group), scheduled), make)
+
+    # ---------- per-team vectors ----------
+    def _masks(self):
+        from .tiebreaks import CONF_DIV
+        conf = [CONF_DIV.get(t, ("", ""))[0] for t in self.teams]
+        div = [CONF_DIV.get(t, ("", "")) for t in self.teams]
+        same_conf = np.array([[a == b != "" for b in conf] for a in conf])
+        same_div = np.array([[a == b != ("", "") for b in div] for a in div])
+        return same_conf, same_div
+
+    def totals(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Overall (W, L, T) vectors."""
+        return self._cached("totals", lambda: (self.W.sum(1), self.L.sum(1), self.T.sum(1)))
+
+    def _group_records(self, kind: str):
+        def make():
+            same_conf, same_div = self._masks()
+            m = same_div if kind == "division" else same_conf
+            return ((self.W * m).sum(1), (self.L * m).sum(1), (self.T * m).sum(1))
+        return self._cached(kind, make)
+
+    def division_record(self, team: str) -> tuple[int, int, int]:
+        i = self.idx.get(team)
+        return tuple(int(v[i]) for v in self._group_records("division")) if i is not None else (0, 0, 0)
+
+    def conference_record(self, team: str) -> tuple[int, int, int]:
+        i = self.idx.get(team)
+        return tuple(int(v[i]) for v in self._group_records("conference")) if i is not None else (0, 0, 0)
+
+    def sov(self) -> np.ndarray:
+        """Strength of victory: combined win% of the teams each club beat (counted once per win)."""
+        def make():
+            w, l, t = self.totals()
+            return _pct(self.W @ w, self.W @ l, self.W @ t)
+        return self._cached("sov", make)
+
+    def sos(self) -> np.ndarray:
+        """Strength of schedule: combined win% of every scheduled opponent (once per game)."""
+        def make():
+            w, l, t = self.totals()
+            G = self.scheduled
+            return _pct(G @ w, G @ l, G @ t)
+        return self._cached("sos", make)
+
+    def wins(self, team: str) -> int:
+        i = self.idx.get(team)
+        return int(self.totals()[0][i]) if i is not None else 0
+
+    def remaining(self, team: str) -> int:
+        i = self.idx.get(team)
+        return int(self.P[i].sum()) if i is not None else 0
+
+
+_last: tuple = (None, None)
+
+
+def h2h_for(processed: dict) -> H2HMatrix:
+    """
+    Matrix for `processed`, rebuilt only when a different schedule object is passed in.
+    Callers that edit a schedule in place should build their own with H2HMatrix.from_processed.
+    """
+    global _last
+    src, m = _last
+    if src is not processed:
+        m = H2HMatrix.from_processed(processed)
+        _last = (processed, m)
+    return m
@@ -0,0 +1,135 @@
+# process/modules/http_client.py — one tuned, shared HTTP client for LLM calls
+#
+#   client = shared_http_client(concurrency=8)        # httpx.Client, reused by every backend call
+#   with borrowed(client): ...                        # one request on it (see shared_http_client)
+#   CONNECTION_STATS.snapshot()                       -> {"requests": 32, "connections": 4, "reused": 28, ...}
+#
+# Pool size follows the batch concurrency so parallel story requests never queue for a
+# connection, idle connections are kept alive between teams, and HTTP/2 (one connection,
+# many streams) is used when the optional `h2` package is installed and MADDEN_HTTP2=1.
+# Connection reuse is measured with httpcore's per-request trace hook: a request that opens
+# a TCP connection (and does a TLS handshake) is a new connection, every other one reused a warm one.
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+
+import httpx
+
+CONNECT_TIMEOUT = 10.0
+READ_TIMEOUT = 120.0     # long generations stream slowly
+WRITE_TIMEOUT = 30.0
+POOL_TIMEOUT = 60.0      # waiting for a free connection
+KEEPALIVE_EXPIRY = 90.0
+MIN_POOL = 4
+
+
+class ConnectionStats:
+    """Thread-safe counters fed by the httpcore trace extension."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = self.connections = self.tls_handshakes = 0
+
+    def trace(self, event: str, info: dict):
+        if event == "connection.connect_tcp.started":
+            with self._lock:
+                self.connections += 1
+        elif event == "connection.start_tls.started":
+            with self._lock:
+                self.tls_handshakes += 1
+
+    def on_request(self, request: httpx.Request):
+        request.extensions["trace"] = self.trace
+        with self._lock:
+            self.requests += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "connections": self.connections,
+                    "reused": max(self.requests - self.connections, 0), "tls_handshakes": self.tls_handshakes}
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        return (f"{s['requests']} request(s) over {s['connections']} connection(s) "
+                f"({s['reused']} reused, {s['tls_handshakes']} TLS handshake(s))")
+
+
+CONNECTION_STATS = ConnectionStats()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def make_http_client(concurrency: int = MIN_POOL, *, http2: bool | None = None,
+                     read_timeout: float = READ_TIMEOUT, stats: ConnectionStats = CONNECTION_STATS) -> httpx.Client:
+    """httpx.Client with a pool of `concurrency` keep-alive connections and explicit timeouts."""
+    size = max(concurrency, MIN_POOL)
+    if http2 is None:
+        http2 = os.getenv("MADDEN_HTTP2", "0").lower() in ("1", "true", "yes")
+    return httpx.Client(
+        http2=http2 and _http2_available(),
+        limits=httpx.Limits(max_connections=size, max_keepalive_connections=size,
+                            keepalive_expiry=KEEPALIVE_EXPIRY),
+        timeout=httpx.Timeout(connect=CONNECT_TIMEOUT, read=read_timeout, write=WRITE_TIMEOUT, pool=POOL_TIMEOUT),
+        event_hooks={"request": [stats.on_request]},
+    )
+
+
+_client: httpx.Client | None = None
+_client_size = 0
+_lock = threading.Lock()
+_in_use: dict = {}        # client -> requests currently borrowing it
+_retired: set = set()     # replaced clients still busy; closed by the last borrower
+
+
+def shared_http_client(concurrency: int = MIN_POOL) -> httpx.Client:
+    """
+    The process-wide client. Asking for more concurrency than the current pool allows swaps in
+    a bigger one; the old client is closed right away when idle, else when its last borrowed()
+    request finishes.
+    """
+    global _client, _client_size
+    idle = None
+    with _lock:
+        if _client is None or concurrency > _client_size:
+            old, _client = _client, make_http_client(concurrency)
+            _client_size = max(concurrency, MIN_POOL)
+            if old is not None:
+                if _in_use.get(old):
+                    _retired.add(old)
+                else:
+                    idle = old
+        client = _client
+    if idle is not None:
+        idle.close()
+    return client
+
+
+@contextmanager
+def borrowed(client: httpx.Client):
+    """Mark one request on `client`, so a shared client replaced meanwhile is not closed under it."""
+    with _lock:
+        _in_use[client] = _in_use.get(client, 0) + 1
+    try:
+        yield client
+    finally:
+        with _lock:
+            left = _in_use.pop(client) - 1
+            if left:
+                _in_use[client] = left
+            done = not left and client in _retired
+            if done:
+                _retired.discard(client)
+        if done:
+            client.close()
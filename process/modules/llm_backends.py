@@ -0,0 +1,335 @@
+# process/modules/llm_backends.py — where story text comes from
+#
+#   backend = get_backend()                      # MADDEN_LLM_BACKEND=openai (default) | compatible | fake
+#   text = complete_with_retry(backend, system, user, model="gpt-5-mini")
+#   for chunk in backend.stream(system, user, model=...): ...
+#
+# Backends:
+#   OpenAIBackend            OpenAI Responses API (OPENAI_API_KEY)
+#   OpenAICompatibleBackend  any /v1/chat/completions server (llama.cpp, vLLM, Ollama, LM Studio ...)
+#                            at MADDEN_LLM_BASE_URL
+#   FakeBackend              in-process, no network: configurable latency / jitter / error rate, for
+#                            load-testing concurrency, retries, caching and streaming
+#                            (MADDEN_FAKE_LATENCY, MADDEN_FAKE_JITTER, MADDEN_FAKE_ERROR_RATE)
+# Clients are created on first use, so importing this module (or story_gpt) never needs a key.
+# shared_backend() puts the OpenAI backends on http_client.shared_http_client(), one tuned
+# keep-alive pool for the whole process sized to the batch concurrency.
+from __future__ import annotations
+
+import abc
+import hashlib
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Iterator
+
+DEFAULT_BACKEND = "openai"
+DEFAULT_TIMEOUT = 120.0
+RETRIES = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+
+class BackendError(RuntimeError):
+    """A failed completion; `retryable` marks rate limits, timeouts and 5xx-style failures."""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class StoryBackend(abc.ABC):
+    """complete() returns the whole text; stream() yields it in pieces (default: one piece)."""
+    name = "base"
+
+    @property
+    def configured(self) -> bool:
+        """False when a call is certain to fail for missing settings (e.g. no API key)."""
+        return True
+
+    @abc.abstractmethod
+    def complete(self, system: str, user: str, *, model: str, timeout: float | None = None) -> str:
+        ...
+
+    def stream(self, system: str, user: str, *, model: str, timeout: float | None = None) -> Iterator[str]:
+        yield self.complete(system, user, model=model, timeout=timeout)
+
+    def close(self):
+        pass
+
+
+def _timeout_kw(timeout: float | None) -> dict:
+    # no per-call timeout: the client's own (for the shared client, its tuned httpx.Timeout) applies
+    return {} if timeout is None else {"timeout": timeout}
+
+
+def _openai_retryable(e: Exception) -> bool:
+    try:
+        import openai
+    except ImportError:
+        return False
+    return isinstance(e, (openai.RateLimitError, openai.APITimeoutError,
+                          openai.APIConnectionError, openai.InternalServerError))
+
+
+class OpenAIBackend(StoryBackend):
+    """
+    OpenAI Responses API. `http_client` (an httpx.Client) is passed through to the SDK when
+    given, and its timeouts are used; `timeout` applies to the SDK's own client otherwise.
+    """
+    name = "openai"
+
+    def __init__(self, api_key: str | None = None, http_client=None, timeout: float = DEFAULT_TIMEOUT):
+        self.api_key = api_key
+        self.http_client = http_client
+        self.timeout = timeout
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key or os.getenv("OPENAI_API_KEY"))
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    key = self.api_key or os.getenv("OPENAI_API_KEY")
+                    if not key:
+                        raise RuntimeError("OPENAI_API_KEY not set. Put it in .env or your environment.")
+                    from openai import OpenAI
+                    self._client = OpenAI(api_key=key, http_client=self.http_client, timeout=self._client_timeout(),
+                                          max_retries=0)   # retries are complete_with_retry's job
+        return self._client
+
+    def _client_timeout(self):
+        return self.http_client.timeout if self.http_client is not None else self.timeout
+
+    @contextmanager
+    def _session(self):
+        """The SDK client, with its shared HTTP pool borrowed for the duration of one call."""
+        from .http_client import borrowed
+        http = self.http_client
+        with borrowed(http) if http is not None else nullcontext():
+            yield self.client
+
+    def complete(self, system, user, *, model, timeout=None):
+        try:
+            with self._session() as client:
+                resp = client.responses.create(
+                    model=model,
+                    input=[{"role": "system", "content": system}, {"role": "user", "content": user}],
+                    **_timeout_kw(timeout),
+                )
+        except Exception as e:
+            if _openai_retryable(e):
+                raise BackendError(str(e), retryable=True) from e
+            raise
+        return resp.output_text
+
+    def stream(self, system, user, *, model, timeout=None):
+        try:
+            with self._session() as client:
+                events = client.responses.create(
+                    model=model,
+                    input=[{"role": "system", "content": system}, {"role": "user", "content": user}],
+                    stream=True, **_timeout_kw(timeout),
+                )
+                for ev in events:
+                    if getattr(ev, "type", "") == "response.output_text.delta":
+                        yield ev.delta
+        except Exception as e:
+            if _openai_retryable(e):
+                raise BackendError(str(e), retryable=True) from e
+            raise
+
+    def close(self):
+        if self._client is not None and self.http_client is None:
+            self._client.close()
+
+
+class OpenAICompatibleBackend(OpenAIBackend):
+    """Chat Completions against a local or self-hosted OpenAI-compatible server."""
+    name = "compatible"
+
+    def __init__(self, base_url: str | None = None, api_key: str | None = None, http_client=None,
+                 timeout: float = DEFAULT_TIMEOUT):
+        super().__init__(api_key, http_client, timeout)
+        self.base_url = base_url or os.getenv("MADDEN_LLM_BASE_URL", "http://localhost:8000/v1")
+
+    @property
+    def configured(self) -> bool:
+        return True   # local servers usually take any key
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(base_url=self.base_url,
+                                          api_key=self.api_key or os.getenv("MADDEN_LLM_API_KEY", "local"),
+                                          http_client=self.http_client, timeout=self._client_timeout(),
+                                          max_retries=0)
+        return self._client
+
+    def _messages(self, system, user):
+        return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+    def complete(self, system, user, *, model, timeout=None):
+        try:
+            with self._session() as client:
+                resp = client.chat.completions.create(model=model, messages=self._messages(system, user),
+                                                      **_timeout_kw(timeout))
+        except Exception as e:
+            if _openai_retryable(e):
+                raise BackendError(str(e), retryable=True) from e
+            raise
+        return resp.choices[0].message.content or ""
+
+    def stream(self, system, user, *, model, timeout=None):
+        try:
+            with self._session() as client:
+                chunks = client.chat.completions.create(model=model, messages=self._messages(system, user),
+                                                        stream=True, **_timeout_kw(timeout))
+                for ch in chunks:
+                    delta = ch.choices[0].delta.content if ch.choices else None
+                    if delta:
+                        yield delta
+        except Exception as e:
+            if _openai_retryable(e):
+                raise BackendError(str(e), retryable=True) from e
+            raise
+
+
+class FakeBackend(StoryBackend):
+    """
+    No network. Each call sleeps latency ± jitter seconds, fails with probability error_rate
+    (a retryable BackendError), and otherwise returns a deterministic narrative derived from
+    the prompt. stream() spreads the same sleep over `chunks` pieces.
+    """
+    name = "fake"
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, error_rate: float = 0.0,
+                 chunks: int = 8, seed: int | None = None):
+        self.latency, self.jitter, self.error_rate, self.chunks = latency, jitter, error_rate, chunks
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def _draw(self) -> tuple[float, bool]:
+        with self._lock:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            fail = self._rng.random() < self.error_rate
+            self.stats["calls"] += 1
+            self.stats["errors"] += fail
+            self.stats["in_flight"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+        return delay, fail
+
+    def _done(self):
+        with self._lock:
+            self.stats["in_flight"] -= 1
+
+    @staticmethod
+    def _text(user: str, model: str) -> str:
+        team = next((ln[6:].strip() for ln in user.splitlines() if ln.startswith("TEAM: ")), "The team")
+        digest = hashlib.blake2b(user.encode("utf-8"), digest_size=4).hexdigest()
+        return (f"Part 1: Season narrative\n\n{team} has had a season of swings ({model} fake {digest}). "
+                "The schedule lines tell the story of a club still fighting for position.")
+
+    def complete(self, system, user, *, model, timeout=None):
+        delay, fail = self._draw()
+        try:
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                raise BackendError(f"fake backend timed out after {timeout:.2f}s", retryable=True)
+            time.sleep(delay)
+            if fail:
+                raise BackendError("fake backend: simulated 503", retryable=True)
+            return self._text(user, model)
+        finally:
+            self._done()
+
+    def stream(self, system, user, *, model, timeout=None):
+        delay, fail = self._draw()
+        try:
+            text = self._text(user, model)
+            step = max(1, len(text) // self.chunks)
+            pieces = [text[i:i + step] for i in range(0, len(text), step)]
+            for i, piece in enumerate(pieces):
+                time.sleep(delay / len(pieces))
+                if fail and i == len(pieces) // 2:
+                    raise BackendError("fake backend: stream dropped", retryable=True)
+                yield piece
+        finally:
+            self._done()
+
+
+def get_backend(name: str | None = None, **kwargs) -> StoryBackend:
+    """Backend by name (default: MADDEN_LLM_BACKEND, else "openai")."""
+    name = (name or os.getenv("MADDEN_LLM_BACKEND") or DEFAULT_BACKEND).lower()
+    if name == "openai":
+        return OpenAIBackend(**kwargs)
+    if name in ("compatible", "openai-compatible", "local"):
+        return OpenAICompatibleBackend(**kwargs)
+    if name == "fake":
+        env = {k: float(os.environ[v]) for k, v in (("latency", "MADDEN_FAKE_LATENCY"), ("jitter", "MADDEN_FAKE_JITTER"),
+                                                  ("error_rate", "MADDEN_FAKE_ERROR_RATE")) if v in os.environ}
+        return FakeBackend(**{**env, **kwargs})
+    raise ValueError(f"Unknown LLM backend: {name!r} (openai, compatible, fake)")
+
+
+_shared: dict = {}
+_shared_lock = threading.Lock()
+
+
+def shared_backend(name: str | None = None, concurrency: int = 1) -> StoryBackend:
+    """
+    One backend per name for the whole process, so its client (and connection pool) is reused.
+    OpenAI backends run on the shared HTTP client; a larger `concurrency` grows its pool.
+    """
+    key = (name or os.getenv("MADDEN_LLM_BACKEND") or DEFAULT_BACKEND).lower()
+    with _shared_lock:
+        backend = _shared.get(key)
+        if backend is None:
+            backend = _shared[key] = get_backend(key)
+        if isinstance(backend, OpenAIBackend):
+            from .http_client import shared_http_client
+            http = shared_http_client(concurrency)
+            for b in _shared.values():   # every shared backend moves off a replaced pool before it is closed
+                if isinstance(b, OpenAIBackend) and b.http_client is not http:
+                    b.http_client, b._client = http, None   # SDK client is rebuilt on the new pool
+        return backend
+
+
+def complete_with_retry(backend: StoryBackend, system: str, user: str, *, model: str,
+                        timeout: float | None = None, retries: int = RETRIES, on_delta=None,
+                        stats: dict | None = None) -> str:
+    """
+    complete() (or stream() when `on_delta` is given: called with each piece) with exponential
+    backoff and full jitter on retryable errors. A retried stream starts over; on_delta is
+    called with None first so a consumer can discard the partial text.
+    """
+    attempt = 0
+    while True:
+        try:
+            if on_delta is None:
+                return backend.complete(system, user, model=model, timeout=timeout)
+            parts = []
+            for piece in backend.stream(system, user, model=model, timeout=timeout):
+                parts.append(piece)
+                on_delta(piece)
+            return "".join(parts)
+        except BackendError as e:
+            if not e.retryable or attempt >= retries:
+                raise
+            attempt += 1
+            if stats is not None:
+                stats["retries"] = stats.get("retries", 0) + 1
+            if on_delta is not None:
+                on_delta(None)
+            time.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))))
@@ -0,0 +1,67 @@
+# process/modules/odds.py
+from __future__ import annotations
+import random
+from collections import defaultdict
+
+from .scenario import game_id
+from .season_index import SeasonIndex
+from .tiebreaks import CONF_DIV
+
+
+def _pct(w: float, l: float, t: float) -> float:
+    gp = w + l + t
+    return (w + 0.5 * t) / gp if gp else 0.0
+
+
+def simulate_playoff_odds(index: SeasonIndex, n_sims: int = 1000, seed: int | None = None,
+                          probs: dict | None = None) -> dict:
+    """
+    Monte Carlo playoff odds. Each unplayed game is drawn from `probs` ({game id: (p_home, p_tie, p_away)},
+    e.g. ratings.RatingModel.game_probabilities) and is a coin flip when missing.
+    Seeds per conference: 4 division winners, then the 3 best remaining records.
+    Ties in win percentage are broken at random (no tiebreak rules applied here).
+    Returns {team: {"playoffs": p, "division": p, "top_seed": p}}.
+    """
+    rng = random.Random(seed)
+    teams = [t for t in index.teams if t in CONF_DIV]
+    base = {t: list(index.record(t)) for t in teams}
+    probs = probs or {}
+    remaining = []
+    for g in index.remaining_games():
+        if g.home in base and g.away in base:
+            p_home, p_tie, _ = probs.get(game_id(g), (0.5, 0.0, 0.5))
+            remaining.append((g.home, g.away, p_home, p_home + p_tie))
+
+    made = defaultdict(int)
+    div_won = defaultdict(int)
+    top = defaultdict(int)
+    for _ in range(n_sims):
+        rec = {t: list(v) for t, v in base.items()}
+        for home, away, p_home, p_not_away in remaining:
+            u = rng.random()
+            if u < p_home:
+                rec[home][0] += 1; rec[away][1] += 1
+            elif u < p_not_away:
+                rec[home][2] += 1; rec[away][2] += 1
+            else:
+                rec[away][0] += 1; rec[home][1] += 1
+        key = {t: (_pct(*rec[t]), rng.random()) for t in teams}
+
+        for conf in ("AFC", "NFC"):
+            conf_teams = [t for t in teams if CONF_DIV[t][0] == conf]
+            by_div = defaultdict(list)
+            for t in conf_teams:
+                by_div[CONF_DIV[t][1]].append(t)
+            winners = sorted((max(ts, key=key.get) for ts in by_div.values()), key=key.get, reverse=True)
+            rest = sorted((t for t in conf_teams if t not in winners), key=key.get, reverse=True)
+            for t in winners:
+                div_won[t] += 1
+                made[t] += 1
+            for t in rest[:3]:
+                made[t] += 1
+            if winners:
+                top[winners[0]] += 1
+
+    n = max(n_sims, 1)
+    return {t: {"playoffs": made[t] / n, "division": div_won[t] / n, "top_seed": top[t] / n}
+            for t in teams}
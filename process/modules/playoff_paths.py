@@ -0,0 +1,240 @@
+# process/modules/playoff_paths.py — every combination of remaining results that puts a team in
+#
+#   engine = ScenarioEngine.from_processed(processed)
+#   res = playoff_paths(engine, "Dallas Cowboys")
+#   res["status"]      -> "clinched" / "eliminated" / "alive" / "too many games"
+#   res["qualifying"]  -> number of result combinations (over the relevant games) that get Dallas in
+#   res["paths"]       -> [{game id: "home" | "away" | "tie"}, ...]; games left out of a path can go either way
+#   describe_path(res, res["paths"][0]) -> "Win at SF (Wk17); PHI beats NYG (Wk17)"
+#
+# How it stays small:
+#   1. Games that cannot move the team's seed are dropped up front (see relevant_games).
+#   2. Depth-first over the rest, the team's own games first. At every node the win% bounds
+#      of scenario.team_bounds decide clinched / eliminated for the whole subtree.
+#   3. Subtrees decided purely by bounds depend only on the current W/L/T of the clubs
+#      involved, so they are memoized on (depth, records) and reused across branches.
+#   4. Only leaves the bounds cannot settle (win% ties) run the full standings + tiebreakers.
+from __future__ import annotations
+
+from .scenario import ScenarioEngine, game_id, team_bounds, win_pct_bounds
+from .standings import seed_conference
+from .tiebreaks import TEAM_ABBR
+
+OUTCOMES = ("home", "away")
+OUTCOMES_WITH_TIES = ("home", "away", "tie")
+DEFAULT_OUTCOME = "home"   # result assumed for dropped games in exact evaluations
+MAX_PATHS = 50
+NODE_BUDGET = 200_000
+EXACT_LIMIT = 2_000       # level-on-win% combinations settled with the full tiebreakers
+
+
+class _OverBudget(Exception):
+    pass
+
+
+def relevant_games(S, games: list, team: str) -> list:
+    """
+    Unplayed games that can change where `team` finishes. A club matters when it is in the
+    team's conference and its possible final win% overlaps the team's, or when it is sure to
+    finish above the team but shares a division with such a club (it decides whether that
+    club is a division winner or a wild card). Games between clubs that don't matter are
+    dropped; they only reach the later tiebreakers (strength of victory / schedule).
+    """
+    left: dict[str, int] = {}
+    for g in games:
+        left[g.home] = left.get(g.home, 0) + 1
+        left[g.away] = left.get(g.away, 0) + 1
+    lo, hi = win_pct_bounds({t: (r["w"], r["l"], r["t"]) for t, r in S.items()}, left)
+    conf = S[team]["conf"]
+    contenders = {t for t, r in S.items()
+                  if r["conf"] == conf and hi[t] >= lo[team] and lo[t] <= hi[team]}
+    contender_divs = {S[t]["div"] for t in contenders}
+    matters = contenders | {t for t, r in S.items()
+                            if r["conf"] == conf and r["div"] in contender_divs and lo[t] > hi[team]}
+    return [g for g in games if g.home in matters or g.away in matters]
+
+
+def _merge(per_outcome: list, gid: str, limit: int) -> tuple[list, bool]:
+    """Child path lists per outcome -> this node's paths. A game whose outcome never matters is left out."""
+    first = per_outcome[0][1]
+    if all(ps == first for _, ps in per_outcome):
+        return first, False
+    out = []
+    for outcome, ps in per_outcome:
+        for p in ps:
+            if len(out) >= limit:
+                return out, True
+            out.append({gid: outcome, **p})
+    return out, False
+
+
+def _search_order(games: list, team: str) -> list:
+    """The team's own games first, then club by club (fewest games left first) so clubs finish early."""
+    own = sorted((g for g in games if team in (g.home, g.away)), key=lambda g: g.week)
+    rest = [g for g in games if g not in own]
+    order = []
+    while rest:
+        left: dict[str, int] = {}
+        for g in rest:
+            left[g.home] = left.get(g.home, 0) + 1
+            left[g.away] = left.get(g.away, 0) + 1
+        club = min(left, key=lambda t: (left[t], t))
+        mine = sorted((g for g in rest if club in (g.home, g.away)), key=lambda g: g.week)
+        order += mine
+        rest = [g for g in rest if g not in mine]
+    return own + order
+
+
+def playoff_paths(engine: ScenarioEngine, team: str, fixed: dict | None = None, *,
+                  allow_ties: bool = False, max_paths: int = MAX_PATHS,
+                  node_budget: int = NODE_BUDGET, exact_limit: int = EXACT_LIMIT) -> dict:
+    """
+    Enumerate the remaining regular season for `team` (optionally on top of `fixed` what-if results).
+    Returns {team, status, relevant [game dicts in search order], ignored, combinations,
+    qualifying, tiebreak, paths, tiebreak_paths, truncated, nodes, exact_evals}.
+
+    Counts are over outcomes of the relevant games (ties only with allow_ties). Combinations
+    where the team finishes level on win% with the last club in are "tiebreak"; when there
+    are at most `exact_limit` of them each is run through the full tiebreakers and folded
+    into "qualifying" (tiebreak becomes 0).
+    """
+    S = engine.standings(fixed)
+    if team not in S or not S[team]["conf"]:
+        raise ValueError(f"Unknown team: {team}")
+    fixed = {str(k): v for k, v in (fixed or {}).items()}
+    unplayed = [g for gid, g in engine._unplayed.items() if gid not in fixed]
+    relevant = relevant_games(S, unplayed, team)
+    ignored = {game_id(g): DEFAULT_OUTCOME for g in unplayed if g not in relevant}
+    games = _search_order(relevant, team)
+    gids = [game_id(g) for g in games]
+    outcomes = OUTCOMES_WITH_TIES if allow_ties else OUTCOMES
+    k = len(games)
+
+    conf, div_of = S[team]["conf"], {t: r["div"] for t, r in S.items()}
+    rivals = [t for t, r in S.items() if r["conf"] == conf and t != team]
+    rec = {t: [r["w"], r["l"], r["t"]] for t, r in S.items() if r["conf"] == conf}
+    left = {t: 0 for t in rec}
+    for g in unplayed:
+        for t in (g.home, g.away):
+            if t in left:
+                left[t] += 1
+    stats = {"nodes": 0, "exact_evals": 0}
+    chosen: dict = {}
+
+    def node_state():
+        """(playoff state, memo key) for the current records."""
+        lo, hi = win_pct_bounds({t: tuple(v) for t, v in rec.items()}, left)
+        state = team_bounds(team, rivals, div_of, lo, hi)[1]
+        if left[team]:
+            return state, tuple(tuple(v) for v in rec.values())
+        # The team's record is final: a club is only "above", "below", "level" or still open
+        p = lo[team]
+        return state, tuple("A" if lo[t] > p else "B" if hi[t] < p else "E" if not left[t] else tuple(v)
+                            for t, v in rec.items())
+
+    def apply(g, outcome, sign):
+        col_h, col_a = {"home": (0, 1), "away": (1, 0), "tie": (2, 2)}[outcome]
+        for t, col in ((g.home, col_h), (g.away, col_a)):
+            if t in rec:
+                rec[t][col] += sign
+                left[t] -= sign
+
+    def run(resolve: bool):
+        memo: dict = {}
+
+        def search(d: int):
+            """-> (qualifying, tiebreak, paths, tiebreak paths, truncated, pure) for games[d:]."""
+            stats["nodes"] += 1
+            if stats["nodes"] > node_budget:
+                raise _OverBudget
+            total = len(outcomes) ** (k - d)
+            state, key = node_state()
+            if state == "clinched":
+                return total, 0, [{}], [], False, True
+            if state == "eliminated":
+                return 0, 0, [], [], False, True
+            if d == k:
+                if not resolve:                      # level with the cut line
+                    return 0, 1, [], [{}], False, True
+                stats["exact_evals"] += 1
+                S_leaf = engine.standings({**fixed, **ignored, **chosen})
+                ok = any(s["team"] == team for s in seed_conference(S_leaf, conf))
+                return (1, 0, [{}], [], False, False) if ok else (0, 0, [], [], False, False)
+
+            key = (d, key)
+            if key in memo:
+                return memo[key]
+            g, gid = games[d], gids[d]
+            n_in = n_tie = 0
+            pure, truncated, ins, ties = True, False, [], []
+            for outcome in outcomes:
+                apply(g, outcome, 1)
+                chosen[gid] = outcome
+                a, b, p_in, p_tie, tr, pu = search(d + 1)
+                del chosen[gid]
+                apply(g, outcome, -1)
+                n_in += a; n_tie += b
+                pure, truncated = pure and pu, truncated or tr
+                ins.append((outcome, p_in)); ties.append((outcome, p_tie))
+            p_in, tr1 = ([{}], False) if n_in == total else _merge(ins, gid, max_paths)
+            p_tie, tr2 = ([{}], False) if n_tie == total else _merge(ties, gid, max_paths)
+            result = (n_in, n_tie, p_in, p_tie, truncated or tr1 or tr2, pure)
+            if pure:
+                memo[key] = result
+            return result
+
+        return search(0)
+
+    out = {"team": team,
+           "relevant": [{"id": gid, "week": g.week, "home": g.home, "away": g.away} for gid, g in zip(gids, games)],
+           "ignored": len(ignored), "combinations": len(outcomes) ** k}
+    try:
+        n_in, n_tie, paths, tie_paths, truncated, _ = run(resolve=False)
+        if 0 < n_tie <= exact_limit:
+            n_in, n_tie, paths, tie_paths, truncated, _ = run(resolve=True)
+    except _OverBudget:
+        out.update(status="too many games", qualifying=None, tiebreak=None, paths=[], tiebreak_paths=[],
+                   truncated=True, **stats)
+        return out
+    total = out["combinations"]
+    status = "clinched" if n_in == total else "eliminated" if n_in + n_tie == 0 else "alive"
+    out.update(status=status, qualifying=n_in, tiebreak=n_tie,
+               paths=paths if status == "alive" else [], tiebreak_paths=tie_paths if status == "alive" else [],
+               truncated=truncated, **stats)
+    return out
+
+
+def describe_path(result: dict, path: dict) -> str:
+    """One path as text, the team's own games first: 'Win vs DAL (Wk17); PHI beats NYG (Wk17)'."""
+    team = result["team"]
+    ab = lambda t: TEAM_ABBR.get(t, t)
+    parts = []
+    for g in result["relevant"]:             # already in search order: own games first
+        outcome = path.get(g["id"])
+        if outcome is None:
+            continue
+        wk = f"(Wk{g['week']})"
+        if team in (g["home"], g["away"]):
+            home = g["home"] == team
+            opp = g["away"] if home else g["home"]
+            res = "Tie" if outcome == "tie" else "Win" if (outcome == "home") == home else "Lose"
+            parts.append(f"{res} {'vs' if home else 'at'} {ab(opp)} {wk}")
+        elif outcome == "tie":
+            parts.append(f"{ab(g['away'])} and {ab(g['home'])} tie {wk}")
+        else:
+            winner, loser = (g["home"], g["away"]) if outcome == "home" else (g["away"], g["home"])
+            parts.append(f"{ab(winner)} beats {ab(loser)} {wk}")
+    return "; ".join(parts)
+
+
+_last: tuple = (None, None)
+
+
+def engine_for(processed: dict) -> ScenarioEngine:
+    """Scenario engine for `processed`, rebuilt only when a different schedule object is passed in."""
+    global _last
+    src, engine = _last
+    if src is not processed:
+        engine = ScenarioEngine.from_processed(processed)
+        _last = (processed, engine)
+    return engine
@@ -0,0 +1,120 @@
+# process/modules/processed_cache.py — parse schedulesPS5_final.json once per version, share it read-only
+#
+#   processed = load_processed()              # PROC_DIR / "schedulesPS5_final.json" by default
+#   processed = load_processed(path)          # any processed file
+#   cache_info()  -> {"hits": 95, "misses": 1, "evictions": 0, "size": 1, "max_size": 4}
+#
+# Documents are kept in a small LRU keyed by (path, mtime_ns, size), so a rewritten file is
+# parsed again on its next use and everything else is a stat() plus a dict lookup. Because the
+# same object is handed to every caller (stories, appendices, PDFs, the service), it is frozen:
+# dicts and lists are FrozenDict / FrozenList, which read like the originals (and json.dumps
+# them the same) but raise TypeError on any mutation. thaw() gives a private mutable copy.
+# Files in the old matchup-keyed format get their "_index" built before freezing.
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from paths import PROC_DIR
+from .schedule_view import INDEX_KEY, build_index, has_index
+from .singleflight import SingleFlight
+
+FINAL_PATH = PROC_DIR / "schedulesPS5_final.json"
+MAX_DOCS = 4     # the current file plus a few what-if / temp copies
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("processed schedule is shared and read-only; use processed_cache.thaw() for a copy")
+
+
+class FrozenDict(dict):
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+class FrozenList(list):
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+def freeze(obj):
+    if isinstance(obj, dict):
+        return FrozenDict((k, freeze(v)) for k, v in obj.items())
+    if isinstance(obj, list):
+        return FrozenList(freeze(v) for v in obj)
+    return obj
+
+
+def thaw(obj):
+    """Plain, mutable deep copy of a (frozen) document."""
+    if isinstance(obj, dict):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [thaw(v) for v in obj]
+    return obj
+
+
+_docs: OrderedDict = OrderedDict()     # (path, mtime_ns, size) -> FrozenDict
+_lock = threading.Lock()
+_parsing = SingleFlight()              # concurrent misses on one version parse it once
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _parse(path: Path) -> FrozenDict:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if isinstance(data, dict) and not has_index(data):
+        data[INDEX_KEY] = build_index(data)
+    return freeze(data)
+
+
+def load_processed(path=FINAL_PATH) -> FrozenDict:
+    """The parsed, frozen processed file; parsed only when (mtime_ns, size) changed."""
+    path = Path(path).resolve()
+    st = os.stat(path)
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    with _lock:
+        doc = _docs.get(key)
+        if doc is not None:
+            _docs.move_to_end(key)
+            _stats["hits"] += 1
+            return doc
+        _stats["misses"] += 1
+
+    doc = _parsing.do(key, lambda: _parse(path))
+    with _lock:
+        for old in [k for k in _docs if k[0] == key[0] and k != key]:
+            del _docs[old]                     # an older version of the same file is never asked for again
+            _stats["evictions"] += 1
+        _docs[key] = doc
+        _docs.move_to_end(key)
+        while len(_docs) > MAX_DOCS:
+            _docs.popitem(last=False)
+            _stats["evictions"] += 1
+    return doc
+
+
+def cache_info() -> dict:
+    with _lock:
+        return {**_stats, "size": len(_docs), "max_size": MAX_DOCS}
+
+
+def clear():
+    with _lock:
+        _docs.clear()
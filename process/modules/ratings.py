@@ -0,0 +1,210 @@
+# process/modules/ratings.py — team strength from point margins, and win/tie odds for unplayed games
+#
+#   model = RatingModel()
+#   model.update(index)                      # adds newly final games, drops ones gone from the index
+#   model.ratings()                          -> {"Dallas Cowboys": 4.2, ...}   points better than average
+#   model.game_probabilities(index)          -> {game id: (p_home, p_tie, p_away)}
+#
+# Model: home margin = home_field + r[home] - r[away] + noise, fitted by ridge least squares.
+# Only the normal equations (A = X'X, b = X'y) and y'y are kept, so a finished game is an
+# O(1) update and a refit is one small (teams + 1)² solve, however many games have been seen.
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+import numpy as np
+
+from .scenario import game_id
+from .season_index import SeasonIndex
+
+RIDGE = 2.0            # prior strength, in games: pulls ratings toward average early in a season
+MIN_SIGMA = 7.0        # floor for the margin spread while few games are in
+DEFAULT_SIGMA = 13.5   # NFL-like margin standard deviation before any residuals exist
+OVERTIME_TIE_SHARE = 0.1   # share of games level after regulation that stay ties
+SEASON_DECAY = 0.5     # weight kept by older seasons at each season boundary (from_franchise)
+
+
+def _phi(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+class RatingModel:
+    """
+    Incremental least-squares ratings. Column 0 of the design is home field, column k + 1 is team k.
+    Each game adds +1 for home, -1 for away (and the margin to b), so updates never touch
+    more than 9 cells of A. Games are remembered by id with their margin and weight so a
+    corrected score is swapped out instead of counted twice, and a removed game is subtracted.
+    """
+
+    def __init__(self, ridge: float = RIDGE):
+        self.ridge = ridge
+        self.teams: list[str] = []
+        self.idx: dict[str, int] = {}
+        self.A = np.zeros((1, 1))
+        self.b = np.zeros(1)
+        self.yy = 0.0
+        self.n = 0.0
+        self._seen: dict[str, tuple[str, str, float, float]] = {}   # id -> (home, away, margin, weight)
+        self._indexed: set[str] = set()   # ids the last update() took from its index
+        self._solution = None
+
+    # ---------- accumulating ----------
+    def _grow(self, names):
+        new = [t for t in dict.fromkeys(names) if t not in self.idx]
+        if not new:
+            return
+        for t in new:
+            self.idx[t] = len(self.teams)
+            self.teams.append(t)
+        m = len(self.teams) + 1
+        A, b = np.zeros((m, m)), np.zeros(m)
+        k = self.A.shape[0]
+        A[:k, :k], b[:k] = self.A, self.b
+        self.A, self.b = A, b
+
+    def _accumulate(self, homes, aways, margins, weights):
+        """Add rows with per-row weights (negative to subtract a row added earlier)."""
+        self._grow(list(homes) + list(aways))
+        h = np.fromiter((self.idx[t] + 1 for t in homes), dtype=np.intp, count=len(homes))
+        a = np.fromiter((self.idx[t] + 1 for t in aways), dtype=np.intp, count=len(aways))
+        y = np.asarray(margins, dtype=float)
+        weight = np.asarray(weights, dtype=float)
+        z = np.zeros_like(h)
+        # x = e0 + e_h - e_a  ->  x x' has these nine entries
+        for r, c, s in ((z, z, 1), (h, h, 1), (a, a, 1), (z, h, 1), (h, z, 1),
+                        (z, a, -1), (a, z, -1), (h, a, -1), (a, h, -1)):
+            np.add.at(self.A, (r, c), s * weight)
+        np.add.at(self.b, z, y * weight)
+        np.add.at(self.b, h, y * weight)
+        np.add.at(self.b, a, -y * weight)
+        self.yy += float(weight @ (y * y))
+        self.n += float(weight.sum())
+        self._solution = None
+
+    def _apply(self, rows):
+        if rows:
+            self._accumulate(*zip(*rows))
+
+    def add_games(self, games) -> int:
+        """Add (id, home, away, home_score, away_score) tuples; returns how many were new or changed."""
+        rows, n = [], 0
+        for gid, home, away, hs, as_ in games:
+            margin = float(hs - as_)
+            old = self._seen.get(gid)
+            if old is not None and old[:3] == (home, away, margin):
+                continue
+            weight = 1.0
+            if old is not None:
+                rows.append((*old[:3], -old[3]))
+                weight = old[3]   # a corrected score keeps the weight (decay) of the one it replaces
+            self._seen[gid] = (home, away, margin, weight)
+            rows.append((home, away, margin, weight))
+            n += 1
+        self._apply(rows)
+        return n
+
+    def remove_games(self, ids) -> int:
+        """Subtract the games with these ids (removed from the schedule, or no longer final)."""
+        rows = [(*old[:3], -old[3]) for old in (self._seen.pop(gid, None) for gid in ids) if old is not None]
+        self._apply(rows)
+        return len(rows)
+
+    def update(self, index: SeasonIndex) -> int:
+        """
+        Bring the model in line with the finished games of `index` (cheap after every reload):
+        new or corrected games are added, and games an earlier update() took from the index that
+        are gone or no longer final are subtracted. Returns how many games were added or changed.
+        """
+        current = {game_id(g): g for g in index.games if g.final}
+        self.remove_games(self._indexed - current.keys())
+        self._indexed = set(current)
+        return self.add_games((gid, g.home, g.away, g.home_score, g.away_score) for gid, g in current.items())
+
+    def decay(self, factor: float):
+        """
+        Down-weight everything seen so far (e.g. at a season boundary). Decayed games stay known
+        by id at their reduced weight: a later update() with the same games does not add them
+        again, and they are no longer subtracted when missing from the next season's index.
+        """
+        self.A *= factor
+        self.b *= factor
+        self.yy *= factor
+        self.n *= factor
+        self._seen = {gid: (*row[:3], row[3] * factor) for gid, row in self._seen.items()}
+        self._indexed = set()
+        self._solution = None
+
+    # ---------- solving ----------
+    def _solve(self):
+        if self._solution is None:
+            m = self.A.shape[0]
+            beta = np.linalg.solve(self.A + self.ridge * np.eye(m), self.b)
+            beta[1:] -= beta[1:].mean() if m > 1 else 0.0
+            rss = self.yy - 2 * beta @ self.b + beta @ self.A @ beta
+            dof = self.n - m
+            sigma = math.sqrt(max(rss, 0.0) / dof) if dof > 0 else DEFAULT_SIGMA
+            self._solution = (beta, max(sigma, MIN_SIGMA))
+        return self._solution
+
+    @property
+    def home_field(self) -> float:
+        return float(self._solve()[0][0])
+
+    @property
+    def sigma(self) -> float:
+        return self._solve()[1]
+
+    def ratings(self) -> dict[str, float]:
+        beta = self._solve()[0]
+        return {t: float(beta[i + 1]) for t, i in self.idx.items()}
+
+    def expected_margin(self, home: str, away: str) -> float:
+        beta = self._solve()[0]
+        r = lambda t: beta[self.idx[t] + 1] if t in self.idx else 0.0
+        return float(beta[0] + r(home) - r(away))
+
+    def probabilities(self, home: str, away: str) -> tuple[float, float, float]:
+        """(p_home, p_tie, p_away). A regulation tie is a margin within half a point; most go to overtime."""
+        mu, sigma = self.expected_margin(home, away), self.sigma
+        p_home = 1.0 - _phi((0.5 - mu) / sigma)
+        p_level = _phi((0.5 - mu) / sigma) - _phi((-0.5 - mu) / sigma)
+        p_tie = p_level * OVERTIME_TIE_SHARE
+        p_home += (p_level - p_tie) / 2
+        return p_home, p_tie, 1.0 - p_home - p_tie
+
+    def game_probabilities(self, index: SeasonIndex) -> dict[str, tuple[float, float, float]]:
+        """{game id: (p_home, p_tie, p_away)} for every unplayed game of `index`."""
+        return {game_id(g): self.probabilities(g.home, g.away) for g in index.remaining_games()}
+
+    # ---------- sources ----------
+    @classmethod
+    def from_index(cls, index: SeasonIndex, ridge: float = RIDGE) -> "RatingModel":
+        m = cls(ridge)
+        m.update(index)
+        return m
+
+    @classmethod
+    def from_franchise(cls, db_path: Path | None = None, decay: float = SEASON_DECAY,
+                       ridge: float = RIDGE) -> "RatingModel":
+        """Every final regular-season game in the franchise store, older seasons decayed by `decay` per season."""
+        from .franchise_store import FINAL_STATUSES, FRANCHISE_DB, REG_SEASON_WEEKS, REG_STAGE, connect
+        m = cls(ridge)
+        con = connect(db_path or FRANCHISE_DB, readonly=True)
+        try:
+            rows = con.execute(
+                "SELECT season, schedule_id, home, away, home_score, away_score FROM games"
+                " WHERE stage = ? AND week < ? AND status IN (?, ?) AND home_score IS NOT NULL"
+                " ORDER BY season, week", (REG_STAGE, REG_SEASON_WEEKS, *FINAL_STATUSES)).fetchall()
+        finally:
+            con.close()
+        season, batch = None, []
+        for s, sid, home, away, hs, as_ in rows:
+            if s != season:
+                m.add_games(batch)
+                if season is not None:
+                    m.decay(decay)
+                season, batch = s, []
+            batch.append((f"{s}:{sid}", home, away, hs, as_))
+        m.add_games(batch)
+        return m
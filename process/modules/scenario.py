@@ -0,0 +1,173 @@
+# process/modules/scenario.py — "what if" outcomes for unplayed games
+#
+#   engine = ScenarioEngine.from_processed(processed)
+#   engine.remaining_games()                 -> [{"id": "543818060", "week": 17, "home": ..., "away": ...}, ...]
+#   engine.evaluate({"543818060": "home", "543818061": "tie"}, team="Dallas Cowboys")
+#
+# The base season is folded into standings rows once; a scenario copies those rows and
+# applies only the forced games, so nothing is re-read from the processed JSON.
+from __future__ import annotations
+
+from .season_index import SeasonIndex
+from .standings import (H2HMatrix, Standings, add_game, break_tie, copy_rows,
+                        finish_standings, playoff_seeds, standings_table)
+
+# Scores used for a forced result when no explicit score is given. The margin only
+# matters for the net-points tiebreakers, which a one-point game barely moves.
+OUTCOME_SCORES = {"home": (1, 0), "away": (0, 1), "tie": (0, 0)}
+FORCED_STATUS = 2
+
+
+def game_id(g) -> str:
+    """Stable id for a Game: its scheduleId, or 'week:away@home'."""
+    return str(g.schedule_id) if g.schedule_id is not None else f"{g.week}:{g.away}@{g.home}"
+
+
+def _pct(w, l, t, remaining=0, extra_wins=0):
+    gp = w + l + t + remaining
+    return (w + extra_wins + 0.5 * t) / gp if gp else 0.0
+
+
+def team_bounds(team: str, rivals: list[str], div_of: dict, lo: dict, hi: dict) -> tuple[str, str]:
+    """
+    (division state, playoff state) for `team` from every club's lowest / highest possible
+    final win% (lo / hi). `rivals` are the other clubs in its conference. Ties in win% are
+    assumed to go against the team, so "clinched" holds whatever the tiebreakers do.
+    """
+    div = div_of[team]
+    same_div = [t for t in rivals if div_of[t] == div]
+
+    # Division: nobody can reach us / somebody is already out of reach
+    div_state = ("clinched" if all(hi[t] < lo[team] for t in same_div)
+                 else "eliminated" if any(lo[t] > hi[team] for t in same_div) else "alive")
+
+    # Playoffs: at most 2 clubs can take a wild card ahead of us -> in.
+    # A division's winner is never a wild card, so each division contributes
+    # (clubs that can finish at/above us) - 1 possible wild cards.
+    by_div_can: dict[str, int] = {}
+    by_div_must: dict[str, int] = {}
+    for t in rivals:
+        d = div_of[t]
+        if hi[t] >= lo[team]:
+            by_div_can[d] = by_div_can.get(d, 0) + 1
+        if lo[t] > hi[team]:
+            by_div_must[d] = by_div_must.get(d, 0) + 1
+    threats = sum(max(n - 1, 0) for n in by_div_can.values())
+    if div_state == "clinched" or threats <= 2:
+        return div_state, "clinched"
+    if div_state == "eliminated" and sum(max(n - 1, 0) for n in by_div_must.values()) >= 3:
+        return div_state, "eliminated"
+    return div_state, "alive"
+
+
+def win_pct_bounds(records: dict, left: dict) -> tuple[dict, dict]:
+    """{team: (w, l, t)} + {team: games left} -> (lowest, highest) possible final win% per team."""
+    lo = {t: _pct(w, l, t_, left.get(t, 0)) for t, (w, l, t_) in records.items()}
+    hi = {t: _pct(w, l, t_, left.get(t, 0), left.get(t, 0)) for t, (w, l, t_) in records.items()}
+    return lo, hi
+
+
+def clinch_status(S: Standings, unplayed: list, seeds: dict | None = None) -> dict:
+    """
+    Sound (never wrong, sometimes not yet decided) clinch/elimination flags from win% bounds.
+    For every team: {"division": s, "playoffs": s} with s in "clinched" / "eliminated" / "alive".
+    Once a conference has no unplayed games, `seeds` (playoff_seeds of S) settles it exactly.
+    """
+    left: dict[str, int] = {}
+    for g in unplayed:
+        left[g.home] = left.get(g.home, 0) + 1
+        left[g.away] = left.get(g.away, 0) + 1
+    lo, hi = win_pct_bounds({t: (r["w"], r["l"], r["t"]) for t, r in S.items()}, left)
+    div_of = {t: r["div"] for t, r in S.items()}
+
+    open_confs = {S[t]["conf"] for g in unplayed for t in (g.home, g.away) if t in S}
+    out = {}
+    for team, r in S.items():
+        conf = r["conf"]
+        if not conf:
+            continue
+        if seeds is not None and conf not in open_confs:
+            mine = next((x for x in seeds.get(conf, []) if x["team"] == team), None)
+            out[team] = {"division": "clinched" if mine and mine["via"] == "division" else "eliminated",
+                         "playoffs": "clinched" if mine else "eliminated"}
+            continue
+        rivals = [t for t, o in S.items() if t != team and o["conf"] == conf]
+        div_state, po_state = team_bounds(team, rivals, div_of, lo, hi)
+        out[team] = {"division": div_state, "playoffs": po_state}
+    return out
+
+
+class ScenarioEngine:
+    """Base season cached as unfinished standings rows + pair matrix; scenarios only add forced games."""
+
+    def __init__(self, index: SeasonIndex):
+        self.index = index
+        self._unplayed = {game_id(g): g for g in index.remaining_games()}
+        self._base_rows: dict = {}
+        for g in index.games:
+            add_game(self._base_rows, g)
+        self._base_matrix = H2HMatrix.from_index(index) if H2HMatrix is not None else None
+        self._base_cache = None
+
+    @classmethod
+    def from_processed(cls, processed: dict) -> "ScenarioEngine":
+        return cls(SeasonIndex.from_processed(processed))
+
+    def remaining_games(self) -> list[dict]:
+        return [{"id": k, "week": g.week, "home": g.home, "away": g.away}
+                for k, g in sorted(self._unplayed.items(), key=lambda kv: (kv[1].week, kv[1].home))]
+
+    def _forced(self, outcomes: dict) -> list:
+        """{game id: "home" | "away" | "tie" | (home_score, away_score)} -> final Game tuples."""
+        games = []
+        for gid, outcome in (outcomes or {}).items():
+            g = self._unplayed.get(str(gid))
+            if g is None:
+                raise ValueError(f"Not an unplayed game: {gid}")
+            if isinstance(outcome, str):
+                if outcome not in OUTCOME_SCORES:
+                    raise ValueError(f"Outcome for {gid} must be home/away/tie or a score, got {outcome!r}")
+                hs, as_ = OUTCOME_SCORES[outcome]
+            else:
+                hs, as_ = (int(x) for x in outcome)
+            games.append(g._replace(home_score=hs, away_score=as_, status=FORCED_STATUS))
+        return games
+
+    def standings(self, outcomes: dict | None = None) -> Standings:
+        """Full standings rows with the forced results applied."""
+        if not outcomes and self._base_cache is not None:
+            return self._base_cache
+        forced = self._forced(outcomes)
+        rows = copy_rows(self._base_rows)
+        for g in forced:
+            add_game(rows, g, scheduled=False)
+        matrix = self._base_matrix.with_results(forced) if self._base_matrix is not None else None
+        S = finish_standings(rows, matrix)
+        if not outcomes:
+            self._base_cache = S
+        return S
+
+    def evaluate(self, outcomes: dict | None = None, team: str | None = None) -> dict:
+        """
+        Standings, seeds and clinch flags under `outcomes`. With `team`, also its row,
+        seed (None when out) and how it currently breaks ties with clubs on the same win%.
+        """
+        S = self.standings(outcomes)
+        forced = {str(k) for k in (outcomes or {})}
+        unplayed = [g for k, g in self._unplayed.items() if k not in forced]
+        seeds = playoff_seeds(S)
+        result = {"seeds": seeds, "status": clinch_status(S, unplayed, seeds), "remaining": len(unplayed)}
+        if team and team in S:
+            r = S[team]
+            result["team"] = {k: v for k, v in r.items() if k not in ("vs", "opps")}
+            result["seed"] = next((s["seed"] for s in seeds.get(r["conf"], []) if s["team"] == team), None)
+            ties = {}
+            for other, o in S.items():
+                if other != team and o["conf"] == r["conf"] and o["pct"] == r["pct"]:
+                    kind = "division" if o["div"] == r["div"] else "wildcard"
+                    ties[other] = break_tie(S, [team, other], kind)
+            result["ties"] = ties
+        return result
+
+    def table(self, outcomes: dict | None = None) -> dict:
+        return standings_table(self.standings(outcomes))
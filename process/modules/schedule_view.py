@@ -0,0 +1,162 @@
+# process/modules/schedule_view.py — reading the processed schedule (schedulesPS5_final.json)
+#
+# Processed format:
+#   {
+#     "pre": {"Week 0": [game, game, ...], ...},
+#     "reg": {"Week 0": [game, ...], ...},
+#     "_index": {
+#       "version": 2,
+#       "by_schedule_id": {"543817804": ["reg", "Week 0", 3], ...},   # phase, week, position
+#       "by_team": {"Dallas Cowboys": [["pre", "Week 0", 2], ...], ...}  # locations, in file order
+#     }
+#   }
+# Files written before the list format keyed each week by "Home vs Away"; every helper here
+# accepts both (a location's position is then that key), so consumers never touch the week
+# containers directly.
+#
+#   find_game(processed, 543817804)            -> ("reg", game)      O(1)
+#   team_games(processed, "Dallas Cowboys")    -> [(phase, week, game), ...] through "by_team"
+#   matchup_view(processed, "reg", 3)          -> {"Dallas Cowboys vs New York Giants": game, ...}
+from __future__ import annotations
+
+PHASES = ("pre", "reg")
+INDEX_KEY = "_index"
+INDEX_VERSION = 2      # 2: "by_team" holds locations (1 held scheduleIds)
+
+
+def matchup_key(game: dict) -> str:
+    """'Home Team vs Away Team' — the human-friendly label of a game (not unique)."""
+    home = game.get("homeTeamName") or "Home"
+    away = game.get("awayTeamName") or "Away"
+    return f"{home} vs {away}"
+
+
+def week_games(week) -> list:
+    """Games of one week container: a list (current format) or a {matchup: game} dict (old)."""
+    if isinstance(week, list):
+        return [g for g in week if isinstance(g, dict)]
+    if isinstance(week, dict):
+        return [g for g in week.values() if isinstance(g, dict)]
+    return []
+
+
+def labelled_games(week):
+    """Yield (label, game) for one week: matchup_key, with " (2)", " (3)", ... on repeats."""
+    seen = set()
+    for g in week_games(week):
+        label = base = matchup_key(g)
+        n = 2
+        while label in seen:
+            label = f"{base} ({n})"
+            n += 1
+        seen.add(label)
+        yield label, g
+
+
+def _week_items(week):
+    """(position, game) in a week container: list index, or the matchup key of an old dict week."""
+    if isinstance(week, list):
+        return ((i, g) for i, g in enumerate(week) if isinstance(g, dict))
+    if isinstance(week, dict):
+        return ((k, g) for k, g in week.items() if isinstance(g, dict))
+    return ()
+
+
+def iter_phase(weeks):
+    """Yield (week label, game) for one phase ({"Week N": games})."""
+    if not isinstance(weeks, dict):
+        return
+    for wk_key, week in weeks.items():
+        for g in week_games(week):
+            yield wk_key, g
+
+
+def iter_games(processed: dict, phases=PHASES):
+    """Yield (phase, week label, game) across the given phases."""
+    for phase in phases:
+        for wk_key, g in iter_phase((processed or {}).get(phase)):
+            yield phase, wk_key, g
+
+
+def build_index(processed: dict) -> dict:
+    """Secondary indexes for the "_index" key: scheduleId -> location, team -> locations."""
+    by_id, by_team = {}, {}
+    for phase in PHASES:
+        weeks = processed.get(phase)
+        if not isinstance(weeks, dict):
+            continue
+        for wk_key, week in weeks.items():
+            for pos, g in _week_items(week):
+                loc = [phase, wk_key, pos]
+                sid = g.get("scheduleId")
+                if sid is not None:
+                    by_id.setdefault(str(sid), loc)   # a repeated id keeps its first game, as keyed_games does
+                for team in {g.get("homeTeamName"), g.get("awayTeamName")} - {None, ""}:
+                    by_team.setdefault(team, []).append(loc)
+    return {"version": INDEX_VERSION, "by_schedule_id": by_id, "by_team": by_team}
+
+
+def has_index(processed: dict) -> bool:
+    """True when `processed` carries a current "_index"."""
+    idx = processed.get(INDEX_KEY) if isinstance(processed, dict) else None
+    return isinstance(idx, dict) and idx.get("version") == INDEX_VERSION
+
+
+def _index(processed: dict) -> dict:
+    if has_index(processed):
+        return processed[INDEX_KEY]
+    idx = build_index(processed)   # old file or hand-built dict
+    try:
+        processed[INDEX_KEY] = idx
+    except TypeError:
+        pass                       # shared read-only document (processed_cache indexes on load)
+    return idx
+
+
+def _at(processed: dict, loc):
+    phase, wk_key, pos = loc
+    week = (processed.get(phase) or {}).get(wk_key)
+    try:
+        g = week[pos]
+    except (TypeError, KeyError, IndexError):
+        return None
+    return g if isinstance(g, dict) else None
+
+
+def find_game(processed: dict, schedule_id) -> tuple[str, dict] | None:
+    """O(1) lookup of a game by scheduleId: (phase, game), or None when it is not in the file."""
+    loc = _index(processed)["by_schedule_id"].get(str(schedule_id))
+    g = _at(processed, loc) if loc else None
+    if g is None or str(g.get("scheduleId")) != str(schedule_id):
+        return None
+    return loc[0], g
+
+
+def team_games(processed: dict, team: str, phases=PHASES) -> list[tuple[str, str, dict]]:
+    """(phase, week label, game) for every game involving `team`, in file order, through "by_team"."""
+    out = []
+    for loc in _index(processed)["by_team"].get(team, ()):
+        if loc[0] in phases:
+            g = _at(processed, loc)
+            if g is not None:
+                out.append((loc[0], loc[1], g))
+    return out
+
+
+def matchup_view(processed: dict, phase: str, week) -> dict:
+    """
+    Derived {"Home vs Away": game} view of one week (`week`: "Week 3" or 3), for display and
+    for id-less game keys. A pairing that repeats within the week gets " (2)", " (3)", ...
+    """
+    weeks = (processed or {}).get(phase)
+    wk = weeks.get(week if isinstance(week, str) else f"Week {week}") if isinstance(weeks, dict) else None
+    return dict(labelled_games(wk))
+
+
+def teams(processed: dict, phases=PHASES) -> set[str]:
+    out = set()
+    for _, _, g in iter_games(processed, phases):
+        for t in (g.get("homeTeamName"), g.get("awayTeamName")):
+            if t:
+                out.add(t)
+    return out
@@ -0,0 +1,187 @@
+# process/modules/season_bin.py — compact binary copy of the processed schedule, read through mmap
+#
+#   write_season_bin(processed, PROC_DIR / "schedulesPS5_final.bin")   # generate_names does this
+#   view = season_view_for(PROC_DIR / "schedulesPS5_final.json")       # maps the .bin next to it
+#   view.teams                      -> ("Arizona Cardinals", ...)
+#   view.games                      -> structured ndarray over the mapped file (no copy)
+#   view.record("Dallas Cowboys")   -> (W, L, T) from final REG games
+#   view.season_index()             -> SeasonIndex, without parsing any JSON
+#
+# Layout (little-endian):
+#   header   HEADER: magic b"MHSB", version, team count, game count, season digest (season_hash)
+#   teams    n_teams × NAME_BYTES, UTF-8, NUL padded
+#   games    n_games × GAME_DTYPE, in file order (pre, then reg; weeks as listed)
+#   by team  n_teams × (start, count) uint32, then a uint32 list of game positions per team
+# The file is written to a unique temp file and swapped in with os.replace, so a process that already
+# mapped the previous copy keeps a consistent (old) view, and every process reading the same
+# file shares its pages through the OS page cache instead of holding a parsed dict tree.
+# Only ids, weeks, teams, scores and status are kept; anything that needs the full game dicts
+# (story lines, appendix text) still reads the JSON.
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .processed_cache import load_processed
+from .schedule_view import PHASES, iter_games
+from .season_hash import season_hash_for
+from .season_index import FINAL_STATUSES, REG_SEASON_WEEKS, Game, SeasonIndex, _score_for
+
+MAGIC = b"MHSB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI8s")
+NAME_BYTES = 48
+NO_TEAM = 0xFFFF
+NO_VALUE = -1          # schedule id / score / status missing
+GAME_DTYPE = np.dtype([("schedule_id", "<i4"), ("phase", "u1"), ("week", "u1"), ("home", "<u2"),
+                       ("away", "<u2"), ("home_score", "<i2"), ("away_score", "<i2"), ("status", "<i2")])
+RANGE_DTYPE = np.dtype([("start", "<u4"), ("count", "<u4")])
+
+
+def _or(v, default=NO_VALUE):
+    return default if v is None else v
+
+
+def encode_season(processed: dict, digest: str = "") -> bytes:
+    """The binary layout of a processed schedule (see the module header)."""
+    rows = list(iter_games(processed))
+    names = sorted({t for _, _, g in rows for t in (g.get("homeTeamName"), g.get("awayTeamName")) if t})
+    tid = {t: i for i, t in enumerate(names)}
+    games = np.zeros(len(rows), dtype=GAME_DTYPE)
+    for i, (phase, _, g) in enumerate(rows):
+        home, away = g.get("homeTeamName"), g.get("awayTeamName")
+        games[i] = (_or(g.get("scheduleId")), PHASES.index(phase), _or(g.get("weekIndex"), 0xFF),
+                    tid.get(home, NO_TEAM), tid.get(away, NO_TEAM),
+                    _or(_score_for(g, home) if home else None), _or(_score_for(g, away) if away else None),
+                    _or(g.get("status")))
+
+    per_team = [[] for _ in names]
+    for i, g in enumerate(games):
+        for side in ("home", "away"):
+            if g[side] != NO_TEAM:
+                per_team[g[side]].append(i)
+    ranges = np.zeros(len(names), dtype=RANGE_DTYPE)
+    pos = 0
+    for t, idx in enumerate(per_team):
+        ranges[t] = (pos, len(idx))
+        pos += len(idx)
+    order = np.array([i for idx in per_team for i in idx], dtype="<u4")
+
+    team_table = b"".join(t.encode("utf-8")[:NAME_BYTES].ljust(NAME_BYTES, b"\0") for t in names)
+    head = HEADER.pack(MAGIC, VERSION, len(names), len(rows), bytes.fromhex(digest.rjust(16, "0")[:16]))
+    return head + team_table + games.tobytes() + ranges.tobytes() + order.tobytes()
+
+
+def write_season_bin(processed: dict, path, digest: str = "") -> Path:
+    """Write atomically: readers that mapped the old file keep it until they close."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")   # one per writer
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(encode_season(processed, digest))
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return path
+
+
+class SeasonView:
+    """Read-only, zero-copy views over a mapped season file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_teams, n_games, digest = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a season file (version {VERSION})")
+        self.digest = digest.hex()
+        off = HEADER.size
+        self.teams = tuple(bytes(self._mm[off + i * NAME_BYTES: off + (i + 1) * NAME_BYTES]).rstrip(b"\0").decode("utf-8")
+                           for i in range(n_teams))
+        self._tid = {t: i for i, t in enumerate(self.teams)}
+        off += n_teams * NAME_BYTES
+        self.games = np.frombuffer(self._mm, dtype=GAME_DTYPE, count=n_games, offset=off)
+        off += n_games * GAME_DTYPE.itemsize
+        self._ranges = np.frombuffer(self._mm, dtype=RANGE_DTYPE, count=n_teams, offset=off)
+        off += n_teams * RANGE_DTYPE.itemsize
+        self._order = np.frombuffer(self._mm, dtype="<u4", count=int(self._ranges["count"].sum()), offset=off)
+
+    def team_positions(self, team: str) -> np.ndarray:
+        """Positions of the team's games in `games` (a view into the mapped file)."""
+        i = self._tid.get(team)
+        if i is None:
+            return self._order[:0]
+        start, count = self._ranges[i]
+        return self._order[start:start + count]
+
+    def team_games(self, team: str) -> np.ndarray:
+        return self.games[self.team_positions(team)]
+
+    def record(self, team: str, phase: str = "reg") -> tuple[int, int, int]:
+        """(W, L, T) over the team's final games of `phase` (all of its weeks, as the PDF header counts)."""
+        g = self.team_games(team)
+        g = g[(g["phase"] == PHASES.index(phase)) & np.isin(g["status"], list(FINAL_STATUSES))
+              & (g["home_score"] != NO_VALUE) & (g["away_score"] != NO_VALUE)]
+        sign = np.where(g["home"] == self._tid.get(team), 1, -1)
+        margin = (g["home_score"].astype(np.int32) - g["away_score"]) * sign
+        return int((margin > 0).sum()), int((margin < 0).sum()), int((margin == 0).sum())
+
+    def season_index(self) -> SeasonIndex:
+        """The regular-season SeasonIndex, built from the binary records."""
+        g = self.games
+        keep = g[(g["phase"] == PHASES.index("reg")) & (g["week"] < REG_SEASON_WEEKS)
+                 & (g["home"] != NO_TEAM) & (g["away"] != NO_TEAM)]
+        none = lambda v: None if v == NO_VALUE else int(v)   # noqa: E731
+        games = [Game(none(r["schedule_id"]), "reg", int(r["week"]), self.teams[r["home"]], self.teams[r["away"]],
+                      none(r["home_score"]), none(r["away_score"]), none(r["status"])) for r in keep]
+        games.sort(key=lambda x: (x.week, x.home))
+        return SeasonIndex(games)
+
+    def close(self):
+        """Unmap. Only valid once no array taken from this view is still referenced."""
+        self.games = self._ranges = self._order = None
+        self._mm.close()
+
+
+# ---------- shared loader ----------
+_views: dict = {}       # bin path -> SeasonView
+_views_lock = threading.Lock()
+
+
+def _open_view(bin_path: Path) -> SeasonView | None:
+    try:
+        return SeasonView(bin_path)
+    except (OSError, ValueError, struct.error):   # missing, truncated or another version
+        return None
+
+
+def season_view_for(json_path) -> SeasonView:
+    """
+    Mapped view of the .bin beside a processed JSON file, shared by every caller in the process.
+    The .bin is (re)built from the JSON when missing or when its header digest is not the JSON's
+    season digest (season_hash_for: a stat() while the JSON is unchanged).
+    """
+    json_path = Path(json_path)
+    bin_path = json_path.with_suffix(".bin")
+    digest = season_hash_for(json_path).season
+    with _views_lock:
+        hit = _views.get(bin_path)
+    if hit is not None and hit.digest == digest:
+        return hit
+    view = _open_view(bin_path)
+    if view is None or view.digest != digest:
+        if view is not None:
+            view.close()
+        write_season_bin(load_processed(json_path), bin_path, digest)
+        view = SeasonView(bin_path)
+    with _views_lock:
+        _views[bin_path] = view   # the replaced view is unmapped when its last array goes away
+    return view
@@ -0,0 +1,179 @@
+# process/modules/season_hash.py — content hashes of the processed season, for cache keys
+#
+#   h = season_hash_for(PROC_DIR / "schedulesPS5_final.json")   # one stat() when the file is unchanged
+#   h.season                 -> "9f1c..."   whole season (every phase, every game)
+#   h.phase("reg")           -> "e4d0..."   every game of one phase (facts, appendices)
+#   h.teams(teams)           -> "03ab..."   every game involving any of these teams
+#   h.apply({key: game_or_None}, processed)  # incremental: only the changed games are rehashed
+#
+# Each game gets a 64-bit hash of its key and content. The roll-ups are the XOR of their games'
+# hashes, so changing one game updates the season, its (phase, week), both teams' and their
+# pair's digests in O(1). teams() combines team roll-ups and adds back the pairs inside the set,
+# whose games would otherwise cancel out (XOR-ed in once per team).
+# fingerprints() gives the same per-game digests as deps.game_fingerprints. A key is only as
+# narrow as the digest it uses: a teams digest covers those teams' games and nothing else (see
+# deps.py for which artifacts read other teams' games).
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from .generate_names import games_for_keys, keyed_games
+from .processed_cache import load_processed
+
+
+def game_fingerprint(game: dict) -> str:
+    """Short stable digest of one processed game dict."""
+    blob = json.dumps(game, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _mix(key: str, fp: str) -> int:
+    # the key is part of the hash so two identical games never cancel out under XOR
+    return int.from_bytes(hashlib.blake2b(f"{key}\0{fp}".encode(), digest_size=8).digest(), "big")
+
+
+def _hex(x: int) -> str:
+    return f"{x:016x}"
+
+
+class SeasonHash:
+    """Per-game hashes plus XOR roll-ups per team, team pair, (phase, week) and for the season."""
+
+    def __init__(self):
+        self.games: dict = {}     # key -> (fingerprint, mixed, phase, week, home, away)
+        self._team: dict = {}
+        self._pair: dict = {}     # (team, team) sorted -> games between the two
+        self._week: dict = {}
+        self._season = 0
+
+    @classmethod
+    def from_processed(cls, processed: dict) -> "SeasonHash":
+        h = cls()
+        for key, phase, game in keyed_games(processed):
+            h._add(key, phase, game)
+        return h
+
+    def _xor(self, entry: tuple):
+        _, mixed, phase, week, home, away = entry
+        self._season ^= mixed
+        self._week[(phase, week)] = self._week.get((phase, week), 0) ^ mixed
+        teams = {home, away} - {None}
+        for t in teams:
+            self._team[t] = self._team.get(t, 0) ^ mixed
+        if len(teams) == 2:
+            pair = tuple(sorted(teams))
+            self._pair[pair] = self._pair.get(pair, 0) ^ mixed
+
+    def _add(self, key: str, phase: str, game: dict):
+        fp = game_fingerprint(game)
+        entry = (fp, _mix(key, fp), phase, game.get("weekIndex"), game.get("homeTeamName"), game.get("awayTeamName"))
+        self.games[key] = entry
+        self._xor(entry)
+
+    def apply(self, changed, processed: dict | None = None) -> set[str]:
+        """
+        Rehash only the games in `changed` (keys, or a {key: game} diff as from
+        generate_names.diff_final_structs). Current content is read from `processed` when given
+        (a key missing there was removed); otherwise the diff's own game dicts are used.
+        Returns the keys whose hash actually changed.
+        """
+        current = {}
+        if processed is not None:
+            current = games_for_keys(processed, changed)   # index lookups, no pass over the season
+        elif isinstance(changed, dict):
+            current = {k: (self.games[k][2] if k in self.games else "reg", g)
+                       for k, g in changed.items() if g is not None}
+        moved = set()
+        for key in changed:
+            old = self.games.pop(key, None)
+            if old is not None:
+                self._xor(old)
+            if key in current:
+                self._add(key, *current[key])
+            if (old and old[0]) != (self.games[key][0] if key in self.games else None):
+                moved.add(key)
+        return moved
+
+    def copy(self) -> "SeasonHash":
+        h = SeasonHash()
+        h.games, h._week, h._season = dict(self.games), dict(self._week), self._season
+        h._team, h._pair = dict(self._team), dict(self._pair)
+        return h
+
+    @property
+    def season(self) -> str:
+        return _hex(self._season)
+
+    def phase(self, phase: str) -> str:
+        """One digest over every game of `phase` (from the per-week roll-ups)."""
+        x = 0
+        for (p, _), mixed in self._week.items():
+            if p == phase:
+                x ^= mixed
+        return _hex(x)
+
+    def teams(self, teams) -> str:
+        """One digest over the union of several teams' games (e.g. a division or conference)."""
+        teams = sorted(set(teams))
+        x = 0
+        for t in teams:
+            x ^= self._team.get(t, 0)
+        for i, a in enumerate(teams):          # a game inside the set went in twice: once more
+            for b in teams[i + 1:]:
+                x ^= self._pair.get((a, b), 0)
+        return _hex(x)
+
+    def fingerprints(self) -> dict:
+        """{game key: fingerprint}, as deps.game_fingerprints."""
+        return {k: e[0] for k, e in self.games.items()}
+
+
+# ---------- stat()-keyed cache of file hashes ----------
+_files: dict = {}          # resolved path -> ((mtime_ns, size), SeasonHash)
+_files_lock = threading.Lock()
+
+
+def _stat_key(path: Path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def season_hash_for(path, processed: dict | None = None) -> SeasonHash:
+    """
+    The SeasonHash of a processed file. While (mtime_ns, size) are unchanged this is a single
+    stat() call; otherwise the file (or `processed`, when the caller already parsed it) is hashed.
+    """
+    path = Path(path)
+    sig = _stat_key(path)
+    with _files_lock:
+        hit = _files.get(path)
+    if hit is not None and hit[0] == sig:
+        return hit[1]
+    if processed is None:
+        processed = load_processed(path)
+    h = SeasonHash.from_processed(processed)
+    with _files_lock:
+        _files[path] = (sig, h)
+    return h
+
+
+def remember(path, processed: dict, changed=None) -> SeasonHash:
+    """
+    Record the hash of a file just written from `processed`. With `changed` (the game diff
+    against the previous contents) the previous hash is updated incrementally instead.
+    """
+    path = Path(path)
+    with _files_lock:
+        prev = _files.get(path)
+    if prev is not None and changed is not None:
+        h = prev[1].copy()
+        h.apply(changed, processed)
+    else:
+        h = SeasonHash.from_processed(processed)
+    with _files_lock:
+        _files[path] = (_stat_key(path), h)
+    return h
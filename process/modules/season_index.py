@@ -0,0 +1,121 @@
+# process/modules/season_index.py
+from __future__ import annotations
+from collections import defaultdict
+from typing import NamedTuple
+
+from .schedule_view import iter_phase
+
+FINAL_STATUSES = {2, 3}
+REG_SEASON_WEEKS = 18  # weekIndex 0..17 is the regular season; 18+ are playoff rounds
+
+
+class Game(NamedTuple):
+    schedule_id: int | None
+    phase: str
+    week: int
+    home: str
+    away: str
+    home_score: int | None
+    away_score: int | None
+    status: int | None
+
+    @property
+    def final(self) -> bool:
+        return (self.status in FINAL_STATUSES
+                and self.home_score is not None and self.away_score is not None)
+
+
+def _score_for(game: dict, team: str):
+    for k, v in game.items():
+        if isinstance(k, str) and k.endswith(" Score") and k.startswith(team):
+            return v
+
+
+class SeasonIndex:
+    """
+    In-memory view of a processed schedule (schedulesPS5_final.json) built in one pass.
+    Only regular-season games between two named teams are indexed; playoff rounds
+    (weekIndex >= REG_SEASON_WEEKS) and unnamed placeholder slots are ignored.
+    """
+
+    def __init__(self, games: list[Game]):
+        self.games = games
+        self.by_team: dict[str, list[Game]] = defaultdict(list)
+        for g in games:
+            self.by_team[g.home].append(g)
+            self.by_team[g.away].append(g)
+        self.teams = sorted(self.by_team)
+        self._build_prefix_sums()
+
+    # ---------- cumulative per-week arrays ----------
+    def _build_prefix_sums(self):
+        """
+        cum[team][k] = [W, L, T, PF, PA] over final games with weekIndex < k (k = 0..REG_SEASON_WEEKS),
+        so any week or week-range record is a difference of two rows.
+        """
+        n = REG_SEASON_WEEKS + 1
+        per_week = {t: [[0, 0, 0, 0, 0] for _ in range(n)] for t in self.teams}
+        for g in self.games:
+            if not g.final:
+                continue
+            for team, pf, pa in ((g.home, g.home_score, g.away_score), (g.away, g.away_score, g.home_score)):
+                row = per_week[team][g.week + 1]
+                row[0 if pf > pa else 1 if pf < pa else 2] += 1
+                row[3] += pf; row[4] += pa
+        self.cum = {}
+        for team, rows in per_week.items():
+            acc = [0, 0, 0, 0, 0]
+            out = []
+            for row in rows:
+                acc = [a + b for a, b in zip(acc, row)]
+                out.append(tuple(acc))
+            self.cum[team] = out
+
+    def _clamp(self, k: int) -> int:
+        return max(0, min(k, REG_SEASON_WEEKS))
+
+    def record_range(self, team: str, start_week: int, end_week: int) -> tuple[int, int, int, int, int]:
+        """(W, L, T, PF, PA) over weeks start_week..end_week inclusive (weekIndex numbering)."""
+        rows = self.cum.get(team)
+        if not rows:
+            return (0, 0, 0, 0, 0)
+        hi, lo = rows[self._clamp(end_week + 1)], rows[self._clamp(start_week)]
+        return tuple(a - b for a, b in zip(hi, lo))
+
+    def record_through(self, team: str, week: int) -> tuple[int, int, int, int, int]:
+        """(W, L, T, PF, PA) after weekIndex `week` (inclusive)."""
+        rows = self.cum.get(team)
+        return rows[self._clamp(week + 1)] if rows else (0, 0, 0, 0, 0)
+
+    def records_as_of(self, week: int) -> dict[str, tuple[int, int, int, int, int]]:
+        """Every team's (W, L, T, PF, PA) after weekIndex `week` — O(teams)."""
+        k = self._clamp(week + 1)
+        return {t: rows[k] for t, rows in self.cum.items()}
+
+    @classmethod
+    def from_processed(cls, processed: dict) -> "SeasonIndex":
+        games = []
+        for _, g in iter_phase(processed.get("reg")):
+            home, away = g.get("homeTeamName"), g.get("awayTeamName")
+            week = g.get("weekIndex")
+            if not home or not away or week is None or week >= REG_SEASON_WEEKS:
+                continue
+            games.append(Game(
+                schedule_id=g.get("scheduleId"), phase="reg", week=week,
+                home=home, away=away,
+                home_score=_score_for(g, home), away_score=_score_for(g, away),
+                status=g.get("status"),
+            ))
+        games.sort(key=lambda x: (x.week, x.home))
+        return cls(games)
+
+    def final_games(self, team: str | None = None) -> list[Game]:
+        src = self.by_team.get(team, []) if team else self.games
+        return [g for g in src if g.final]
+
+    def remaining_games(self, team: str | None = None) -> list[Game]:
+        src = self.by_team.get(team, []) if team else self.games
+        return [g for g in src if not g.final]
+
+    def record(self, team: str) -> tuple[int, int, int]:
+        return self.record_through(team, REG_SEASON_WEEKS)[:3]
@@ -0,0 +1,66 @@
+# process/modules/singleflight.py — coalesce identical concurrent computations
+#
+#   flight = SingleFlight()
+#   text = flight.do(("story", team, state, model), lambda: generate_story(...))
+#   flight.stats  -> {"calls": 12, "leaders": 3, "shared": 9, "errors": 0}
+#
+# The first caller for a key (the leader) runs the function; callers arriving while it is in
+# progress wait and get the same result (or the same exception). Nothing is kept once the call
+# finishes: this only removes duplicate in-flight work, caching stays with the caller. Keys
+# should include the season state so a request made after new games land never joins an
+# older computation.
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Hashable
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+        self.stats = {"calls": 0, "leaders": 0, "shared": 0, "errors": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """fn() once per key at a time; concurrent callers with the same key share its outcome."""
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["leaders"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,277 @@
+# process/modules/standings.py — league standings and playoff seeding in one pass
+from __future__ import annotations
+
+from .season_index import SeasonIndex
+from .tiebreaks import CONF_DIV
+
+try:
+    from .h2h import H2HMatrix        # SoV/SoS and common games for all teams via matrix products
+except ImportError:
+    H2HMatrix = None
+
+
+class Standings(dict):
+    """{team: row} as returned by compute_standings; .matrix holds the same snapshot's H2HMatrix (or None)."""
+    matrix = None
+
+
+def _pct(rec) -> float:
+    w, l, t = rec[0], rec[1], rec[2]
+    gp = w + l + t
+    return (w + 0.5 * t) / gp if gp else 0.0
+
+
+def _add(rec: list, pf: int, pa: int):
+    if pf > pa: rec[0] += 1
+    elif pf < pa: rec[1] += 1
+    else: rec[2] += 1
+
+
+def compute_standings(index: SeasonIndex, through_week: int | None = None) -> Standings:
+    """
+    One pass over the indexed season (final games only, optionally up to `through_week`
+    inclusive) -> {team: row}. Row keys:
+      team, conf, div, w, l, t, pct, div_rec, conf_rec, home_rec, away_rec (each [w, l, t]),
+      pf, pa, net, conf_net, streak ("W3"/"L1"/""), sov, sos,
+      vs {opp: [w, l, t, pf, pa]}, opps [every scheduled opponent, once per game]
+    SoV = combined win% of teams beaten (once per win); SoS = combined win% of every
+    scheduled opponent (once per game), both from the same snapshot.
+    """
+    rows = Standings()
+    for g in index.games:
+        if through_week is not None and g.week > through_week:
+            continue
+        add_game(rows, g)
+    matrix = H2HMatrix.from_index(index, through_week) if H2HMatrix is not None else None
+    return finish_standings(rows, matrix)
+
+
+def _row(rows: dict, team: str) -> dict:
+    r = rows.get(team)
+    if r is None:
+        conf, div = CONF_DIV.get(team, ("", ""))
+        r = rows[team] = {
+            "team": team, "conf": conf, "div": div, "w": 0, "l": 0, "t": 0,
+            "div_rec": [0, 0, 0], "conf_rec": [0, 0, 0], "home_rec": [0, 0, 0], "away_rec": [0, 0, 0],
+            "pf": 0, "pa": 0, "conf_net": 0, "results": [], "vs": {}, "opps": [], "beaten": [],
+        }
+    return r
+
+
+def add_game(rows: dict, g, scheduled: bool = True):
+    """
+    Fold one game into unfinished rows (before finish_standings). scheduled=False skips the
+    opponent lists, for a game that was already added while still unplayed.
+    """
+    h, a = _row(rows, g.home), _row(rows, g.away)
+    if scheduled:
+        h["opps"].append(g.away); a["opps"].append(g.home)
+    if not g.final:
+        return
+    for me, opp, pf, pa, loc in ((h, a, g.home_score, g.away_score, "home_rec"),
+                                  (a, h, g.away_score, g.home_score, "away_rec")):
+        rec = [0, 0, 0]
+        _add(rec, pf, pa)
+        me["w"] += rec[0]; me["l"] += rec[1]; me["t"] += rec[2]
+        _add(me[loc], pf, pa)
+        me["pf"] += pf; me["pa"] += pa
+        if me["conf"] and me["conf"] == opp["conf"]:
+            _add(me["conf_rec"], pf, pa)
+            me["conf_net"] += pf - pa
+            if me["div"] == opp["div"]:
+                _add(me["div_rec"], pf, pa)
+        vs = me["vs"].setdefault(opp["team"], [0, 0, 0, 0, 0])
+        _add(vs, pf, pa); vs[3] += pf; vs[4] += pa
+        me["results"].append((g.week, "W" if pf > pa else "L" if pf < pa else "T"))
+        if pf > pa:
+            me["beaten"].append(opp["team"])
+
+
+def copy_rows(rows: dict) -> dict:
+    """Copy of unfinished rows that add_game can update without touching the original."""
+    out = {}
+    for t, r in rows.items():
+        c = dict(r)
+        for k in ("div_rec", "conf_rec", "home_rec", "away_rec", "results", "beaten"):
+            c[k] = list(r[k])
+        c["vs"] = {o: list(v) for o, v in r["vs"].items()}
+        out[t] = c   # "opps" is shared: add_game(scheduled=False) never appends to it
+    return out
+
+
+def finish_standings(rows: dict, matrix=None) -> Standings:
+    """Derived columns (pct, net, streak, SoV, SoS) for rows built with add_game."""
+    rows = rows if isinstance(rows, Standings) else Standings(rows)
+    for r in rows.values():
+        r["pct"] = _pct((r["w"], r["l"], r["t"]))
+        r["net"] = r["pf"] - r["pa"]
+        res = [x for _, x in sorted(r.pop("results"), key=lambda wr: wr[0])]
+        n = 0
+        while n < len(res) and res[-1 - n] == res[-1]:
+            n += 1
+        r["streak"] = f"{res[-1]}{n}" if res else ""
+    if matrix is not None:
+        rows.matrix = matrix
+        sov, sos = matrix.sov(), matrix.sos()
+        for t, r in rows.items():
+            del r["beaten"]
+            r["sov"], r["sos"] = float(sov[matrix.idx[t]]), float(sos[matrix.idx[t]])
+        return rows
+    for r in rows.values():
+        r["sov"] = _combined_pct(rows, r.pop("beaten"))
+        r["sos"] = _combined_pct(rows, r["opps"])
+    return rows
+
+
+def _combined_pct(rows: dict, teams: list[str]) -> float:
+    w = l = t = 0
+    for x in teams:
+        o = rows[x]
+        w += o["w"]; l += o["l"]; t += o["t"]
+    return _pct((w, l, t))
+
+
+# ---------- tiebreakers (reference/tiebreakers.md) ----------
+def _rec_vs(S: dict, team: str, opps) -> tuple[int, int, int]:
+    w = l = t = 0
+    vs = S[team]["vs"]
+    for o in opps:
+        r = vs.get(o)
+        if r:
+            w += r[0]; l += r[1]; t += r[2]
+    return (w, l, t)
+
+
+def _common_opps(S: dict, group: list[str]) -> set[str]:
+    common = None
+    for t in group:
+        opps = set(S[t]["opps"]) - set(group)
+        common = opps if common is None else common & opps
+    return common or set()
+
+
+def _h2h_values(S, group, kind):
+    """
+    Head-to-head step values, or None when it does not apply.
+    Two clubs / division: win% in games among the group (every pair must have met).
+    Wild card with 3+ clubs: sweep rule only (+1 beat all the others, -1 lost to all, else 0).
+    """
+    if not all(o in S[t]["vs"] for t in group for o in group if o != t):
+        return None
+    if kind == "wildcard" and len(group) > 2:
+        vals = {}
+        for t in group:
+            recs = [S[t]["vs"][o] for o in group if o != t]
+            vals[t] = 1 if all(r[0] and not r[1] and not r[2] for r in recs) else \
+                     -1 if all(r[1] and not r[0] and not r[2] for r in recs) else 0
+        return vals
+    return {t: _pct(_rec_vs(S, t, [o for o in group if o != t])) for t in group}
+
+
+def _steps(S: dict, group: list[str], kind: str):
+    """Yield (label, {team: value}) in tiebreak order; higher value wins."""
+    h2h = _h2h_values(S, group, kind)
+    if h2h is not None:
+        yield "Head-to-head", h2h
+    if kind == "division":
+        yield "Division record", {t: _pct(S[t]["div_rec"]) for t in group}
+    m = getattr(S, "matrix", None)
+    if m is not None:
+        common_recs, min_games = m.group_common(group)
+    else:
+        common = _common_opps(S, group)
+        common_recs = {t: _rec_vs(S, t, common) for t in group}
+        min_games = min(sum(r) for r in common_recs.values())
+    if kind == "division":
+        yield "Common games", {t: _pct(common_recs[t]) for t in group}
+        yield "Conference record", {t: _pct(S[t]["conf_rec"]) for t in group}
+    else:
+        yield "Conference record", {t: _pct(S[t]["conf_rec"]) for t in group}
+        if min_games >= 4:
+            yield "Common games", {t: _pct(common_recs[t]) for t in group}
+    yield "Strength of victory", {t: S[t]["sov"] for t in group}
+    yield "Strength of schedule", {t: S[t]["sos"] for t in group}
+    yield "Net points (conference)", {t: S[t]["conf_net"] for t in group}
+    yield "Net points", {t: S[t]["net"] for t in group}
+
+
+def break_tie(S: dict, group: list[str], kind: str = "division") -> tuple[str, str]:
+    """
+    Return (winner, deciding step) among teams tied on win%.
+    kind: "division" (same division) or "wildcard" (different divisions).
+    When a step eliminates some but not all clubs, the rest restart at step one.
+    Falls back to alphabetical order in place of the coin toss.
+    """
+    group = sorted(group)
+    if len(group) == 1:
+        return group[0], ""
+    for label, vals in _steps(S, group, kind):
+        best = max(vals.values())
+        top = [t for t in group if vals[t] == best]
+        if len(top) == 1:
+            return top[0], label
+        if len(top) < len(group):
+            return break_tie(S, top, kind)
+    return group[0], "Coin toss"
+
+
+def _division_order(S: dict, teams: list[str]) -> list[str]:
+    return _order(S, teams, "division")
+
+
+def _order(S: dict, teams: list[str], kind: str) -> list[str]:
+    """Full ordering: by win%, ties broken one club at a time (the rest re-enter the next round)."""
+    out: list[str] = []
+    by_pct: dict[float, list[str]] = {}
+    for t in teams:
+        by_pct.setdefault(S[t]["pct"], []).append(t)
+    for pct in sorted(by_pct, reverse=True):
+        group = list(by_pct[pct])
+        while group:
+            if kind == "wildcard":
+                # only the highest-ranked club of each division takes part in a wild-card tie
+                divs: dict[str, list[str]] = {}
+                for t in group:
+                    divs.setdefault(S[t]["div"], []).append(t)
+                cands = [_division_order(S, ts)[0] if len(ts) > 1 else ts[0] for ts in divs.values()]
+                same_div = len(divs) == 1
+                winner, _ = break_tie(S, cands, "division" if same_div else "wildcard")
+            else:
+                winner, _ = break_tie(S, group, kind)
+            out.append(winner)
+            group.remove(winner)
+    return out
+
+
+def division_order(S: dict, conf: str, div: str) -> list[str]:
+    return _division_order(S, [t for t, r in S.items() if r["conf"] == conf and r["div"] == div])
+
+
+def seed_conference(S: dict, conf: str) -> list[dict]:
+    """Seeds 1-4: division winners by record; 5-7: best remaining records (wild-card tiebreakers)."""
+    teams = [t for t, r in S.items() if r["conf"] == conf]
+    divs = sorted({S[t]["div"] for t in teams})
+    winners = [division_order(S, conf, d)[0] for d in divs]
+    ordered_winners = _order(S, winners, "wildcard")   # one club per division: wild-card rules
+    rest = _order(S, [t for t in teams if t not in winners], "wildcard")
+    seeds = [{"seed": i + 1, "team": t, "via": "division"} for i, t in enumerate(ordered_winners)]
+    seeds += [{"seed": 5 + i, "team": t, "via": "wild card"} for i, t in enumerate(rest[:3])]
+    return seeds
+
+
+def playoff_seeds(S: dict) -> dict[str, list[dict]]:
+    return {conf: seed_conference(S, conf) for conf in ("AFC", "NFC")}
+
+
+def standings_table(S: dict) -> dict:
+    """JSON-friendly view: {conf: {div: [rows in division order]}} without the per-opponent detail."""
+    out: dict = {}
+    for conf in ("AFC", "NFC"):
+        for div in ("East", "North", "South", "West"):
+            rows = []
+            for t in division_order(S, conf, div):
+                r = S[t]
+                rows.append({k: v for k, v in r.items() if k not in ("vs", "opps")})
+            if rows:
+                out.setdefault(conf, {})[div] = rows
+    return out
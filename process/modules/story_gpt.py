@@ -1,8 +1,16 @@
 # process/modules/story_gpt.py
-import os, json
+import hashlib
 from pathlib import Path
-from openai import OpenAI
 from paths import REFERENCE_DIR
+from instrumentation import span, timed
+from .season_index import SeasonIndex
+from .schedule_view import team_games
+from .season_bin import season_view_for
+from .season_hash import season_hash_for
+from .processed_cache import load_processed
+from .franchise_store import format_key_players
+from .facts import team_digest
+from .llm_backends import StoryBackend, complete_with_retry, shared_backend
 import re
 try:
     from dotenv import load_dotenv
@@ -10,8 +18,6 @@ try:
 except Exception:
     pass
 
-client = OpenAI()  # uses OPENAI_API_KEY
-
 # (reuse your existing extract_team_lines with the REG-only + final-status filter)
 
 def _strip_first_part2_block(txt: str) -> str:
@@ -31,7 +37,10 @@ def load_references(names: list[str], max_chars: int = 4000) -> str:
         p = REFERENCE_DIR / fname
         parts.append(p.read_text(encoding="utf-8") if p.exists() else f"[Missing reference: {fname}]")
     blob = "\n\n".join(parts)
-    return blob[:max_chars]
+    if len(blob) <= max_chars:
+        return blob
+    cut = blob.rfind("\n\n", 0, max_chars)  # never stop mid-paragraph
+    return blob[:cut if cut > 0 else max_chars].rstrip()
 
 def _score_for(game: dict, team: str):
     for k, v in game.items():
@@ -54,149 +63,320 @@ def extract_team_lines(grouped_json: dict, team: str, *, include_preseason: bool
     FINAL_STATUSES = {2, 3}
 
     lines = []
-    for phase in phases:
-        weeks = grouped_json.get(phase, {})
-        if not isinstance(weeks, dict):
+    for _, week_label, game in team_games(grouped_json, team, phases):
+        # Only finished games
+        if game.get("status") not in FINAL_STATUSES:
             continue
-        for week_label, matchups in weeks.items():
-            if not isinstance(matchups, dict):
-                continue
-            for _, game in matchups.items():
-                if not isinstance(game, dict):
-                    continue
-
-                # Only finished games
-                if game.get("status") not in FINAL_STATUSES:
-                    continue
-
-                home = game.get("homeTeamName")
-                away = game.get("awayTeamName")
-                if team not in (home, away):
-                    continue
-
-                # Find scores using "<Team Name> Score" keys
-                pf = pa = None
-                for k, v in game.items():
-                    if isinstance(k, str) and k.endswith(" Score"):
-                        if k.startswith(team):
-                            pf = v
-                        else:
-                            pa = v if pa is None else pa
-
-                # Require real scores; skip 0–0 placeholders
-                if pf is None or pa is None:
-                    continue
-                if pf == 0 and pa == 0:
-                    continue
-
-                res = "W" if pf > pa else "L" if pf < pa else "T"
-                lines.append(f"{week_label}: {home} vs {away} — {team} {pf}-{pa} ({res})")
+
+        home = game.get("homeTeamName")
+        away = game.get("awayTeamName")
+
+        # Find scores using "<Team Name> Score" keys
+        pf = pa = None
+        for k, v in game.items():
+            if isinstance(k, str) and k.endswith(" Score"):
+                if k.startswith(team):
+                    pf = v
+                else:
+                    pa = v if pa is None else pa
+
+        # Require real scores; skip 0–0 placeholders
+        if pf is None or pa is None:
+            continue
+        if pf == 0 and pa == 0:
+            continue
+
+        res = "W" if pf > pa else "L" if pf < pa else "T"
+        lines.append(f"{week_label}: {home} vs {away} — {team} {pf}-{pa} ({res})")
     return lines
 
 
+@timed("list_teams_from_final")
 def list_teams_from_final(processed_path: Path) -> set[str]:
-    """Read your final grouped schedule and return a set of team names present."""
-    data = json.loads(Path(processed_path).read_text(encoding="utf-8"))
-    teams: set[str] = set()
-    for phase in ("pre", "reg"):
-        weeks = data.get(phase, {})
-        if not isinstance(weeks, dict):
-            continue
-        for _, matchups in weeks.items():
-            if not isinstance(matchups, dict):
-                continue
-            for _, game in matchups.items():
-                if not isinstance(game, dict):
-                    continue
-                home = game.get("homeTeamName")
-                away = game.get("awayTeamName")
-                if home: teams.add(home)
-                if away: teams.add(away)
-    return teams
+    """Team names present in the final grouped schedule (from its mapped binary copy)."""
+    with span("season_bin.map"):
+        return set(season_view_for(processed_path).teams)
+
+def roster_fingerprint(team: str) -> str:
+    """Digest of the team's "Key players" line: part of PDF cache keys, so roster syncs refresh them."""
+    return hashlib.blake2b(format_key_players(team).encode("utf-8"), digest_size=6).hexdigest()
 
 def compute_basic_stats(grouped_json: dict, team: str) -> dict:
     """W-L(-T) and point differential from REG games marked final (status 2 or 3)."""
     FINAL_STATUSES = {2, 3}
     w = l = t = diff = 0
-    reg = grouped_json.get("reg", {})
-    if isinstance(reg, dict):
-        for matchups in reg.values():
-            if not isinstance(matchups, dict):
-                continue
-            for game in matchups.values():
-                if not isinstance(game, dict) or game.get("status") not in FINAL_STATUSES:
-                    continue
-                if team not in (game.get("homeTeamName"), game.get("awayTeamName")):
-                    continue
-                pf = _score_for(game, team)
-                pa = _score_against(game, team)
-                if pf is None or pa is None:
-                    continue
-                diff += (pf - pa)
-                if pf > pa: w += 1
-                elif pf < pa: l += 1
-                else: t += 1
+    for _, _, game in team_games(grouped_json, team, ("reg",)):
+        if game.get("status") not in FINAL_STATUSES:
+            continue
+        pf = _score_for(game, team)
+        pa = _score_against(game, team)
+        if pf is None or pa is None:
+            continue
+        diff += (pf - pa)
+        if pf > pa: w += 1
+        elif pf < pa: l += 1
+        else: t += 1
     return {"REG_W": w, "REG_L": l, "REG_T": t, "POINT_DIFF": diff}
 
 def _format_record(stats: dict) -> str:
     return f"{stats['REG_W']}-{stats['REG_L']}" + (f"-{stats['REG_T']}" if stats['REG_T'] else "")
 
+# ==============================
+# Token-budgeted prompt builder
+# ==============================
+try:
+    import tiktoken
+    _ENC = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENC = None
+
+def estimate_tokens(text: str) -> int:
+    """Token count via tiktoken when installed, else the usual ~4 chars/token estimate."""
+    if not text:
+        return 0
+    if _ENC is not None:
+        return len(_ENC.encode(text))
+    return (len(text) + 3) // 4
+
+def split_sections(md: str) -> dict[str, str]:
+    """Split markdown on '##'/'###' headings -> {heading text: section text incl. heading}."""
+    out: dict[str, str] = {}
+    heads = list(re.finditer(r"(?m)^#{2,3}\s+(.+?)\s*$", md))
+    for i, m in enumerate(heads):
+        end = heads[i + 1].start() if i + 1 < len(heads) else len(md)
+        body = md[m.start():end]
+        body = re.sub(r"\s*\((?:\[[^\]]+\]\[\d+\],?\s*)+\)", "", body)   # ([ESPN.com][4], ...) citations
+        body = re.sub(r"(?m)^\[\d+\]:.*$", "", body)                         # link reference lines
+        body = re.sub(r"(?m)^-{3,}\s*$", "", body)                            # horizontal rules
+        out[m.group(1).strip("*: ")] = re.sub(r"\n{3,}", "\n\n", body).strip()
+    return out
+
+def _reference_sections(name: str) -> dict[str, str]:
+    p = REFERENCE_DIR / (name if name.endswith(".md") else f"{name}.md")
+    return split_sections(p.read_text(encoding="utf-8")) if p.exists() else {}
+
+def _pick(sections: dict[str, str], prefix: str) -> str:
+    for head, body in sections.items():
+        if head.lower().startswith(prefix.lower()):
+            return body
+    return ""
+
+def _team_situation(data: dict, team: str) -> dict:
+    """Which tiebreak scenarios can still matter: rivals whose final win range overlaps the team's."""
+    from .tiebreaks import CONF_DIV, pair_records
+    R = pair_records(data)
+    def win_range(t):
+        w = R.wins(t)
+        return w, w + R.remaining(t)
+    if team not in CONF_DIV:
+        return {"division": True, "wildcard": True, "multi": True}
+    lo, hi = win_range(team)
+    conf, div = CONF_DIV[team]
+    div_live = wc_live = 0
+    for other, (c, d) in CONF_DIV.items():
+        if other == team or c != conf:
+            continue
+        o_lo, o_hi = win_range(other)
+        if o_lo <= hi and lo <= o_hi:
+            if d == div: div_live += 1
+            else: wc_live += 1
+    return {"division": div_live > 0, "wildcard": wc_live > 0, "multi": div_live + wc_live > 1}
+
+def encode_schedule_compact(data: dict, team: str, *, include_preseason: bool = False) -> list[str]:
+    """
+    One short line per played week, e.g. 'Wk3 @DAL W 24-17' / 'Wk4 v PHI L 10-13'
+    (same games as extract_team_lines), followed by one 'Left:' line of unplayed games.
+    """
+    from .tiebreaks import TEAM_ABBR
+    ab = lambda t: TEAM_ABBR.get(t, t)
+    phases = ("pre", "reg") if include_preseason else ("reg",)
+    played, left = [], []
+    for phase, week_label, game in team_games(data, team, phases):
+        home, away = game.get("homeTeamName"), game.get("awayTeamName")
+        wk = ("P" if phase == "pre" else "") + "Wk" + week_label.split()[-1]
+        where = f"v {ab(away)}" if team == home else f"@{ab(home)}"
+        pf, pa = _score_for(game, team), _score_against(game, team)
+        if game.get("status") not in {2, 3} or pf is None or pa is None or (pf == 0 and pa == 0):
+            if phase == "reg":
+                left.append(f"{wk} {where}")
+            continue
+        res = "W" if pf > pa else "L" if pf < pa else "T"
+        played.append(f"{wk} {where} {res} {pf}-{pa}")
+    if left:
+        played.append("Left: " + ", ".join(left))
+    return played
+
+def _form_line(index: SeasonIndex, team: str) -> str:
+    """Stretch records from the index's prefix sums, e.g. 'By stretch: Wk0-5 4-2, ...; last 4: 3-1'."""
+    played = [g.week for g in index.final_games(team)]
+    if not played:
+        return ""
+    last = max(played)
+    def rec(a, b):
+        w, l, t, _, _ = index.record_range(team, a, b)
+        return f"{w}-{l}" + (f"-{t}" if t else "")
+    stretches = [(a, min(a + 5, last)) for a in range(0, last + 1, 6)]
+    parts = ", ".join(f"Wk{a}-{b} {rec(a, b)}" for a, b in stretches)
+    return f"By stretch: {parts}; last 4 weeks: {rec(last - 3, last)}"
+
+STORY_SYSTEM = (
+    "You are an NFL analyst. Use only the provided schedule lines and reference text. "
+    "Write in a cohesive, free-flow, human tone. Do not invent games or stats beyond the lines.\n"
+    "Schedule lines are compact: 'Wk3 @DAL W 24-17' = week 3 at Dallas, won 24-17 (team's score first); "
+    "'v' = home game; 'Left:' lists unplayed games. Teams use standard NFL abbreviations.\n"
+    "'Season facts' are precomputed from the same games (streaks, one-score record, biggest margins, "
+    "division series, current tiebreak edges); use them as given rather than recounting.\n"
+    "Output ONLY a single section titled 'Part 1: Season narrative' as free-flow paragraphs. "
+    "Do NOT include any 'Part 2' sections, bullet lists, or a separate tiebreaker section—"
+    "the application will add Part 2 after your text."
+)
+
+def build_story_prompt(data: dict, team: str, *, include_preseason: bool = False,
+                       references: list[str] | None = None, max_prompt_tokens: int = 3000,
+                       state: str | None = None) -> dict:
+    """
+    Build the story prompt under a token budget. `state` (the regular-season digest, when the
+    caller has one) keys the cached season facts.
+    Layout (most shared first, so provider-side prompt caching can reuse the prefix):
+      system: fixed instructions + template guidance for Part 1 + seeding overview   (same for every team)
+      user:   tiebreak rule sections relevant to this team (fixed order) + team data
+    Returns {"system", "user", "tokens": {"prefix", "rules", "team", "total"}, "dropped": [...]}.
+    """
+    refs = references or ["tiebreaker_story_template", "tiebreakers"]
+    template = _reference_sections(refs[0]) if refs else {}
+    rules: dict[str, str] = {}
+    for name in refs[1:]:
+        rules.update(_reference_sections(name))
+
+    system = "\n\n".join(x for x in (
+        STORY_SYSTEM,
+        _pick(template, "Part 1"),
+        _pick(rules, "Seeding Overview"),
+    ) if x)
+
+    sit = _team_situation(data, team)
+    division = _pick(rules, "Division Tie-Breaker")
+    if division and not sit["multi"]:
+        division = re.split(r"(?m)^#### Notes on Three", division)[0].rstrip()
+    optional = [  # (label, text) in a fixed order; dropped from the end when over budget
+        ("division rules", division if sit["division"] else ""),
+        ("wild-card rules", _pick(rules, "Wild-Card Tie-Breaker") if sit["wildcard"] else ""),
+        ("clarifications", _pick(rules, "Additional Clarifications") if sit["multi"] else ""),
+    ]
+    optional = [(k, v) for k, v in optional if v]
+
+    stats = compute_basic_stats(data, team)
+    from .tiebreaks import TEAM_ABBR
+    lines = encode_schedule_compact(data, team, include_preseason=include_preseason)
+    index = SeasonIndex.from_processed(data)
+    form = _form_line(index, team)
+    facts = team_digest(data, team, index, state)
+    players = format_key_players(team)
+
+    def team_block(lines_):
+        return (f"TEAM: {team} ({TEAM_ABBR.get(team, team)})\n"
+                f"Regular-season record: {_format_record(stats)}; point differential: {stats['POINT_DIFF']:+d}\n"
+                + (f"{form}\n" if form else "")
+                + (f"Key players: {players}\n" if players else "")
+                + ("Season facts:\n" + "\n".join(facts) + "\n" if facts else "")
+                + "Schedule (completed games):\n" + "\n".join(lines_))
+
+    dropped = []
+    prefix_tokens = estimate_tokens(system)
+    while True:
+        rules_text = "\n\n".join(v for _, v in optional)
+        team_text = team_block(lines)
+        total = prefix_tokens + estimate_tokens(rules_text) + estimate_tokens(team_text)
+        if total <= max_prompt_tokens:
+            break
+        if optional:
+            dropped.append(optional.pop()[0])
+        elif len(lines) > 1:
+            lines = lines[1:]          # oldest week first
+            if "schedule lines" not in dropped:
+                dropped.append("schedule lines")
+        else:
+            break
+
+    user = (f"Tie-break rules that can apply to this team:\n{rules_text}\n\n" if rules_text else "") + team_text
+    return {
+        "system": system,
+        "user": user,
+        "tokens": {"prefix": prefix_tokens, "rules": estimate_tokens(rules_text),
+                   "team": estimate_tokens(team_text), "total": total},
+        "dropped": dropped,
+    }
+
+def story_fingerprint(data: dict, team: str, *, include_preseason: bool = False,
+                      references: list[str] | None = None, max_prompt_tokens: int = 3000,
+                      state: str | None = None) -> str:
+    """
+    Digest of the prompt generate_story would send for `team` (arguments as build_story_prompt):
+    the story cache key. Other teams' games reach it only through the facts lines and rule
+    sections the prompt shows, so a game elsewhere in the conference leaves it alone unless it
+    changes one of those.
+    """
+    p = build_story_prompt(data, team, include_preseason=include_preseason, references=references,
+                           max_prompt_tokens=max_prompt_tokens, state=state)
+    return hashlib.blake2b(f"{p['system']}\0{p['user']}".encode("utf-8"), digest_size=8).hexdigest()
+
+@timed("generate_story_from_file")
 def generate_story_from_file(
     processed_path: Path,
     team: str,
     model: str = "gpt-4o-mini",
     include_preseason: bool = False,
     references: list[str] | None = None,
+    max_prompt_tokens: int = 3000,
+    prompt_stats: dict | None = None,
+    backend: StoryBackend | None = None,
+    timeout: float | None = None,
 ) -> str:
-    if not os.getenv("OPENAI_API_KEY"):
-        raise RuntimeError("OPENAI_API_KEY not set. Put it in .env or your environment.")
+    with span("processed.load"):
+        data = load_processed(processed_path)
+        state = season_hash_for(processed_path, data).phase("reg")
+    return generate_story(data, team, model, include_preseason, references, max_prompt_tokens,
+                          prompt_stats, backend=backend, timeout=timeout, state=state)
 
-    data = json.loads(Path(processed_path).read_text(encoding="utf-8"))
 
-    # 1) Build schedule lines (REG only, final games)
-    lines = extract_team_lines(data, team, include_preseason=include_preseason)
-    schedule_block = "\n".join(lines[:150])
+def generate_story(
+    data: dict,
+    team: str,
+    model: str = "gpt-4o-mini",
+    include_preseason: bool = False,
+    references: list[str] | None = None,
+    max_prompt_tokens: int = 3000,
+    prompt_stats: dict | None = None,
+    *,
+    backend: StoryBackend | None = None,
+    on_delta=None,
+    retry_stats: dict | None = None,
+    timeout: float | None = None,
+    state: str | None = None,
+) -> str:
+    """
+    Story for an already-parsed processed schedule. `backend` defaults to the process-wide
+    shared one (llm_backends.shared_backend); transient failures are retried with backoff.
+    With `on_delta`, the text is streamed and each piece passed to it as it arrives.
+    `timeout` (seconds per attempt) overrides the backend's own.
+    """
+    backend = backend or shared_backend()
 
-    # 2) Compute stats for the prompt
-    stats = compute_basic_stats(data, team)
-    record = _format_record(stats)
-    point_diff = f"{stats['POINT_DIFF']:+d}"
-    record = f"{stats['REG_W']}-{stats['REG_L']}" + (f"-{stats['REG_T']}" if stats['REG_T'] else "")
-    point_diff = f"{stats['POINT_DIFF']:+d}"
+    # 1) Compact, token-budgeted prompt (shared prefix first)
+    prompt = build_story_prompt(data, team, include_preseason=include_preseason,
+                                references=references, max_prompt_tokens=max_prompt_tokens, state=state)
+    tok = prompt["tokens"]
+    if prompt_stats is not None:
+        prompt_stats.update(tok, dropped=prompt["dropped"])
+    record = _format_record(compute_basic_stats(data, team))
+    system, user = prompt["system"], prompt["user"]
 
-    # 3) Load soft guidance (template first) + rulebook
-    refs = references or ["tiebreaker_story_template", "tiebreakers"]
-    refs_text = load_references(refs)
-
-    # 4) Free-flow prompt (no bullets, no cap)
-    system = (
-        "You are an NFL analyst. Use only the provided schedule lines and reference text. "
-        "Write in a cohesive, free-flow, human tone. Do not invent games or stats beyond the lines."
-    )
-
-    user = (
-        f"TEAM: {team}\n"
-        f"Regular-season record (from provided lines): {record}\n"
-        f"Point differential: {point_diff}\n\n"
-        f"Schedule lines (regular season, completed games only):\n{schedule_block}\n\n"
-        "Reference (template guidance first, then official tie-break rules):\n"
-        f"{refs_text}\n\n"
-        # >>> NEW: only Part 1
-        "Output ONLY a single section titled 'Part 1: Season narrative' as free-flow paragraphs. "
-        "Do NOT include any 'Part 2' sections, bullet lists, or a separate tiebreaker section—"
-        "the application will add Part 2 after your text."
-    )
-
-    resp = client.responses.create(
-        model=model,
-        input=[{"role": "system", "content": system},
-            {"role": "user", "content": user}],
-        # no temperature if your model rejects it
-    )
-
-    body = resp.output_text.strip()
-    body = _strip_first_part2_block(body)  # <<< SAFETY BELT applied here
+    with span("story.network", model=model, prompt_tokens=tok["total"], prefix_tokens=tok["prefix"],
+              rules_tokens=tok["rules"], team_tokens=tok["team"], backend=backend.name):
+        body = complete_with_retry(backend, system, user, model=model, timeout=timeout,
+                                   on_delta=on_delta, stats=retry_stats)
+
+    body = _strip_first_part2_block(body.strip())  # <<< SAFETY BELT applied here
 
     title = f"{team} — {record}"
     return f"{title}\n\n{body}"
-
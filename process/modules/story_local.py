@@ -0,0 +1,135 @@
+# process/modules/story_local.py — "Part 1: Season narrative" without an LLM
+#
+#   text = build_local_story(processed, "Dallas Cowboys")   # same "Team — W-L\n\nPart 1..." shape as the LLM story
+#
+# Deterministic: the same season state always gives the same text. Sentences are picked from
+# the computed facts (stretch records, streaks, margins, division series, seed / clinch status)
+# following the beats the story template asks for: how the season opened, the turning points,
+# where it stands now and what is left. Phrase variants are chosen by a stable hash of the team
+# name so a 32-team book doesn't repeat the same sentence on every page.
+from __future__ import annotations
+
+import re
+import zlib
+
+from paths import REFERENCE_DIR
+from .facts import season_facts
+from .scenario import clinch_status
+from .season_index import SeasonIndex
+from .standings import compute_standings, division_order, playoff_seeds
+from .tiebreaks import TEAM_ABBR
+
+DEFAULT_HEADING = "Part 1: Season Narrative"
+
+
+def _rec(w, l, t=0) -> str:
+    return f"{w}-{l}" + (f"-{t}" if t else "")
+
+
+def _pick(team: str, salt: str, options: tuple[str, ...]) -> str:
+    return options[zlib.crc32(f"{team}|{salt}".encode()) % len(options)]
+
+
+def _template_heading(references: list[str] | None) -> str:
+    """The Part 1 heading as written in the story template (falls back to DEFAULT_HEADING)."""
+    for name in references or ["tiebreaker_story_template"]:
+        p = REFERENCE_DIR / (name if name.endswith(".md") else f"{name}.md")
+        if p.exists():
+            m = re.search(r"(?mi)^#{2,3}\s+(Part\s*1\b.*?)\s*$", p.read_text(encoding="utf-8"))
+            if m:
+                return m.group(1).strip("*: ")
+    return DEFAULT_HEADING
+
+
+def _arc(index: SeasonIndex, team: str, f: dict) -> list[str]:
+    """Opening stretch, turning points and recent form."""
+    played = [g.week for g in index.final_games(team)]
+    if not played:
+        return [f"{team} has yet to complete a regular-season game."]
+    last = max(played)
+    split = min(5, last)
+    w1, l1, t1, _, _ = index.record_range(team, 0, split)
+    out = []
+    if w1 > l1 + 1:
+        out.append(_pick(team, "open", (f"{team} came out fast, going {_rec(w1, l1, t1)} through Week {split}.",
+                                        f"A {_rec(w1, l1, t1)} start through Week {split} set the tone early.")))
+    elif l1 > w1 + 1:
+        out.append(_pick(team, "open", (f"The season opened in a hole at {_rec(w1, l1, t1)} through Week {split}.",
+                                        f"{team} stumbled out of the gate, {_rec(w1, l1, t1)} through Week {split}.")))
+    else:
+        out.append(f"{team} opened {_rec(w1, l1, t1)} through Week {split}, finding its footing week to week.")
+
+    n, a, b = f["win_run"]
+    if n >= 2:
+        out.append(f"The high point was a {n}-game winning run from Week {a} to Week {b}.")
+    n, a, b = f["loss_run"]
+    if n >= 3:
+        out.append(f"The low point was a {n}-game skid from Week {a} to Week {b}.")
+
+    big_w, big_l = f["biggest_win"], f["biggest_loss"]
+    if big_w:
+        out.append(_pick(team, "bigw", ("The signature result was a {m}-point win {where} {opp} in Week {wk}.",
+                                        "Its most emphatic win came in Week {wk}, by {m} {where} {opp}."))
+                   .format(m=big_w["margin"], where="over" if big_w["home"] else "at", opp=big_w["opp"], wk=big_w["week"]))
+    if big_l and big_l["margin"] <= -14:
+        out.append(f"The worst day was a {-big_l['margin']}-point loss "
+                   f"{'at home to' if big_l['home'] else 'at'} {big_l['opp']} in Week {big_l['week']}.")
+
+    w, l, t = f["one_score"]
+    if w + l + t >= 3:
+        tone = ("has been clutch" if w > l else "has come up short" if l > w else "has split the difference")
+        out.append(f"In one-score games it {tone} at {_rec(w, l, t)}.")
+
+    rw, rl, rt, _, _ = index.record_range(team, max(0, last - 3), last)
+    if rw >= 3:
+        out.append(f"Lately it is rolling, {_rec(rw, rl, rt)} over the last four weeks.")
+    elif rl >= 3:
+        out.append(f"Recent form is a concern at {_rec(rw, rl, rt)} over the last four weeks.")
+    else:
+        out.append(f"The last four weeks have gone {_rec(rw, rl, rt)}.")
+    return out
+
+
+def _standing(index: SeasonIndex, S, team: str, f: dict) -> list[str]:
+    """Record, division place, seed / clinch status and what is left."""
+    r = S[team]
+    conf, div = r["conf"], r["div"]
+    out = [f"At {_rec(r['w'], r['l'], r['t'])} with a {r['net']:+d} point differential,"]
+    if conf:
+        order = division_order(S, conf, div)
+        place = order.index(team) + 1
+        seeds = playoff_seeds(S)
+        seed = next((s for s in seeds[conf] if s["team"] == team), None)
+        status = clinch_status(S, index.remaining_games(), seeds).get(team, {})
+        out[0] += (f" {team} sits {('first', 'second', 'third', 'fourth')[min(place, 4) - 1]} in the {conf} {div}"
+                   + (f" and holds the No. {seed['seed']} seed." if seed else " and is outside the playoff field for now."))
+        if status.get("division") == "clinched":
+            out.append("The division title is already locked up.")
+        elif status.get("playoffs") == "clinched":
+            out.append("A playoff berth is secured.")
+        elif status.get("playoffs") == "eliminated":
+            out.append("The playoff door has closed, so the remaining games are about pride and draft position.")
+    else:
+        out[0] += f" {team} is still building its season."
+    if f["division"]:
+        out.append("Inside the division: " + "; ".join(f["division"]) + ".")
+    left = index.remaining_games(team)
+    if left:
+        opps = ", ".join(f"{'vs' if g.home == team else 'at'} {TEAM_ABBR.get(g.away if g.home == team else g.home, '?')}"
+                         for g in left)
+        out.append(f"Still to play: {opps}.")
+    return out
+
+
+def build_local_story(data: dict, team: str, *, references: list[str] | None = None,
+                      index: SeasonIndex | None = None, state: str | None = None) -> str:
+    """Title line + Part 1 narrative for `team`, from the processed schedule alone (`state` as in facts)."""
+    index = index or SeasonIndex.from_processed(data)
+    S = compute_standings(index)
+    if team not in S:
+        raise ValueError(f"Unknown team: {team}")
+    f = season_facts(data, index, state)[team]
+    r = S[team]
+    body = [_template_heading(references), "", " ".join(_arc(index, team, f)), "", " ".join(_standing(index, S, team, f))]
+    text = re.sub(r"[ \t]+", " ", "\n".join(body)).strip()
+    return f"{team} — {_rec(r['w'], r['l'], r['t'])}\n\n{text}"
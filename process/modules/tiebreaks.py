@@ -1,8 +1,15 @@
 # process/modules/tiebreaks.py
 from __future__ import annotations
 from pathlib import Path
-import json
 from collections import defaultdict
+from instrumentation import span, timed
+from .processed_cache import load_processed
+from .schedule_view import iter_phase
+
+try:
+    from .h2h import h2h_for          # NumPy pair matrices: O(1) head-to-head / common-games lookups
+except ImportError:
+    h2h_for = None                    # fall back to scanning per-team game lists
 
 # helpers (put near your other utilities)
 FINAL_STATUSES = {2, 3}
@@ -12,29 +19,23 @@ def _scores_by_team(game: dict) -> dict:
 
 def head_to_head_status(schedule_json: dict, a: str, b: str) -> dict:
     """Return head-to-head record and whether it's clinched."""
+    if h2h_for is not None:
+        st = h2h_for(schedule_json).status(a, b)
+        return {k: st[k] for k in ("a_w", "a_l", "a_t", "final_played", "pending", "clinched")}
     total = final = a_w = a_l = a_t = 0
-    for phase in ("reg",):  # only regular season for tiebreakers
-        weeks = schedule_json.get(phase, {})
-        if not isinstance(weeks, dict): 
-            continue
-        for matchups in weeks.values():
-            if not isinstance(matchups, dict):
-                continue
-            for g in matchups.values():
-                if not isinstance(g, dict):
+    for _, g in iter_phase(schedule_json.get("reg")):  # only regular season for tiebreakers
+        teams = (g.get("homeTeamName"), g.get("awayTeamName"))
+        if a in teams and b in teams:
+            total += 1
+            if g.get("status") in FINAL_STATUSES:
+                final += 1
+                scores = _scores_by_team(g)
+                a_pts, b_pts = scores.get(a), scores.get(b)
+                if a_pts is None or b_pts is None:
                     continue
-                teams = (g.get("homeTeamName"), g.get("awayTeamName"))
-                if a in teams and b in teams:
-                    total += 1
-                    if g.get("status") in FINAL_STATUSES:
-                        final += 1
-                        scores = _scores_by_team(g)
-                        a_pts, b_pts = scores.get(a), scores.get(b)
-                        if a_pts is None or b_pts is None:
-                            continue
-                        if a_pts > b_pts: a_w += 1
-                        elif a_pts < b_pts: a_l += 1
-                        else: a_t += 1
+                if a_pts > b_pts: a_w += 1
+                elif a_pts < b_pts: a_l += 1
+                else: a_t += 1
     pending = total - final
     # Clinch logic: if the trailing side cannot catch up with remaining games
     # For typical 2-game divisional series:
@@ -63,6 +64,17 @@ for t in AFC_EAST:  CONF_DIV[t] = ("AFC", "East")
 for t in AFC_NORTH: CONF_DIV[t] = ("AFC", "North")
 for t in AFC_SOUTH: CONF_DIV[t] = ("AFC", "South")
 
+TEAM_ABBR = {
+    "Arizona Cardinals": "ARI", "Los Angeles Rams": "LAR", "San Francisco 49ers": "SF", "Seattle Seahawks": "SEA",
+    "Dallas Cowboys": "DAL", "New York Giants": "NYG", "Philadelphia Eagles": "PHI", "Washington Commanders": "WAS",
+    "Chicago Bears": "CHI", "Detroit Lions": "DET", "Green Bay Packers": "GB", "Minnesota Vikings": "MIN",
+    "Atlanta Falcons": "ATL", "Carolina Panthers": "CAR", "New Orleans Saints": "NO", "Tampa Bay Buccaneers": "TB",
+    "Denver Broncos": "DEN", "Kansas City Chiefs": "KC", "Las Vegas Raiders": "LV", "Los Angeles Chargers": "LAC",
+    "Buffalo Bills": "BUF", "Miami Dolphins": "MIA", "New England Patriots": "NE", "New York Jets": "NYJ",
+    "Baltimore Ravens": "BAL", "Cincinnati Bengals": "CIN", "Cleveland Browns": "CLE", "Pittsburgh Steelers": "PIT",
+    "Houston Texans": "HOU", "Indianapolis Colts": "IND", "Jacksonville Jaguars": "JAX", "Tennessee Titans": "TEN",
+}
+
 
 # --- Core parsing helpers ---
 def _score_for(game: dict, team: str):
@@ -74,26 +86,19 @@ def _collect_games_by_team(processed: dict):
     """Return team_games dict: team -> list of dict(opponent, pf, pa) for REG finished games only."""
     team_games = defaultdict(list)
     all_teams = set()
-    reg = processed.get("reg", {})
-    if not isinstance(reg, dict):
-        return team_games, all_teams
-
-    for _, matchups in reg.items():
-        if not isinstance(matchups, dict):
+    for _, g in iter_phase(processed.get("reg")):
+        if g.get("status") not in FINAL_STATUSES:
             continue
-        for _, g in matchups.items():
-            if not isinstance(g, dict) or g.get("status") not in FINAL_STATUSES:
-                continue
-            home, away = g.get("homeTeamName"), g.get("awayTeamName")
-            if not home or not away:
-                continue
-            hs = _score_for(g, home)
-            as_ = _score_for(g, away)
-            if hs is None or as_ is None:
-                continue
-            all_teams.update([home, away])
-            team_games[home].append(dict(opponent=away, pf=hs, pa=as_))
-            team_games[away].append(dict(opponent=home, pf=as_, pa=hs))
+        home, away = g.get("homeTeamName"), g.get("awayTeamName")
+        if not home or not away:
+            continue
+        hs = _score_for(g, home)
+        as_ = _score_for(g, away)
+        if hs is None or as_ is None:
+            continue
+        all_teams.update([home, away])
+        team_games[home].append(dict(opponent=away, pf=hs, pa=as_))
+        team_games[away].append(dict(opponent=home, pf=as_, pa=hs))
     return team_games, all_teams
 
 def _wlt(records):
@@ -138,7 +143,46 @@ def describe_division_tiebreak(schedule_json: dict, team: str, opp: str) -> str:
                 "Proceed to division record, then common games (≥4), then conference record.")
 
 
-# --- Compare functions per NFL procedures ---
+# --- Pair records: the NumPy matrix when available, else per-team game lists ---
+class _ScanRecords:
+    """Pure-Python stand-in for h2h.H2HMatrix (same query methods) used when NumPy is missing."""
+
+    def __init__(self, processed: dict):
+        self.team_games, teams = _collect_games_by_team(processed)
+        self.teams = sorted(teams)
+        self._processed = processed
+
+    def record(self, a, b):
+        return _wlt([r for r in self.team_games[a] if r["opponent"] == b])
+
+    def games(self, a, b):
+        return [(r["pf"], r["pa"]) for r in self.team_games[a] if r["opponent"] == b]
+
+    def leader(self, a, b):
+        return _head_to_head(self.team_games, a, b)[0]
+
+    def common(self, a, b):
+        return _common_games_records(self.team_games, a, b)
+
+    def division_record(self, team):
+        return _record_vs_filter(self.team_games, team, lambda opp: CONF_DIV.get(opp) == CONF_DIV.get(team))
+
+    def conference_record(self, team):
+        conf = CONF_DIV.get(team, ("", ""))[0]
+        return _record_vs_filter(self.team_games, team, lambda opp: CONF_DIV.get(opp, ("", ""))[0] == conf)
+
+    def wins(self, team):
+        return _current_wins(self.team_games, team)
+
+    def remaining(self, team):
+        return _remaining_games(self._processed, team)
+
+
+def pair_records(processed: dict):
+    """Everything the tiebreak steps need for any pair, built once per schedule."""
+    return h2h_for(processed) if h2h_for is not None else _ScanRecords(processed)
+
+
 def _common_games_records(team_games, A, B):
     oppsA = {r["opponent"] for r in team_games[A]} - {B}
     oppsB = {r["opponent"] for r in team_games[B]} - {A}
@@ -147,59 +191,59 @@ def _common_games_records(team_games, A, B):
     recB = _wlt([r for r in team_games[B] if r["opponent"] in common])
     return recA, recB, len(common)
 
-def compare_division_tiebreak(processed: dict, A: str, B: str):
-    team_games, _ = _collect_games_by_team(processed)
+
+# --- Compare functions per NFL procedures ---
+def _cmp(a_rec, b_rec) -> str:
+    return "A" if _winpct(a_rec) > _winpct(b_rec) else "B" if _winpct(b_rec) > _winpct(a_rec) else "Tie"
+
+def compare_division_tiebreak(processed: dict, A: str, B: str, records=None):
+    R = records or pair_records(processed)
     steps = []
 
     # 1) Head-to-head
-    h2h_res, h2h_wlt = _head_to_head(team_games, A, B)
+    h2h_res, h2h_wlt = R.leader(A, B), R.record(A, B)
     steps.append(("Head-to-head", h2h_res, h2h_wlt))
     if h2h_res in ("A", "B"): return steps
 
     # 2) Division record
-    A_div = _record_vs_filter(team_games, A, lambda opp: CONF_DIV.get(opp) == CONF_DIV.get(A))
-    B_div = _record_vs_filter(team_games, B, lambda opp: CONF_DIV.get(opp) == CONF_DIV.get(B))
-    cmp_div = "A" if _winpct(A_div) > _winpct(B_div) else "B" if _winpct(B_div) > _winpct(A_div) else "Tie"
+    A_div, B_div = R.division_record(A), R.division_record(B)
+    cmp_div = _cmp(A_div, B_div)
     steps.append(("Division record", cmp_div, A_div, B_div))
     if cmp_div in ("A", "B"): return steps
 
     # 3) Common games (min 4)
-    A_c, B_c, n = _common_games_records(team_games, A, B)
+    A_c, B_c, n = R.common(A, B)
     if n >= 4:
-        cmp_c = "A" if _winpct(A_c) > _winpct(B_c) else "B" if _winpct(B_c) > _winpct(A_c) else "Tie"
+        cmp_c = _cmp(A_c, B_c)
         steps.append((f"Common games (n={n})", cmp_c, A_c, B_c))
         if cmp_c in ("A", "B"): return steps
     else:
         steps.append((f"Common games (n={n})", "N/A", A_c, B_c))
 
     # 4) Conference record
-    A_conf = _record_vs_filter(team_games, A, lambda opp: CONF_DIV.get(opp, ("",""))[0] == "NFC")
-    B_conf = _record_vs_filter(team_games, B, lambda opp: CONF_DIV.get(opp, ("",""))[0] == "NFC")
-    cmp_conf = "A" if _winpct(A_conf) > _winpct(B_conf) else "B" if _winpct(B_conf) > _winpct(A_conf) else "Tie"
-    steps.append(("Conference record", cmp_conf, A_conf, B_conf))
+    A_conf, B_conf = R.conference_record(A), R.conference_record(B)
+    steps.append(("Conference record", _cmp(A_conf, B_conf), A_conf, B_conf))
     return steps
 
-def compare_wildcard_tiebreak(processed: dict, A: str, B: str):
-    team_games, _ = _collect_games_by_team(processed)
+def compare_wildcard_tiebreak(processed: dict, A: str, B: str, records=None):
+    R = records or pair_records(processed)
     steps = []
 
     # 1) Head-to-head (if any)
-    h2h_res, h2h_wlt = _head_to_head(team_games, A, B)
+    h2h_res, h2h_wlt = R.leader(A, B), R.record(A, B)
     steps.append(("Head-to-head", h2h_res, h2h_wlt))
     if h2h_res in ("A", "B"): return steps
 
     # 2) Conference record
-    A_conf = _record_vs_filter(team_games, A, lambda opp: CONF_DIV.get(opp, ("",""))[0] == CONF_DIV.get(A, ("",""))[0])
-    B_conf = _record_vs_filter(team_games, B, lambda opp: CONF_DIV.get(opp, ("",""))[0] == CONF_DIV.get(B, ("",""))[0])
-    cmp_conf = "A" if _winpct(A_conf) > _winpct(B_conf) else "B" if _winpct(B_conf) > _winpct(A_conf) else "Tie"
+    A_conf, B_conf = R.conference_record(A), R.conference_record(B)
+    cmp_conf = _cmp(A_conf, B_conf)
     steps.append(("Conference record", cmp_conf, A_conf, B_conf))
     if cmp_conf in ("A", "B"): return steps
 
     # 3) Common games (min 4)
-    A_c, B_c, n = _common_games_records(team_games, A, B)
+    A_c, B_c, n = R.common(A, B)
     if n >= 4:
-        cmp_c = "A" if _winpct(A_c) > _winpct(B_c) else "B" if _winpct(B_c) > _winpct(A_c) else "Tie"
-        steps.append((f"Common games (n={n})", cmp_c, A_c, B_c))
+        steps.append((f"Common games (n={n})", _cmp(A_c, B_c), A_c, B_c))
     else:
         steps.append((f"Common games (n={n})", "N/A", A_c, B_c))
     return steps
@@ -208,11 +252,25 @@ def compare_wildcard_tiebreak(processed: dict, A: str, B: str):
 # --- Public: build a readable appendix for one team ---
 # add a parameter so we can hide the header when the story already has “Part 2”
 # replace the signature
+@timed("build_tiebreak_appendix")
 def build_tiebreak_appendix(processed_path: Path, team: str,
                             *, include_division: bool = True,
-                            include_wildcard: bool = True) -> str:
-    processed = json.loads(Path(processed_path).read_text(encoding="utf-8"))
-    team_games, all_teams = _collect_games_by_team(processed)
+                            include_wildcard: bool = True,
+                            include_paths: bool = True) -> str:
+    with span("processed.load"):
+        processed = load_processed(processed_path)
+    return build_tiebreak_appendix_from_data(processed, team,
+                                             include_division=include_division,
+                                             include_wildcard=include_wildcard,
+                                             include_paths=include_paths)
+
+def build_tiebreak_appendix_from_data(processed: dict, team: str,
+                                      *, include_division: bool = True,
+                                      include_wildcard: bool = True,
+                                      include_paths: bool = True) -> str:
+    """Same as build_tiebreak_appendix, for an already-parsed processed schedule."""
+    R = pair_records(processed)
+    all_teams = R.teams
 
     if team not in CONF_DIV:
         return ""
@@ -227,23 +285,21 @@ def build_tiebreak_appendix(processed_path: Path, team: str,
 
     def h2h_line(subject: str, opp: str) -> tuple[str, tuple]:
         # gather head-to-head W/L list + record
-        recs = [r for r in team_games[subject] if r["opponent"] == opp]
-        wlt = _wlt(recs)
+        wlt = R.record(subject, opp)
         results = []
-        for r in recs:
-            tag = "W" if r["pf"] > r["pa"] else ("L" if r["pf"] < r["pa"] else "T")
-            results.append(f"{tag} {r['pf']}-{r['pa']}")
+        for pf, pa in R.games(subject, opp):
+            tag = "W" if pf > pa else ("L" if pf < pa else "T")
+            results.append(f"{tag} {pf}-{pa}")
         if results:
             return f"{fmt_wlt(wlt)} ({', '.join(results)})", wlt
         return f"{fmt_wlt(wlt)}", wlt
 
     def division_record(team_name: str) -> tuple[str, tuple]:
-        rec = _record_vs_filter(team_games, team_name,
-                                lambda opp: CONF_DIV.get(opp) == CONF_DIV.get(team_name))
+        rec = R.division_record(team_name)
         return fmt_wlt(rec), rec
 
     def common_records(subject: str, opp: str) -> tuple[str, tuple, tuple, int]:
-        A_c, B_c, n = _common_games_records(team_games, subject, opp)
+        A_c, B_c, n = R.common(subject, opp)
         if n >= 4:
             return f"Common games (n={n})", A_c, B_c, n
         return f"Common opponents insufficient (n={n})", A_c, B_c, n
@@ -268,7 +324,7 @@ def build_tiebreak_appendix(processed_path: Path, team: str,
             common_label, A_c, B_c, ncommon = common_records(team, opp)
 
             # tiebreak winner (first decisive only)
-            steps = compare_division_tiebreak(processed, team, opp)
+            steps = compare_division_tiebreak(processed, team, opp, R)
             crit, res = first_decisive(steps)
             if res == "A":
                 winner = team
@@ -278,7 +334,7 @@ def build_tiebreak_appendix(processed_path: Path, team: str,
                 winner = None
 
             # can pass by overall record?
-            can_pass = _pass_by_record_possible(processed, team_games, team, opp)
+            can_pass = _pass_by_record_possible(R, team, opp)
             yesno = "Yes" if can_pass else "No"
             reason = (f"{team} can still finish with a better overall record."
                       if can_pass else
@@ -319,19 +375,16 @@ def build_tiebreak_appendix(processed_path: Path, team: str,
         for opp in sorted(wildcard_opps):
             # head-to-head + conference + common
             h2h_text, _ = h2h_line(team, opp)
-            A_conf = _record_vs_filter(team_games, team,
-                                       lambda o: CONF_DIV.get(o, ("",""))[0] == conf)
-            B_conf = _record_vs_filter(team_games, opp,
-                                       lambda o: CONF_DIV.get(o, ("",""))[0] == conf)
+            A_conf, B_conf = R.conference_record(team), R.conference_record(opp)
             common_label, A_c, B_c, ncommon = common_records(team, opp)
 
             # tiebreak winner
-            steps = compare_wildcard_tiebreak(processed, team, opp)
+            steps = compare_wildcard_tiebreak(processed, team, opp, R)
             crit, res = first_decisive(steps)
             winner = team if res == "A" else (opp if res == "B" else None)
 
             # can pass by overall record?
-            can_pass = _pass_by_record_possible(processed, team_games, team, opp)
+            can_pass = _pass_by_record_possible(R, team, opp)
             yesno = "Yes" if can_pass else "No"
             reason = (f"{team} can still finish with a better overall record."
                       if can_pass else
@@ -351,9 +404,51 @@ def build_tiebreak_appendix(processed_path: Path, team: str,
             block.append(f"  - Can still win by record? {yesno}. {reason}")
             lines.append("\n".join(block))
 
+    # ---------------------- PATH TO THE PLAYOFFS ----------------------
+    if include_paths:
+        with span("playoff_paths"):
+            block = _path_to_playoffs(processed, team)
+        if block:
+            lines.append("\n".join(block))
+
     return ("\n\n".join(lines)).strip()
 
 
+PATHS_SHOWN = 5
+PATHS_NODE_BUDGET = 50_000
+
+
+def _path_to_playoffs(processed: dict, team: str) -> list[str]:
+    """'Path to the Playoffs' lines for the appendix ([] when there are no unplayed games)."""
+    from .playoff_paths import describe_path, engine_for, playoff_paths   # imports standings -> this module
+
+    engine = engine_for(processed)
+    if team not in engine.index.teams or not engine.remaining_games():
+        return []
+    res = playoff_paths(engine, team, node_budget=PATHS_NODE_BUDGET)
+    block = ["Path to the Playoffs"]
+    n = len(res["relevant"])
+    if res["status"] == "clinched":
+        block.append(f"- {team} is in whatever happens in the remaining games.")
+    elif res["status"] == "eliminated":
+        block.append(f"- {team} cannot reach the playoffs on the remaining results.")
+    elif res["status"] == "too many games":
+        block.append(f"- {n} remaining games still matter for {team}; too many to list every path yet.")
+    else:
+        tb = f"; {res['tiebreak']:,} more end level on win% and go to tiebreakers" if res["tiebreak"] else ""
+        block.append(f"- {res['qualifying']:,} of {res['combinations']:,} results of the {n} games that "
+                     f"matter put {team} in{tb}.")
+        for label, paths in (("Ways in", res["paths"]), ("Level on win% (tiebreakers decide)", res["tiebreak_paths"])):
+            if not paths:
+                continue
+            block.append(f"- {label}:")
+            block += [f"  - {describe_path(res, p)}" for p in paths[:PATHS_SHOWN]]
+            more = len(paths) - PATHS_SHOWN
+            if more > 0 or res["truncated"]:
+                block.append(f"  - ... and {'more' if res['truncated'] else more} other combinations.")
+    return block
+
+
 
 
 
@@ -363,19 +458,13 @@ def _current_wins(team_games, team: str) -> int:
 
 def _remaining_games(processed: dict, team: str) -> int:
     rem = 0
-    reg = processed.get("reg", {})
-    for weeks in reg.values():
-        if not isinstance(weeks, dict):
-            continue
-        for g in weeks.values():
-            if not isinstance(g, dict):
-                continue
-            if team in (g.get("homeTeamName"), g.get("awayTeamName")) and g.get("status") not in FINAL_STATUSES:
-                rem += 1
+    for _, g in iter_phase(processed.get("reg")):
+        if team in (g.get("homeTeamName"), g.get("awayTeamName")) and g.get("status") not in FINAL_STATUSES:
+            rem += 1
     return rem
 
-def _pass_by_record_possible(processed: dict, team_games, subject: str, opp: str) -> bool:
+def _pass_by_record_possible(records, subject: str, opp: str) -> bool:
     """Can 'subject' still finish with a strictly better overall record than 'opp'?"""
-    subject_max_wins = _current_wins(team_games, subject) + _remaining_games(processed, subject)
-    opp_min_wins = _current_wins(team_games, opp)  # assume opponent loses out
+    subject_max_wins = records.wins(subject) + records.remaining(subject)
+    opp_min_wins = records.wins(opp)  # assume opponent loses out
     return subject_max_wins > opp_min_wins
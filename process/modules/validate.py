@@ -0,0 +1,185 @@
+# process/modules/validate.py — fast-fail checks for the raw Madden exports
+#
+# Runs before the transform so a bad export is rejected in milliseconds, with every
+# problem listed by location ("reg[5][3]" = phase "reg", week list 5, game 3),
+# instead of games being silently skipped or overwritten further down the pipeline.
+from __future__ import annotations
+
+TBD_TEAM_ID = 0  # playoff placeholders before the matchup is known
+
+# field -> (required, allowed types); bool is never accepted where an int is expected
+GAME_SPEC = {
+    "scheduleId": (True, (int,)),
+    "weekIndex": (True, (int,)),
+    "homeTeamId": (True, (int,)),
+    "awayTeamId": (True, (int,)),
+    "homeScore": (False, (int, type(None))),
+    "awayScore": (False, (int, type(None))),
+    "status": (False, (int,)),
+    "seasonIndex": (False, (int,)),
+    "stageIndex": (False, (int,)),
+}
+PHASES = ("pre", "reg")
+
+
+class ExportValidationError(ValueError):
+    """Raised when a raw export fails validation; .problems holds every "location: message"."""
+
+    def __init__(self, problems: list[str]):
+        self.problems = problems
+        shown = "\n  ".join(problems[:20])
+        more = f"\n  ... and {len(problems) - 20} more" if len(problems) > 20 else ""
+        super().__init__(f"{len(problems)} problem(s) in raw export:\n  {shown}{more}")
+
+
+def compile_game_check(spec: dict = GAME_SPEC):
+    """
+    Turn a field spec into a single per-game check function. The spec is unpacked
+    once into tuples so the per-game work is one dict lookup and one type test per field.
+    """
+    required = tuple((f, types) for f, (req, types) in spec.items() if req)
+    optional = tuple((f, types) for f, (req, types) in spec.items() if not req)
+
+    def check(game, loc: str, out: list) -> bool:
+        if not isinstance(game, dict):
+            out.append(f"{loc}: expected a game object, got {type(game).__name__}")
+            return False
+        ok = True
+        for f, types in required:
+            v = game.get(f)
+            if v is None:
+                out.append(f"{loc}: {f} missing")
+                ok = False
+            elif isinstance(v, bool) or not isinstance(v, types):
+                out.append(f"{loc}: {f} should be int, got {v!r}")
+                ok = False
+        for f, types in optional:
+            if f in game:
+                v = game[f]
+                if isinstance(v, bool) or not isinstance(v, types):
+                    out.append(f"{loc}: {f} has unexpected value {v!r}")
+        return ok
+
+    return check
+
+
+_check_game = compile_game_check()
+
+
+def team_ids_from_export(teams: dict) -> set:
+    """Team ids as ints, from the teams export keys (falls back to each object's teamId)."""
+    ids = set()
+    for k, obj in (teams or {}).items():
+        try:
+            ids.add(int(k))
+        except (TypeError, ValueError):
+            if isinstance(obj, dict) and obj.get("teamId") is not None:
+                ids.add(obj["teamId"])
+    return ids
+
+
+def validate_schedule(schedules, team_ids: set | None = None, *, header_only: bool = False) -> list[str]:
+    """
+    One linear pass over the raw schedule export. Returns a list of problems (empty = valid).
+      - shape: {"pre": [week | None, ...], "reg": [...]}, each week a list of game objects
+      - every game has int scheduleId / weekIndex / homeTeamId / awayTeamId
+      - team ids exist in `team_ids` (when given); 0 is allowed as a TBD playoff slot
+      - a scheduleId used twice carries the same game both times (a re-imported copy is
+        fine; two different games under one id are a conflict). Repeated pairings within a
+        week (re-seeded playoff slots) are allowed: weeks are stored as game lists.
+    header_only: check the top-level shape and only the first game of each week.
+    """
+    problems: list[str] = []
+    if not isinstance(schedules, dict):
+        return [f"schedule: expected an object keyed by phase, got {type(schedules).__name__}"]
+    if "reg" not in schedules:
+        problems.append("schedule: no 'reg' phase")
+
+    seen_ids: dict = {}
+    for phase in PHASES:
+        weeks = schedules.get(phase)
+        if weeks is None:
+            continue
+        if not isinstance(weeks, list):
+            problems.append(f"{phase}: expected a list of weeks, got {type(weeks).__name__}")
+            continue
+        for wi, week in enumerate(weeks):
+            if week is None:
+                continue
+            if not isinstance(week, list):
+                problems.append(f"{phase}[{wi}]: expected a list of games, got {type(week).__name__}")
+                continue
+            for gi, game in enumerate(week[:1] if header_only else week):
+                loc = f"{phase}[{wi}][{gi}]"
+                if not _check_game(game, loc, problems) or header_only:
+                    continue
+
+                home, away = game["homeTeamId"], game["awayTeamId"]
+                if team_ids is not None:
+                    for side, tid in (("homeTeamId", home), ("awayTeamId", away)):
+                        if tid != TBD_TEAM_ID and tid not in team_ids:
+                            problems.append(f"{loc}: {side} {tid} not in teams export")
+
+                sid = game["scheduleId"]
+                first = seen_ids.get(sid)
+                if first is None:
+                    seen_ids[sid] = (loc, game)
+                elif first[1] != game:
+                    problems.append(f"{loc}: scheduleId {sid} already used by a different game at {first[0]}")
+    return problems
+
+
+def validate_teams(teams, *, header_only: bool = False) -> list[str]:
+    """Teams export: {teamId: {..., "roster": {rosterId: player}}}."""
+    if not isinstance(teams, dict) or not teams:
+        return ["teams: expected a non-empty object keyed by teamId"]
+    problems = []
+    for k, obj in teams.items():
+        if not isinstance(obj, dict):
+            problems.append(f"teams[{k}]: expected a team object, got {type(obj).__name__}")
+            continue
+        if header_only:
+            continue
+        roster = obj.get("roster")
+        if roster is not None and not isinstance(roster, dict):
+            problems.append(f"teams[{k}].roster: expected an object keyed by rosterId")
+    return problems
+
+
+def check_raw_exports(teams, schedules, *, header_only: bool = False) -> None:
+    """Validate both exports together; raises ExportValidationError listing every problem."""
+    problems = validate_teams(teams, header_only=header_only)
+    ids = team_ids_from_export(teams) if isinstance(teams, dict) else None
+    problems += validate_schedule(schedules, ids, header_only=header_only)
+    if problems:
+        raise ExportValidationError(problems)
+
+
+def main(argv=None):
+    import argparse, json, time
+    from paths import RAW_DIR
+
+    ap = argparse.ArgumentParser(description="Validate the raw teams/schedule exports.")
+    ap.add_argument("--header-only", action="store_true", help="shape + first game of each week only")
+    args = ap.parse_args(argv)
+
+    schedules = json.loads((RAW_DIR / "schedulesPS5.json").read_text(encoding="utf-8"))
+    teams_path = RAW_DIR / "teamsPS5.json"
+    teams = json.loads(teams_path.read_text(encoding="utf-8")) if teams_path.exists() else None
+
+    t0 = time.perf_counter()
+    if teams is None:
+        problems = validate_schedule(schedules, header_only=args.header_only)
+    else:
+        problems = validate_teams(teams, header_only=args.header_only)
+        problems += validate_schedule(schedules, team_ids_from_export(teams), header_only=args.header_only)
+    ms = (time.perf_counter() - t0) * 1000
+
+    for p in problems:
+        print(p)
+    print(f"{'OK' if not problems else f'{len(problems)} problem(s)'} ({ms:.2f} ms)")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,156 @@
+# process/modules/watcher.py — watch data/raw for new exports and refresh processed data
+#
+#   python -m process.modules.watcher        (regenerates schedulesPS5_final.json on change)
+#
+# Uses Linux inotify through ctypes when available, otherwise polls (mtime, size).
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from .generate_names import RAW_DIR, run_incremental
+
+# inotify constants (see <sys/inotify.h>)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HDR = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _open_inotify(directory: Path):
+    """Return an inotify fd watching `directory`, or None if inotify is unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return None
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_MODIFY
+        if libc.inotify_add_watch(fd, os.fsencode(str(directory)), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+def _read_event_names(fd: int) -> list[str]:
+    try:
+        buf = os.read(fd, 64 * 1024)
+    except BlockingIOError:
+        return []
+    names, off = [], 0
+    while off + _EVENT_HDR.size <= len(buf):
+        _, _, _, ln = _EVENT_HDR.unpack_from(buf, off)
+        raw = buf[off + _EVENT_HDR.size: off + _EVENT_HDR.size + ln]
+        names.append(raw.rstrip(b"\0").decode("utf-8", "replace"))
+        off += _EVENT_HDR.size + ln
+    return names
+
+
+class RawWatcher:
+    """
+    Background thread that calls `on_change()` once a burst of writes to `directory`
+    has been quiet for `debounce` seconds. Only files ending in `suffix` count.
+    """
+
+    def __init__(self, on_change: Callable[[], None], directory: Path = RAW_DIR,
+                 debounce: float = 2.0, poll_interval: float = 1.0, suffix: str = ".json",
+                 use_inotify: bool = True):
+        self.on_change = on_change
+        self.directory = Path(directory)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.suffix = suffix
+        self.use_inotify = use_inotify
+        self.mode = None  # "inotify" or "poll" once started
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _signature(self) -> tuple:
+        sig = []
+        for p in sorted(self.directory.glob(f"*{self.suffix}")):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            sig.append((p.name, st.st_mtime_ns, st.st_size))
+        return tuple(sig)
+
+    def start(self) -> "RawWatcher":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="raw-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=max(self.poll_interval, 1.0) + 1.0)
+
+    def _fire(self):
+        try:
+            self.on_change()
+        except Exception as e:
+            print(f"[watcher] refresh failed: {e}")
+
+    def _loop(self):
+        fd = _open_inotify(self.directory) if self.use_inotify else None
+        self.mode = "inotify" if fd is not None else "poll"
+        last_sig = self._signature()
+        deadline = None  # when the current burst is considered finished
+        try:
+            while not self._stop.is_set():
+                timeout = self.poll_interval
+                if deadline is not None:
+                    timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+
+                if fd is not None:
+                    ready, _, _ = select.select([fd], [], [], timeout)
+                    if ready and any(n.endswith(self.suffix) for n in _read_event_names(fd)):
+                        deadline = time.monotonic() + self.debounce
+                else:
+                    self._stop.wait(timeout)
+                    sig = self._signature()
+                    if sig != last_sig:
+                        last_sig = sig
+                        deadline = time.monotonic() + self.debounce
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    deadline = None
+                    self._fire()
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+
+def main():
+    def refresh():
+        diff = run_incremental()
+        teams = ", ".join(sorted(diff["teams"])) or "none"
+        print(f"[watcher] {len(diff['games'])} game(s) changed; teams affected: {teams}")
+
+    w = RawWatcher(refresh).start()
+    time.sleep(0.1)
+    print(f"[watcher] watching {w.directory} ({w.mode}); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        w.stop()
+
+
+if __name__ == "__main__":
+    main()
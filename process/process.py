@@ -1,35 +1,157 @@
 # process/process.py
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import instrumentation
+from instrumentation import team_scope
 from paths import PROC_DIR
-from .modules.generate_names import run as generate_names_run
-from .modules.story_gpt import generate_story_from_file, list_teams_from_final
+from .modules.generate_names import keyed_games, raw_signature, run as generate_names_run
+from .modules.story_gpt import generate_story_from_file, list_teams_from_final, story_fingerprint
+from .modules.story_local import build_local_story
 from .modules.tiebreaks import build_tiebreak_appendix
+from .modules.deps import DependencyGraph, changed_game_keys
+from .modules.season_hash import season_hash_for
+from .modules.processed_cache import load_processed
+from .modules.singleflight import SingleFlight
+from .modules.llm_backends import shared_backend
+
+CACHE_PATH = PROC_DIR / "report_cache.json"
+REPORTS = SingleFlight()   # in-progress run() calls, shared by the GUI, scripts and anything else in this process
+REFRESHES = SingleFlight()   # in-progress generate_names runs, keyed on the raw exports' signature
+_refreshed_sig = None        # raw signature the processed file was last generated from
+
+
+# --- Per-team artifact cache, invalidated through the dependency graph ---
+def _load_cache(processed: dict, fps: dict) -> dict:
+    """
+    Load cached stories/appendices and drop only those whose input games changed
+    since they were generated (`fps`: current {game key: fingerprint}).
+    Returns {"games": {key: fingerprint}, "matchups": {key: [phase, home, away]}, "artifacts": {...}}.
+    """
+    matchups = {k: [phase, g.get("homeTeamName"), g.get("awayTeamName")] for k, phase, g in keyed_games(processed)}
+    try:
+        cache = json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+    except Exception:
+        return {"games": fps, "matchups": matchups, "artifacts": {}}
+
+    changed = changed_game_keys(cache.get("games", {}), fps)
+    artifacts = cache.get("artifacts", {})
+    if changed:
+        graph = DependencyGraph(processed)
+        old = cache.get("matchups", {})
+        if any(k not in old for k in changed - graph.games(changed).keys()):
+            artifacts = {}   # a removed game from a cache that predates "matchups": readers unknown
+        else:
+            dirty = graph.affected(changed)
+            for k in changed & old.keys():   # what read the old version (removed games, changed teams)
+                dirty |= DependencyGraph.artifacts_for_game(*old[k])
+            # artifact cache keys look like "<kind>|<team>|<options...>"
+            artifacts = {k: v for k, v in artifacts.items() if tuple(k.split("|")[:2]) not in dirty}
+    return {"games": fps, "matchups": matchups, "artifacts": artifacts}
+
+def _save_cache(cache: dict) -> None:
+    CACHE_PATH.write_text(json.dumps(cache, ensure_ascii=False), encoding="utf-8")
+
+def _cached(cache: dict | None, key: str, make):
+    if cache is None:
+        return make()
+    arts = cache["artifacts"]
+    if key not in arts:
+        arts[key] = make()
+    return arts[key]
+
+
+def _refresh_processed(final_path) -> None:
+    """
+    generate_names.run() once per version of the raw exports: callers arriving while it runs
+    join it instead of rewriting the processed files concurrently, and later ones skip it
+    until an export changes.
+    """
+    global _refreshed_sig
+    sig = raw_signature()
+    if sig == _refreshed_sig and final_path.exists():
+        return
+    REFRESHES.do(sig, generate_names_run)
+    _refreshed_sig = sig
+
 
 def run(team: str | None = None, all_teams: bool = False, model: str = "gpt-5-mini",
-        include_preseason: bool = False) -> str:
+        include_preseason: bool = False, use_cache: bool = True, offline: bool = False,
+        concurrency: int = 1, on_team=None) -> str:
+    """
+    Story + tiebreak appendix for one team or all of them.
+    offline=True writes Part 1 with the local template generator (no API key or network needed).
+    concurrency > 1 generates all-teams reports in parallel over one shared keep-alive pool of
+    that size (connection reuse is counted in http_client.CONNECTION_STATS, shown on the
+    service's /health with the processed_cache counters).
+    on_team(team, text) is called as each team's part of an all-teams report is ready (for
+    progress); a caller that joins a run already in progress gets no calls.
+    Identical runs already in progress (same team(s), season state, model and options) are
+    joined instead of repeated, so simultaneous requests after a game pay for one LLM call.
+    """
     # 1) Ensure latest processed file exists
-    generate_names_run()
     final_path = PROC_DIR / "schedulesPS5_final.json"
+    _refresh_processed(final_path)
+    if not all_teams and not team:
+        raise ValueError("Provide a team name or set all_teams=True.")
+    season = season_hash_for(final_path)   # just hashed by generate_names: a stat() call
+
+    key = ("*" if all_teams else team, season.season, "local" if offline else model, include_preseason, use_cache)
+    return REPORTS.do(key, lambda: _report(final_path, season, team, all_teams, model,
+                                           include_preseason, use_cache, offline, concurrency, on_team))
+
+
+def _report(final_path, season, team, all_teams, model, include_preseason, use_cache,
+            offline, concurrency, on_team) -> str:
     refs = ["tiebreaker_story_template", "tiebreakers"]  # soft guidance + rulebook
+    processed = load_processed(final_path)
 
-    # 2) Single team vs all teams
-    if all_teams:
-        chunks = []
-        for t in sorted(list_teams_from_final(final_path)):
-            story = generate_story_from_file(final_path, t, model, include_preseason, refs)
-            appendix = build_tiebreak_appendix(final_path, t)
-            chunks.append(f"{story}\n{appendix}\n")
-        return "\n".join(chunks)
+    # Only teams whose games changed since the last run are regenerated (and re-sent to the LLM)
+    cache = _load_cache(processed, season.fingerprints()) if use_cache else None
 
-    if not team:
-        raise ValueError("Provide a team name or set all_teams=True.")
+    def story_for(t):
+        if offline:
+            return _cached(cache, f"local|{t}",
+                           lambda: build_local_story(processed, t, references=refs, state=season.phase("reg")))
+        # keyed on the prompt itself; an older prompt's text is dropped, not kept beside it
+        prefix = f"story|{t}|{model}|{int(include_preseason)}|"
+        key = prefix + story_fingerprint(processed, t, include_preseason=include_preseason,
+                                         references=refs, state=season.phase("reg"))
+        if cache is not None:
+            for k in [k for k in list(cache["artifacts"]) if k.startswith(prefix) and k != key]:
+                cache["artifacts"].pop(k, None)
+        return _cached(cache, key, lambda: generate_story_from_file(final_path, t, model, include_preseason, refs))
+
+    def appendix_for(t):
+        return _cached(cache, f"appendix|{t}",
+                       lambda: build_tiebreak_appendix(final_path, t, include_division=True, include_wildcard=True))
+
+    try:
+        # 2) Single team vs all teams
+        if all_teams:
+            teams = sorted(list_teams_from_final(final_path))
+
+            def chunk_for(t):
+                with team_scope(t):
+                    chunk = f"{story_for(t)}\n{appendix_for(t)}\n"
+                if on_team is not None:
+                    on_team(t, chunk)
+                return chunk
 
-    story = generate_story_from_file(final_path, team, model, include_preseason, refs)
-    appendix = build_tiebreak_appendix(
-    final_path,
-    team,
-    include_division=True,     # put division at the top
-    include_wildcard=True
-)
+            if concurrency > 1 and not offline:
+                shared_backend(concurrency=concurrency)       # size the pool before the burst
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    chunks = list(pool.map(chunk_for, teams))
+            else:
+                chunks = [chunk_for(t) for t in teams]
+            return "\n".join(chunks)
 
+        with team_scope(team):
+            story = story_for(team)
+            appendix = appendix_for(team)   # division at the top, then wild card
 
-    return f"{story}\n\n{appendix}" if appendix else story
+        return f"{story}\n\n{appendix}" if appendix else story
+    finally:
+        if cache is not None:
+            _save_cache(cache)
+        instrumentation.export_if_requested()
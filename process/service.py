@@ -0,0 +1,392 @@
+# process/service.py — long-running local report service with warm in-memory caches
+#
+#   python -m process.service --port 8765
+#   python -m process.service --watch     (auto-refresh when data/raw changes)
+#
+# Endpoints (GET):
+#   /health                          -> {"ok": true, "loaded_at": ..., "coalesced": {...}, "parsed": {"hits", "misses", ...},
+#                                        "http": {"requests", "connections", "reused", "tls_handshakes"}}
+#   /teams                           -> ["Arizona Cardinals", ...]
+#   /standings?week=9                -> {"divisions": {"AFC": {"East": [row, ...]}}, "seeds": {"AFC": [...]}}
+#                                       (full tiebreak pass: division/conference records, SoV, SoS)
+#   /records?week=9                  -> {team: {"w", "l", "t", "pf", "pa", "pct"}} — prefix-sum lookup, for charts
+#   /odds?sims=1000                  -> {team: {"playoffs", "division", "top_seed"}}
+#                                       (games drawn from margin ratings; ?ratings=0 for coin flips; sims clamped to 1..MAX_SIMS)
+#   /scenario?set=<id>:home,<id>:tie&team=<team>
+#                                    -> seeds + clinch flags with those unplayed games forced
+#                                       (no "set" lists the unplayed games and their ids)
+#   /teams/<team>/appendix           -> text/plain tiebreak appendix (?division=0 / ?wildcard=0)
+#   /teams/<team>/pdf                -> application/pdf (appendix only; ?story=1 prepends the LLM story)
+#
+# <team> may be the full name ("Seattle Seahawks") or its slug ("seattle-seahawks").
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs, unquote
+
+from paths import RAW_DIR, PROC_DIR
+from .modules.generate_names import raw_signature, run as generate_names_run, run_incremental
+from .modules.validate import ExportValidationError
+from .modules.season_index import REG_SEASON_WEEKS, SeasonIndex
+from .modules.tiebreaks import build_tiebreak_appendix_from_data
+from .modules.odds import simulate_playoff_odds
+from .modules.ratings import RatingModel
+from .modules.standings import compute_standings, playoff_seeds, standings_table
+from .modules.scenario import ScenarioEngine
+from .modules.season_hash import season_hash_for
+from .modules.processed_cache import cache_info, load_processed
+from .modules.http_client import CONNECTION_STATS
+from .modules.singleflight import SingleFlight
+from .modules.story_gpt import generate_story_from_file, roster_fingerprint, story_fingerprint
+
+FINAL_PATH = PROC_DIR / "schedulesPS5_final.json"
+
+
+def _slug(s: str) -> str:
+    return "".join(ch for ch in (s or "").lower().replace(" ", "-") if ch.isalnum() or ch == "-")
+
+
+def _evict(cache: dict, keep) -> None:
+    for key in [k for k in cache if not keep(k)]:
+        del cache[key]
+
+
+class ReportService:
+    """
+    Holds the processed season in memory and memoizes every derived artifact.
+    Freshness is checked by stat()-ing the raw exports (at most every `check_interval`
+    seconds); only a changed raw signature triggers generate_names + reload.
+    """
+
+    def __init__(self, processed_path: Path = FINAL_PATH, check_interval: float = 1.0):
+        self.processed_path = Path(processed_path)
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._raw_sig = None
+        self._checked_at = 0.0
+        self.loaded_at = None
+        self.processed: dict = {}
+        self.index: SeasonIndex | None = None
+        self.hash = None                # season_hash.SeasonHash of the loaded file
+        self.state = ""                 # its season digest
+        self._flight = SingleFlight()   # identical story / PDF requests in progress share one build
+        self._appendix: dict = {}
+        self._odds: dict = {}
+        self._stories: dict = {}
+        self._story_fps: dict = {}      # (team, roster fingerprint) -> story_fingerprint of the loaded season
+        self._pdfs: dict = {}
+        self._standings: dict = {}
+        self._scenarios: ScenarioEngine | None = None
+        self._ratings = RatingModel()   # kept across reloads: each reload only adds newly final games
+
+    # ---------- loading ----------
+    def _load(self):
+        """(Re)load the processed file and drop the memoized artifacts whose digest no longer matches it."""
+        self.processed = load_processed(self.processed_path)
+        self.index = SeasonIndex.from_processed(self.processed)
+        self.hash = season_hash_for(self.processed_path, self.processed)
+        self.state = self.hash.season
+        self.loaded_at = time.time()
+        self._standings.clear()
+        self._odds.clear()
+        self._story_fps.clear()
+        self._scenarios = None
+        self._ratings.update(self.index)
+        reg = self.hash.phase("reg")
+        _evict(self._appendix, lambda k: k[3] == reg)
+        _evict(self._pdfs, lambda k: k[4] == self.state)
+        # stories are keyed on their prompt, which is only rebuilt per team on demand:
+        # story() replaces a team's older entry when it stores the new one
+
+    def refresh_from_raw(self, prewarm: bool = True) -> dict:
+        """
+        Incremental refresh (used by the raw-folder watcher): re-run generate_names,
+        reload (artifacts whose digest didn't change are kept), then rebuild the cheap ones.
+        Runs under the same lock as ensure_fresh's full rebuild, so only one of them writes
+        the processed files at a time.
+        """
+        with self._lock:
+            diff = run_incremental()
+            self._load()
+            self._raw_sig = raw_signature()
+            self._checked_at = time.monotonic()
+        if prewarm and diff["games"]:
+            self.standings()
+            self.odds()
+            for team in self.index.teams:
+                self.appendix(team)
+        return diff
+
+    def ensure_fresh(self):
+        now = time.monotonic()
+        if self.index is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            sig = raw_signature()
+            if self.index is not None and sig == self._raw_sig:
+                return
+            stale = (not self.processed_path.exists()
+                     or any(p.stat().st_mtime > self.processed_path.stat().st_mtime
+                            for p in RAW_DIR.glob("*.json")))
+            if stale:
+                try:
+                    generate_names_run()
+                except (FileNotFoundError, ExportValidationError) as e:
+                    if not self.processed_path.exists():
+                        raise  # nothing to fall back to
+                    if isinstance(e, ExportValidationError):
+                        print(f"[service] keeping last good schedule: {e}")
+            self._load()
+            self._raw_sig = sig
+
+    # ---------- lookups ----------
+    def resolve_team(self, name: str) -> str | None:
+        self.ensure_fresh()
+        if name in self.index.by_team:
+            return name
+        slug = _slug(name)
+        for t in self.index.teams:
+            if _slug(t) == slug:
+                return t
+        return None
+
+    def teams(self) -> list[str]:
+        self.ensure_fresh()
+        return list(self.index.teams)
+
+    def standings(self, week: int | None = None) -> dict:
+        """
+        {"divisions": {conf: {div: [rows]}}, "seeds": {conf: [{"seed", "team", "via"}]}}
+        as of the end of weekIndex `week` (default: every final game).
+        """
+        self.ensure_fresh()
+        with self._lock:
+            hit = self._standings.get(week)
+            if hit is None:
+                S = compute_standings(self.index, through_week=week)
+                hit = self._standings[week] = {"divisions": standings_table(S), "seeds": playoff_seeds(S)}
+            return hit
+
+    def records(self, week: int | None = None) -> dict:
+        """Every team's overall record after weekIndex `week` (default: all final games), O(teams)."""
+        self.ensure_fresh()
+        rows = self.index.records_as_of(REG_SEASON_WEEKS if week is None else week)
+        return {t: {"w": w, "l": l, "t": ti, "pf": pf, "pa": pa,
+                    "pct": round((w + 0.5 * ti) / (w + l + ti), 3) if w + l + ti else 0.0}
+                for t, (w, l, ti, pf, pa) in rows.items()}
+
+    def scenario(self, outcomes: dict | None = None, team: str | None = None) -> dict:
+        """What-if evaluation from the cached base season (see modules/scenario.py)."""
+        self.ensure_fresh()
+        with self._lock:
+            if self._scenarios is None:
+                self._scenarios = ScenarioEngine(self.index)
+            engine = self._scenarios
+        if not outcomes and not team:
+            return {"remaining": engine.remaining_games()}
+        return engine.evaluate(outcomes, team)
+
+    def appendix(self, team: str, include_division: bool = True, include_wildcard: bool = True) -> str:
+        self.ensure_fresh()
+        key = (team, include_division, include_wildcard, self.hash.phase("reg"))   # reads every REG game
+        hit = self._appendix.get(key)
+        if hit is not None:
+            return hit
+        with self._lock:
+            text = build_tiebreak_appendix_from_data(self.processed, team,
+                                                     include_division=include_division,
+                                                     include_wildcard=include_wildcard)
+            self._appendix[key] = text
+            return text
+
+    def odds(self, n_sims: int = 1000, use_ratings: bool = True) -> dict:
+        self.ensure_fresh()
+        key = (n_sims, use_ratings)
+        hit = self._odds.get(key)
+        if hit is not None:
+            return hit
+        with self._lock:
+            probs = self._ratings.game_probabilities(self.index) if use_ratings else None
+            res = simulate_playoff_odds(self.index, n_sims=n_sims, seed=0, probs=probs)
+            self._odds[key] = res
+            return res
+
+    def _story_fingerprint(self, team: str) -> str:
+        """Digest of the team's story prompt: its own games plus only the facts and rules it shows."""
+        key = (team, roster_fingerprint(team))   # the prompt's "Key players" line
+        with self._lock:
+            fp = self._story_fps.get(key)
+            if fp is None:
+                fp = self._story_fps[key] = story_fingerprint(self.processed, team, state=self.hash.phase("reg"))
+            return fp
+
+    def story(self, team: str, model: str = "gpt-5-mini") -> str:
+        self.ensure_fresh()
+        key = (team, model, self._story_fingerprint(team))
+        hit = self._stories.get(key)
+        if hit is not None:
+            return hit
+        state = self.state
+
+        def build():
+            text = generate_story_from_file(self.processed_path, team, model)
+            with self._lock:
+                if self.state == state:   # a reload while generating: don't cache text from before it
+                    _evict(self._stories, lambda k: k[:2] != key[:2])   # the team's older prompt
+                    self._stories[key] = text
+            return text
+        return self._flight.do(("story", *key), build)
+
+    def pdf(self, team: str, with_story: bool = False, model: str = "gpt-5-mini") -> bytes:
+        self.ensure_fresh()
+        key = (team, with_story, model, roster_fingerprint(team), self.state)   # header lists key players
+        hit = self._pdfs.get(key)
+        if hit is not None:
+            return hit
+        from pdf_export import render_single_team_pdf
+        state = self.state
+
+        def build():
+            text = self.appendix(team)
+            if with_story:
+                text = f"{self.story(team, model)}\n\n{text}"
+            data = render_single_team_pdf(text, team)
+            with self._lock:
+                if self.state == state:
+                    _evict(self._pdfs, lambda k: k[:3] != key[:3])      # an older roster
+                    self._pdfs[key] = data
+            return data
+        return self._flight.do(("pdf", *key), build)
+
+
+# ---------- HTTP layer ----------
+MAX_SIMS = 100_000   # /odds?sims= is clamped to 1..MAX_SIMS
+
+
+class BadRequest(ValueError):
+    """A malformed query parameter: answered with 400 and the message."""
+
+
+def _int(qs: dict, name: str, default: int | None = None) -> int | None:
+    v = qs.get(name, [None])[0]
+    if v is None:
+        return default
+    try:
+        return int(v)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer, got {v!r}") from None
+
+
+def _flag(qs: dict, name: str, default: bool) -> bool:
+    v = qs.get(name, [None])[0]
+    if v is None:
+        return default
+    return v.lower() not in ("0", "false", "no", "off")
+
+
+def make_handler(service: ReportService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, body: bytes, ctype: str):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json(self, obj, status: int = 200):
+            self._send(status, json.dumps(obj, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            qs = parse_qs(url.query)
+            parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+            try:
+                if parts == ["health"]:
+                    service.ensure_fresh()
+                    return self._json({"ok": True, "loaded_at": service.loaded_at,
+                                       "coalesced": dict(service._flight.stats), "parsed": cache_info(),
+                                       "http": CONNECTION_STATS.snapshot()})
+                if parts == ["teams"]:
+                    return self._json(service.teams())
+                if parts == ["standings"]:
+                    return self._json(service.standings(_int(qs, "week")))
+                if parts == ["records"]:
+                    return self._json(service.records(_int(qs, "week")))
+                if parts == ["odds"]:
+                    sims = max(1, min(_int(qs, "sims", 1000), MAX_SIMS))
+                    return self._json(service.odds(sims, _flag(qs, "ratings", True)))
+                if parts == ["scenario"]:
+                    outcomes = {}
+                    for item in ",".join(qs.get("set", [])).split(","):
+                        if item:
+                            gid, _, outcome = item.partition(":")
+                            outcomes[gid] = outcome
+                    team = qs.get("team", [None])[0]
+                    if team is not None:
+                        team = service.resolve_team(team)
+                        if team is None:
+                            return self._json({"error": f"Unknown team: {qs['team'][0]}"}, 404)
+                    try:
+                        return self._json(service.scenario(outcomes, team))
+                    except ValueError as e:
+                        return self._json({"error": str(e)}, 400)
+                if len(parts) == 3 and parts[0] == "teams":
+                    team = service.resolve_team(parts[1])
+                    if team is None:
+                        return self._json({"error": f"Unknown team: {parts[1]}"}, 404)
+                    if parts[2] == "appendix":
+                        text = service.appendix(team, _flag(qs, "division", True), _flag(qs, "wildcard", True))
+                        return self._send(200, text.encode("utf-8"), "text/plain; charset=utf-8")
+                    if parts[2] == "pdf":
+                        data = service.pdf(team, _flag(qs, "story", False), qs.get("model", ["gpt-5-mini"])[0])
+                        return self._send(200, data, "application/pdf")
+                return self._json({"error": "Not found"}, 404)
+            except BadRequest as e:
+                return self._json({"error": str(e)}, 400)
+            except Exception as e:
+                return self._json({"error": str(e)}, 500)
+
+        def log_message(self, fmt, *args):
+            pass  # keep the console quiet under high request rates
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, service: ReportService | None = None,
+          watch: bool = False):
+    service = service or ReportService()
+    service.ensure_fresh()  # warm up before accepting requests
+    watcher = None
+    if watch:
+        from .modules.watcher import RawWatcher
+        watcher = RawWatcher(service.refresh_from_raw).start()
+    httpd = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Madden Helper report service on http://{host}:{port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        if watcher:
+            watcher.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve standings, tiebreaks, odds and PDFs from memory.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--watch", action="store_true",
+                    help="refresh and re-warm caches as soon as new exports land in data/raw")
+    args = ap.parse_args()
+    serve(args.host, args.port, watch=args.watch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# scripts/bench_keys.py — unique-key generation: legacy probe loops vs KeyAllocator
+#
+#   python -m scripts.bench_keys [--players 10000] [--teams 2000] [--repeat 3]
+#   python scripts/bench_keys.py ...  (same)
+#
+# Builds a synthetic league where most generated players share a handful of names, then
+# times transform_teams against the old code in two cases, reported separately:
+#   distinct teams     - the player roster plus one other team (what a real export looks like)
+#   same-named teams   - plus `--teams` filler teams that all share one name
+# KeyAllocator only pays off in the second case (about 25x at 2000 teams, where the old
+# loop re-probed "Name [2]", "Name [3]", ... for every team). In the first it is a
+# regression: about 0.8x (e.g. 7.6 ms -> 9.3 ms), from the extra method calls per player.
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))   # project root
+
+from process.modules.generate_names import make_team_name, transform_teams
+
+
+# ---------- the pre-KeyAllocator implementation, kept here for comparison ----------
+def _legacy_player_key(player_obj, used):
+    first = (player_obj.get("firstName") or "").strip()
+    last = (player_obj.get("lastName") or "").strip()
+    jersey = player_obj.get("jerseyNum")
+    roster_id = player_obj.get("rosterId")
+    base = f"{first} {last}".strip() or str(roster_id)
+    if base not in used:
+        used.add(base)
+        return base
+    if jersey is not None:
+        key2 = f"{base} (#{jersey})"
+        if key2 not in used:
+            used.add(key2)
+            return key2
+    key3 = f"{base} ({roster_id})"
+    used.add(key3)
+    return key3
+
+
+def _legacy_transform_teams(teams_data, team_name_style="city_display"):
+    transformed = {}
+    team_id_to_name = {}
+    for team_id, team_obj in teams_data.items():
+        name = make_team_name(team_obj, style=team_name_style)
+        final_name = name
+        suffix = 2
+        while final_name in transformed:
+            final_name = f"{name} [{suffix}]"
+            suffix += 1
+        team_id_to_name[int(team_id)] = final_name
+        roster = team_obj.get("roster") or {}
+        used_names = set()
+        new_roster = {}
+        for pid, player in roster.items():
+            new_roster[_legacy_player_key(player, used_names)] = player
+        new_team_obj = dict(team_obj)
+        new_team_obj["roster"] = new_roster
+        transformed[final_name] = new_team_obj
+    return transformed, team_id_to_name
+
+
+# ---------- synthetic data ----------
+def synthetic_league(n_players: int, n_teams: int, seed: int = 7) -> dict:
+    """One huge roster of generated players plus many same-named filler teams."""
+    rng = random.Random(seed)
+    firsts, lasts = ["John", "Mike", "Chris"], ["Smith", "Johnson"]
+    roster = {}
+    for rid in range(n_players):
+        roster[str(rid)] = {
+            "rosterId": rid, "firstName": rng.choice(firsts), "lastName": rng.choice(lasts),
+            "jerseyNum": rng.randint(0, 99), "position": "WR", "playerBestOvr": rng.randint(40, 99),
+        }
+    teams = {"1": {"teamId": 1, "cityName": "Custom", "displayName": "League", "roster": roster}}
+    for tid in range(2, n_teams + 2):
+        teams[str(tid)] = {"teamId": tid, "cityName": "Expansion", "displayName": "Club",
+                           "roster": {}, "ovrRating": 70}
+    return teams
+
+
+def _best(fn, teams, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(teams)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark unique team/player key generation.")
+    ap.add_argument("--players", type=int, default=10_000)
+    ap.add_argument("--teams", type=int, default=2_000, help="filler teams in the same-named case")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{args.players} players on one roster, best of {args.repeat}")
+    for label, n_teams in (("distinct teams", 1), ("same-named teams", args.teams)):
+        teams = synthetic_league(args.players, n_teams)
+        old_t, (old_out, _) = _best(_legacy_transform_teams, teams, args.repeat)
+        new_t, (new_out, _) = _best(transform_teams, teams, args.repeat)
+
+        # Same team and player keys, in the same order
+        assert list(old_out) == list(new_out)
+        assert all(list(old_out[k]["roster"]) == list(new_out[k]["roster"]) for k in new_out)
+
+        speedup = old_t / new_t
+        verdict = "faster" if speedup >= 1 else "slower: a regression"
+        print(f"{label} ({n_teams + 1} teams)")
+        print(f"  legacy       : {old_t * 1000:8.1f} ms")
+        print(f"  KeyAllocator : {new_t * 1000:8.1f} ms   ({speedup:.1f}x, {verdict})")
+
+if __name__ == "__main__":
+    main()
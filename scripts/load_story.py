@@ -0,0 +1,113 @@
+# scripts/load_story.py — load-test story generation against a local backend
+#
+#   python -m scripts.load_story [--requests 500] [--concurrency 200] [--latency 0.2] [--jitter 0.05]
+#                                [--error-rate 0.05] [--stream] [--cache] [--backend fake|compatible]
+#
+# Fires `requests` story generations (teams cycled) through a thread pool of `concurrency` workers
+# using the real prompt builder + retry path, with the fake in-process backend by default, so
+# concurrency, retries, caching and streaming can be exercised without network access.
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from paths import PROC_DIR
+from process.modules.http_client import CONNECTION_STATS
+from process.modules.llm_backends import BackendError, FakeBackend, shared_backend
+from process.modules.schedule_view import teams as schedule_teams
+from process.modules.story_gpt import generate_story
+
+
+def _pct(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load-test story generation against a local LLM backend.")
+    ap.add_argument("--requests", type=int, default=500)
+    ap.add_argument("--concurrency", type=int, default=200)
+    ap.add_argument("--backend", default="fake", help="fake (default) or compatible (MADDEN_LLM_BASE_URL)")
+    ap.add_argument("--model", default="fake-model")
+    ap.add_argument("--latency", type=float, default=0.2, help="fake backend: mean seconds per call")
+    ap.add_argument("--jitter", type=float, default=0.05, help="fake backend: ± seconds")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fake backend: share of calls that fail (retried)")
+    ap.add_argument("--timeout", type=float, default=None, help="per-request timeout in seconds")
+    ap.add_argument("--stream", action="store_true", help="stream responses (reports time to first chunk)")
+    ap.add_argument("--cache", action="store_true", help="reuse finished stories per team (like the service cache)")
+    args = ap.parse_args(argv)
+
+    data = json.loads((PROC_DIR / "schedulesPS5_final.json").read_text(encoding="utf-8"))
+    teams = sorted(schedule_teams(data))
+    if args.backend == "fake":
+        backend = FakeBackend(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=0)
+    else:
+        backend = shared_backend(args.backend, concurrency=args.concurrency)
+
+    lock = threading.Lock()
+    cache: dict = {}
+    retry_stats: dict = {}
+    latencies, first_chunk, failures = [], [], []
+    hits = 0
+
+    def one(i: int):
+        nonlocal hits
+        team = teams[i % len(teams)]
+        t0 = time.perf_counter()
+        if args.cache:
+            with lock:
+                if team in cache:
+                    hits += 1
+                    latencies.append(time.perf_counter() - t0)
+                    return
+        first = []
+
+        def on_delta(piece):
+            if piece is not None and not first:
+                first.append(time.perf_counter() - t0)
+
+        try:
+            text = generate_story(data, team, args.model, backend=backend, retry_stats=retry_stats,
+                                  on_delta=on_delta if args.stream else None, timeout=args.timeout)
+        except (BackendError, RuntimeError) as e:
+            with lock:
+                failures.append(str(e))
+            return
+        with lock:
+            latencies.append(time.perf_counter() - t0)
+            if first:
+                first_chunk.append(first[0])
+            if args.cache:
+                cache[team] = text
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, range(args.requests)))
+    wall = time.perf_counter() - t0
+
+    ok = len(latencies)
+    print(f"backend={backend.name} requests={args.requests} concurrency={args.concurrency} "
+          f"stream={args.stream} cache={args.cache}")
+    print(f"  wall {wall:.2f}s  throughput {ok / wall:.1f} stories/s  ok {ok}  failed {len(failures)}  "
+          f"retries {retry_stats.get('retries', 0)}  cache hits {hits}")
+    if latencies:
+        print(f"  latency p50 {_pct(latencies, 0.5) * 1000:.0f} ms  p95 {_pct(latencies, 0.95) * 1000:.0f} ms  "
+              f"p99 {_pct(latencies, 0.99) * 1000:.0f} ms  mean {statistics.mean(latencies) * 1000:.0f} ms")
+    if first_chunk:
+        print(f"  first chunk p50 {_pct(first_chunk, 0.5) * 1000:.0f} ms  p95 {_pct(first_chunk, 0.95) * 1000:.0f} ms")
+    if isinstance(backend, FakeBackend):
+        s = backend.stats
+        print(f"  backend calls {s['calls']}  simulated errors {s['errors']}  max in flight {s['max_in_flight']}")
+    else:
+        print(f"  http {CONNECTION_STATS.summary()}")
+    if failures:
+        print(f"  first failure: {failures[0]}")
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())